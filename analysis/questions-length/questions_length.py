@@ -1,7 +1,11 @@
 import pandas as pd
 from sqlalchemy import create_engine
-from bs4 import BeautifulSoup
 import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "bertopic" / "pre_processing"))
+from html_text import code_line_count
 
 TAG = 'dart'
 START_DATE = '2018-01-01'
@@ -17,6 +21,9 @@ OUTPUT_FILE = f'metrics_{execution_mode}_{TAG}_{START_DATE[:4]}_{END_DATE[:4]}.c
 
 CHUNK_SIZE = 10000  # Batch size 
 
+# Backend da leitura do HTML (ver bertopic/pre_processing/html_text.py): 'regex' (rápido) ou 'bs4' (a referência)
+HTML_BACKEND = 'regex'
+
 sql_query = """
 SELECT 
     p.id,
@@ -39,18 +46,7 @@ if TEST_MODE:
     sql_query += f" LIMIT {TEST_LIMIT}"
 
 def get_code_line_count(html_body):
-    if not html_body: 
-        return 0
-    
-    soup = BeautifulSoup(html_body, "html.parser")
-    code_lines = 0
-    
-    for code_block in soup.find_all('code'):
-        text = code_block.get_text()
-        if text:
-            code_lines += text.count('\n') + 1
-            
-    return code_lines
+    return code_line_count(html_body, HTML_BACKEND)
 
 def main():
     print(f"--- Starting extraction ({execution_mode}) for tag: {TAG.upper()} ---")
@@ -0,0 +1,159 @@
+import random
+import sys
+import time
+
+from html_text import BACKENDS, clean_html, code_line_count
+
+# --- CONFIGURAÇÃO ---
+# Bodies sintéticos (montados com trechos comuns de posts do Stack Overflow) medidos e conferidos
+NUM_DOCS = 20_000
+# Opcional: um {TAG}-sample.csv com a coluna 'body', para medir e conferir também bodies reais
+CSV_PATH = None
+# Repetições de cada medição (vale a melhor)
+REPEAT = 3
+SEED = 42
+# --- FIM DA CONFIGURAÇÃO ---
+
+# Bodies difíceis: todo backend deve dar o mesmo resultado da referência ('bs4') em cada um
+PARITY_CORPUS = [
+    "",
+    "   \n\t ",
+    "<p>Plain paragraph.</p>",
+    "<p>First</p><p>Second</p>",
+    "<p>no<b>space</b>between<i>tags</i></p>",
+    "<p>Unclosed paragraph<p>another one<li>and a list item",
+    "<div><p>Nested <em>unclosed <strong>tags</p></div> after",
+    "</p>stray closing tags</div></code> around text",
+    "<p>Entities: &amp; &lt;tag&gt; &quot;q&quot; &#39;s&#39; &#x27;hex&#x27; &nbsp;nbsp&nbsp; &copy; &hellip;</p>",
+    "<p>Bare ampersands & and &amp without semicolon, &unknown; entity, &#128512; emoji</p>",
+    "<p>Escaped markup: &lt;code&gt;not code&lt;/code&gt; and &lt;script&gt;</p>",
+    "<pre><code>def f(x):\n    return x &lt; 10\n</code></pre>",
+    "<p>Before</p>\n<pre><code>line 1\nline 2\n\nline 4\n</code></pre>\n<p>After</p>",
+    "<pre class=\"lang-py prettyprint-override\"><code>import os\r\nprint(os.getcwd())\r\n</code></pre>",
+    "<p>Inline <code>x = 1</code> code and <code></code> empty code.</p>",
+    "<pre><code>outer <code>nested</code> tail\nsecond line</code></pre><p>text</p>",
+    "<code>unclosed code block\nwith lines",
+    "<p>Text <code>first</code> middle <code>second\nline</code> end</p>",
+    "<p>Markdown fence ```print(1)``` inside html and ``` unclosed fence</p>",
+    "```\nfenced\n```\ntext after",
+    "<p>See https://stackoverflow.com/q/123?a=b&amp;c=d for details.</p>",
+    "<p>Link <a href=\"https://example.com/docs\">the docs</a> and www.example.org too.</p>",
+    "<p><a href=\"https://docs.python.org/3/library/os.html\"><code>os.path</code></a> is useful.</p>",
+    "<p><a href=\"https://example.com\"><code>two words</code></a>glued text after</p>",
+    "<p>https://<code>only code</code> after empty link</p>",
+    "<p>http://a.b/<code>x</code>```y```tail more</p>",
+    "<p>www.<code>x y</code> and http:// alone</p>",
+    "<p><img src=\"https://i.sstatic.net/abc.png\" alt=\"screenshot\"></p>",
+    "<blockquote>\n  <p>Quoted <em>error</em>: <code>KeyError: 'x'</code></p>\n</blockquote>",
+    "<ul>\n<li>one</li>\n<li>two <kbd>Ctrl</kbd>+<kbd>C</kbd></li>\n</ul>",
+    "<h1>Title</h1><hr><p>Line<br>break<br/>self-closed</p>",
+    "<p>Comment <!-- hidden --> between<!--x-->words</p>",
+    "<p>Script <script>var a = 1 < 2;</script> and style <style>p { color: red }</style> tags</p>",
+    "<!DOCTYPE html><html><head><title>Page</title></head><body><p>Body</p></body></html>",
+    "<table><tr><td>a</td><td>b</td></tr><tr><td>c</td></tr></table>",
+    "<p>Less than sign: a < b and a<b and x <= y</p>",
+    "<p>Text ending with an unfinished tag <b",
+    "<p>CDATA <![CDATA[cdata text]]> here</p>",
+    "<p>Null \x00 character and &#0; reference</p>",
+    "<p>Unicode: café, naïve, 日本語, emoji 😀, rtl עברית</p>",
+    "<p>Zero​width and non breaking spaces</p>",
+    "<?xml version=\"1.0\" encoding=\"utf-8\"?><p>XML declaration</p>",
+    "<p attr='single' data-x=\"a > b\">Attribute with greater-than</p>",
+    "<p>Tabs\tand\r\nwindows\rline endings</p>",
+    "<strike>old</strike> <del>deleted</del> <sup>sup</sup><sub>sub</sub>",
+    "<p>Upper-case <CODE>not removed by the regex</CODE> tags</p>",
+    "plain text without any tags",
+    "<p>Ruby <ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby> annotations</p>",
+    "<p>Void end tags<br>line</br>glued and </img>more</p>",
+    "<p>Odd <code>end tag</code\xa0> and <code\x0b>names</code></p>",
+    "<p>Attribute <span data-x=\r\n\"a > b\">with a quoted greater-than</span> after a newline</p>",
+    "<p>Fence ```starts <code>inside ``` code</code> and never``` closes</p>",
+    "<pre><code>\n\n\n</code></pre><code>\n\t \n</code><code> </code>",
+    "<code>a&#10;b&#x0A;c</code> and <code>&lt;tag&gt;</code>",
+    "<p>Empty <b/> and self-closing <code/> and <a href=x/>bare</a></p>",
+    "<p>Comment with dashes <!-- a -- b --> and <!--> odd comment --></p>",
+    "<p>Entity at the end &amp",
+]
+
+# Trechos dos bodies sintéticos
+PARAGRAPHS = [
+    "<p>I'm trying to read a CSV file with <code>pandas.read_csv</code> but I get an error &amp; I don't know why.</p>",
+    "<p>See the <a href=\"https://pandas.pydata.org/docs/\" rel=\"nofollow noreferrer\">documentation</a> for details.</p>",
+    "<p>This works in Python 2.7 but not in 3.x:</p>",
+    "<p>Any help would be appreciated. Thanks!</p>",
+    "<p><strong>Update:</strong> I tried <code>x &lt; 10</code> and it still fails &mdash; see www.example.com.</p>",
+    "<blockquote>\n<p>TypeError: 'NoneType' object is not subscriptable</p>\n</blockquote>",
+    "<ul>\n<li>first option</li>\n<li>second <em>option</em></li>\n</ul>",
+    "<p><a href=\"https://i.sstatic.net/abc.png\" rel=\"nofollow noreferrer\"><img src=\"https://i.sstatic.net/abc.png\" alt=\"enter image description here\" /></a></p>",
+    "<h2>Expected output</h2>",
+    "<p>Press <kbd>Ctrl</kbd>+<kbd>Shift</kbd> and check the output.<br>\nThen run it again.</p>",
+    "<p>The <a href=\"https://docs.python.org/3/library/os.path.html\" rel=\"nofollow noreferrer\"><code>os.path</code></a> module doesn&#39;t help.</p>",
+    "<!-- language: lang-py -->",
+]
+CODE_LINES = ["import pandas as pd", "df = pd.read_csv('data.csv')", "for i in range(10):", "    print(i &lt; 5)",
+              "if x &amp;&amp; y {", "}", "", "def f(a, b):", "    return a + b", "// comment &quot;x&quot;"]
+
+def synthetic_body(rng):
+    parts = []
+    for _ in range(rng.randint(2, 8)):
+        if rng.random() < 0.35:
+            lines = [rng.choice(CODE_LINES) for _ in range(rng.randint(1, 12))]
+            parts.append('<pre class="lang-py prettyprint-override"><code>' + "\n".join(lines) + "\n</code></pre>")
+        else:
+            parts.append(rng.choice(PARAGRAPHS))
+    return "\n".join(parts) + "\n"
+
+def read_csv_bodies(path):
+    import pandas as pd
+
+    bodies = pd.read_csv(path, usecols=["body"], dtype=str, keep_default_na=False)["body"].tolist()
+    print(f"{len(bodies)} bodies de '{path}'")
+    return bodies
+
+def best_time(function):
+    best = None
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def parity_mismatches(backend, documents):
+    """Bodies em que `backend` difere da referência: (função, body, esperado, obtido)."""
+    mismatches = []
+    for body in documents:
+        for function in (clean_html, code_line_count):
+            expected, result = function(body, 'bs4'), function(body, backend)
+            if result != expected:
+                mismatches.append((function.__name__, body, expected, result))
+    return mismatches
+
+if __name__ == "__main__":
+    rng = random.Random(SEED)
+    documents = [synthetic_body(rng) for _ in range(NUM_DOCS)]
+    if CSV_PATH is not None:
+        documents += read_csv_bodies(CSV_PATH)
+
+    failed = False
+    for backend in BACKENDS:
+        if backend == 'bs4':
+            continue
+        mismatches = parity_mismatches(backend, PARITY_CORPUS + documents)
+        print(f"{backend}: {len(mismatches)} diferenças da referência em {len(PARITY_CORPUS)} bodies do corpus "
+              f"e {len(documents)} bodies medidos")
+        for name, body, expected, result in mismatches[:10]:
+            print(f"  {name}({body[:200]!r})\n    bs4:  {expected!r}\n    {backend}: {result!r}")
+        failed = failed or bool(mismatches)
+    if failed:
+        sys.exit("--- Há backends com resultado diferente da referência. ---")
+
+    print()
+    reference = {}
+    for backend in BACKENDS:
+        clean_seconds, _ = best_time(lambda: [clean_html(body, backend) for body in documents])
+        count_seconds, _ = best_time(lambda: [code_line_count(body, backend) for body in documents])
+        reference.setdefault('clean', clean_seconds)
+        reference.setdefault('count', count_seconds)
+        print(f"{backend}: clean_html {len(documents) / clean_seconds:,.0f} docs/s ({reference['clean'] / clean_seconds:.1f}x), "
+              f"code_line_count {len(documents) / count_seconds:,.0f} docs/s ({reference['count'] / count_seconds:.1f}x)")
@@ -0,0 +1,132 @@
+import hashlib
+import sqlite3
+
+# Chaves consultadas por comando SELECT (abaixo do limite de parâmetros do SQLite)
+_LOOKUP_BATCH = 500
+# Ao passar do tamanho máximo, o cache é reduzido a esta fração dele (para não remover a cada bloco)
+_EVICT_TO = 0.9
+
+
+def body_key(body):
+    """Chave de um body no cache: o hash do texto bruto (bodies iguais têm a mesma chave)."""
+    return hashlib.blake2b(body.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class BodyCache:
+    """
+    Cache persistente dos bodies já limpos, num arquivo SQLite, com chave pelo hash do body bruto:
+    uma nova amostra ou exportação só limpa os bodies que nenhuma execução anterior limpou.
+
+    O cache guarda `version` (as regras de limpeza, html_text.CLEAN_RULES) e é esvaziado quando
+    ela muda. O tamanho dos textos guardados fica limitado a `max_bytes`: passando dele, saem
+    primeiro os bodies usados pela última vez nas execuções mais antigas. Cada instância conta os
+    acertos e as faltas da execução; os totais desde a última invalidação ficam no próprio arquivo.
+    """
+
+    def __init__(self, path, version, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evicted = 0
+        self.invalidated = False
+        # isolation_level=None: as transações são abertas e confirmadas explicitamente
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value)")
+        # used: a execução em que o body foi limpo ou encontrado pela última vez
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS bodies (key BLOB PRIMARY KEY, cleanbody TEXT NOT NULL, "
+            "size INTEGER NOT NULL, used INTEGER NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS bodies_used ON bodies (used)")
+
+        self.connection.execute("BEGIN IMMEDIATE")
+        meta = dict(self.connection.execute("SELECT name, value FROM meta"))
+        if meta.get("version") != version:
+            self.invalidated = "version" in meta
+            self.connection.execute("DELETE FROM bodies")
+            meta = {"version": version, "run": 0, "hits": 0, "misses": 0}
+        self.run = meta["run"] + 1
+        self._totals = (meta["hits"], meta["misses"])
+        meta["run"] = self.run
+        self.connection.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", meta.items())
+        self.connection.execute("COMMIT")
+        self._size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+
+    def lookup(self, bodies):
+        """
+        Procura os bodies no cache. Retorna as chaves de `bodies` (na mesma ordem), os bodies
+        limpos encontrados (chave -> body limpo) e os que faltam limpar, sem repetição (chave -> body).
+        """
+        keys = [body_key(body) for body in bodies]
+        unique = list(dict.fromkeys(keys))
+        found = {}
+        for start in range(0, len(unique), _LOOKUP_BATCH):
+            batch = unique[start:start + _LOOKUP_BATCH]
+            found.update(self.connection.execute(
+                f"SELECT key, cleanbody FROM bodies WHERE key IN ({', '.join('?' * len(batch))})", batch))
+        if found:
+            self.connection.execute("BEGIN")
+            self.connection.executemany(
+                "UPDATE bodies SET used = ? WHERE key = ? AND used < ?", [(self.run, key, self.run) for key in found])
+            self.connection.execute("COMMIT")
+
+        missing = {}
+        for key, body in zip(keys, bodies):
+            if key in found:
+                self.hits += 1
+            else:
+                self.misses += 1
+                missing.setdefault(key, body)
+        return keys, found, missing
+
+    def store(self, cleaned):
+        """Guarda os bodies limpos (chave -> body limpo) e remove os mais antigos se passar do tamanho máximo."""
+        rows = [(key, text, len(key) + len(text.encode("utf-8", "surrogatepass")), self.run) for key, text in cleaned.items()]
+        self.connection.execute("BEGIN")
+        # Um body repetido em blocos limpos ao mesmo tempo chega mais de uma vez; o tamanho somado
+        # a mais é corrigido na próxima remoção
+        self.connection.executemany("INSERT OR IGNORE INTO bodies VALUES (?, ?, ?, ?)", rows)
+        self.connection.execute("COMMIT")
+        self._size += sum(size for _, _, size, _ in rows)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        target = int(self.max_bytes * _EVICT_TO)
+        size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+        evicted = []
+        for key, entry_size in self.connection.execute("SELECT key, size FROM bodies ORDER BY used, rowid"):
+            if size <= target:
+                break
+            evicted.append((key,))
+            size -= entry_size
+        self.connection.execute("BEGIN")
+        self.connection.executemany("DELETE FROM bodies WHERE key = ?", evicted)
+        self.connection.execute("COMMIT")
+        self.evicted += len(evicted)
+        self._size = size
+
+    def summary(self):
+        """Resumo das estatísticas da execução e do cache."""
+        lookups = self.hits + self.misses
+        hits, misses = self._totals[0] + self.hits, self._totals[1] + self.misses
+        entries = self.connection.execute("SELECT COUNT(*) FROM bodies").fetchone()[0]
+        return (f"{self.hits} acertos e {self.misses} faltas ({self.hits / lookups if lookups else 0:.1%} de acertos), "
+                f"{self.evicted} removidos; {entries} bodies ({self._size / 2 ** 20:.1f} MB) em '{self.path}', "
+                f"{hits / (hits + misses) if hits + misses else 0:.1%} de acertos no total")
+
+    def close(self):
+        if self.connection is None:
+            return
+        self.connection.execute("BEGIN")
+        self.connection.executemany("UPDATE meta SET value = ? WHERE name = ?", [
+            (self._totals[0] + self.hits, "hits"), (self._totals[1] + self.misses, "misses")])
+        self.connection.execute("COMMIT")
+        self.connection.close()
+        self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,214 @@
+import html
+import html.entities
+import re
+
+from bs4 import BeautifulSoup
+from bs4.builder import HTMLParserTreeBuilder
+
+# --- Backend 'bs4' (referência): três passagens de regex e BeautifulSoup com html.parser ---
+
+CODE_BLOCKS = re.compile(r"<code>.*?</code>", re.DOTALL)
+MARKDOWN_CODE_BLOCKS = re.compile(r"```.*?```", re.DOTALL)
+LINKS = re.compile(r'https?://\S+|www\.\S+')
+WHITESPACE = re.compile(r"\s+")
+
+def _clean_bs4(text):
+    return _text_bs4(_remove_code_and_links(text))
+
+def _remove_code_and_links(text):
+    # Remove blocos de código entre <code>...</code>
+    text = CODE_BLOCKS.sub("", text)
+
+    # Remove blocos de código em Markdown (``` ... ```)
+    text = MARKDOWN_CODE_BLOCKS.sub("", text)
+
+    # Remove links
+    return LINKS.sub("", text)
+
+def _text_bs4(text):
+    # Remove tags HTML restantes
+    soup = BeautifulSoup(text, "html.parser")
+    cleaned = soup.get_text(separator=" ", strip=True)
+
+    # Remove múltiplos espaços e linhas em branco
+    return WHITESPACE.sub(" ", cleaned).strip()
+
+def _code_line_count_bs4(html_body):
+    soup = BeautifulSoup(html_body, "html.parser")
+    code_lines = 0
+    for code_block in soup.find_all('code'):
+        text = code_block.get_text()
+        if text:
+            code_lines += text.count('\n') + 1
+    return code_lines
+
+# --- Backend 'regex': o mesmo resultado sem montar a árvore ---
+#
+# O texto que o BeautifulSoup devolve é a sequência dos trechos entre as marcações (tags e
+# comentários), com as entidades decodificadas. Quando as marcações de um body são simples, os
+# limites que o html.parser encontra são os de uma regex, e o texto sai de uma única passagem
+# (um split) e de um unescape, feitos em C. Os bodies que o html.parser pode ler de outro jeito
+# (tags que não terminam no primeiro '>', entidades desconhecidas, elementos como <script>) ficam
+# com a referência.
+
+# Uma tag que termina no primeiro '>' (um valor entre aspas logo depois de '=' fecha antes dele)
+# ou um comentário sem '--' dentro. Um '<' de marcação fora disso (por exemplo '<a href=" docs</a>',
+# que sobra quando a remoção de links come a aspa de fechamento de um href) manda o body para a
+# referência
+_TAG_BODY = r"""(?:[^<>=]|=(?:\s*"[^"<>]*"|\s*'[^'<>]*'|(?!\s*["'])))*>"""
+_COMMENT = r"<!--(?!-?>)(?:(?!--).)*-->"
+# O nome vai até um espaço ASCII, '/' ou '>': com outro caractere (como '\xa0') o html.parser lê o
+# nome de uma tag de abertura e o de uma de fechamento de jeitos diferentes
+_MARKUP = re.compile(rf"<(/?)([a-zA-Z][-.a-zA-Z0-9:_]*)(?=[\t\n\r\f />]){_TAG_BODY}|{_COMMENT}", re.DOTALL)
+_MARKUP_START = re.compile(r"<[a-zA-Z/!?]")
+
+_TREE_BUILDER = HTMLParserTreeBuilder()
+# Elementos sem conteúdo (<br>, <img>): abrem e fecham na mesma tag
+_VOID_ELEMENTS = frozenset(_TREE_BUILDER.empty_element_tags)
+_PRESERVE_WHITESPACE = frozenset(_TREE_BUILDER.preserve_whitespace_tags)
+_ASCII_SPACES = BeautifulSoup.ASCII_SPACES
+# Elementos cujo texto o get_text do BeautifulSoup ignora (script, style, rt...) e elementos que
+# mudam a leitura do html.parser
+_SPECIAL_ELEMENTS = re.compile(
+    rf"<(?:{'|'.join(_TREE_BUILDER.string_containers)})(?![a-zA-Z0-9])", re.IGNORECASE)
+# O fechamento de um elemento sem conteúdo ('</br>') pode ser ignorado pelo BeautifulSoup sem
+# separar os trechos de texto em volta dele
+_VOID_END_TAG = re.compile(rf"</(?:{'|'.join(_VOID_ELEMENTS)})(?![-.a-zA-Z0-9:_])", re.IGNORECASE)
+
+# Entidades que o html.parser e o html.unescape decodificam igual: as do HTML 4 com ';' e as Latin-1
+# também sem ';' (desde que o nome não continue, como em '&copyx'); referências numéricas só com
+# ';' e fora dos caracteres de controle, que o BeautifulSoup decodifica de outro jeito
+_LATIN1_ENTITIES = [name for name, codepoint in html.entities.name2codepoint.items() if codepoint < 256]
+_OTHER_ENTITY = re.compile(
+    rf"&(?!(?:{'|'.join(html.entities.name2codepoint)});|(?:{'|'.join(_LATIN1_ENTITIES)})(?![-.a-zA-Z0-9]))[a-zA-Z]")
+_NUMERIC_REFERENCE = re.compile(r"&#(?:([0-9]{1,7})|[xX]([0-9a-fA-F]{1,6}))?(;?)")
+_ENTITY_AT_END = re.compile(r"&#?[a-zA-Z0-9]*\Z")
+
+def _numeric_references_are_safe(text):
+    for match in _NUMERIC_REFERENCE.finditer(text):
+        decimal, hexadecimal, semicolon = match.groups()
+        if not semicolon or not (decimal or hexadecimal):
+            return False
+        codepoint = int(decimal, 10) if decimal else int(hexadecimal, 16)
+        if not (codepoint in (9, 10, 13) or 32 <= codepoint < 127 or 160 <= codepoint < 0xD800
+                or 0xE000 <= codepoint < 0xFDD0 or 0xFDF0 <= codepoint <= 0x10FFFF and codepoint & 0xFFFE != 0xFFFE):
+            return False
+    return True
+
+def _is_simple(text):
+    """As marcações e entidades de `text` são lidas pelo html.parser como pelas regexes acima."""
+    if len(_MARKUP.findall(text)) != len(_MARKUP_START.findall(text)):
+        return False
+    if _SPECIAL_ELEMENTS.search(text) or _VOID_END_TAG.search(text):
+        return False
+    if '&' in text:
+        if _OTHER_ENTITY.search(text) or _ENTITY_AT_END.search(text):
+            return False
+        if '&#' in text and not _numeric_references_are_safe(text):
+            return False
+    return True
+
+def _clean_regex(text):
+    text = _remove_code_and_links(text)
+    if not _is_simple(text):
+        return _text_bs4(text)
+    # Os trechos entre marcações (o split devolve também os dois grupos de cada marcação),
+    # separados por espaço como no get_text(separator=" ")
+    cleaned = " ".join(_MARKUP.split(text)[::3])
+    if '&' in cleaned:
+        cleaned = html.unescape(cleaned)
+    return WHITESPACE.sub(" ", cleaned).strip()
+
+def _code_line_count_regex(html_body):
+    # Sem <code> não há linhas de código ('<!' pode ser uma declaração que o html.parser rejeita)
+    if '<code' not in html_body.lower() and '<!' not in html_body:
+        return 0
+    if not _is_simple(html_body):
+        return _code_line_count_bs4(html_body)
+    # Pilha das tags abertas como a do BeautifulSoup: um fechamento tira da pilha tudo até a tag
+    # aberta de mesmo nome e é ignorado se não há nenhuma; cada <code> aberto junta o seu texto
+    stack = []
+    open_codes = preserving = code_lines = position = 0
+    for match in _MARKUP.finditer(html_body):
+        if open_codes and match.start() > position:
+            segment = _code_segment(html_body[position:match.start()], preserving)
+            for _, code_text in stack:
+                if code_text is not None:
+                    code_text.append(segment)
+        position = match.end()
+        closing, name = match.groups()
+        if name is None:
+            continue
+        name = name.lower()
+        if closing:
+            if any(open_name == name for open_name, _ in stack):
+                while True:
+                    open_name, code_text = stack.pop()
+                    if code_text is not None:
+                        open_codes -= 1
+                        code_lines += _lines(code_text)
+                    preserving -= open_name in _PRESERVE_WHITESPACE
+                    if open_name == name:
+                        break
+        elif name not in _VOID_ELEMENTS:
+            if match.group().endswith('/>'):
+                # Se a tag fecha em si mesma depende de como o html.parser lê o último atributo
+                return _code_line_count_bs4(html_body)
+            stack.append((name, [] if name == 'code' else None))
+            open_codes += name == 'code'
+            preserving += name in _PRESERVE_WHITESPACE
+    if open_codes and position < len(html_body):
+        segment = _code_segment(html_body[position:], preserving)
+        for _, code_text in stack:
+            if code_text is not None:
+                code_text.append(segment)
+    return code_lines + sum(_lines(code_text) for _, code_text in stack if code_text is not None)
+
+def _code_segment(segment, preserving):
+    """O texto de um trecho como o BeautifulSoup guarda."""
+    if '&' in segment:
+        segment = html.unescape(segment)
+    # Um trecho só de espaços ASCII vira um '\n' (ou um ' '), exceto dentro de <pre> e <textarea>
+    if not preserving and not segment.strip(_ASCII_SPACES):
+        return '\n' if '\n' in segment else ' '
+    return segment
+
+def _lines(code_text):
+    text = "".join(code_text)
+    return text.count('\n') + 1 if text else 0
+
+# Backends disponíveis: nome -> (limpeza do body, contagem de linhas de código)
+BACKENDS = {
+    'bs4': (_clean_bs4, _code_line_count_bs4),
+    'regex': (_clean_regex, _code_line_count_regex),
+}
+DEFAULT_BACKEND = 'regex'
+
+# Identificação das regras de limpeza de clean_html, guardada com os bodies limpos em cache (ver
+# body_cache.py): muda com as regexes de remoção e com CLEAN_RULES_VERSION, que deve ser
+# incrementada em qualquer outra mudança no resultado da limpeza
+CLEAN_RULES_VERSION = 1
+CLEAN_RULES = "\n".join(
+    [f"v{CLEAN_RULES_VERSION}"] + [regex.pattern for regex in (CODE_BLOCKS, MARKDOWN_CODE_BLOCKS, LINKS, WHITESPACE)])
+
+def _backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de HTML inválido: '{backend}' (use {' ou '.join(repr(name) for name in BACKENDS)}).")
+    return BACKENDS[backend]
+
+def clean_html(text, backend=DEFAULT_BACKEND):
+    """
+    Texto de um body sem blocos de código (<code> e ``` ```), links e tags HTML, com os espaços
+    normalizados. O backend 'bs4' é a referência; 'regex' dá o mesmo resultado bem mais rápido
+    (ver benchmark_html_text.py) e usa a referência nos bodies que o html.parser pode ler de
+    outro jeito.
+    """
+    if not text:
+        return ""
+    return _backend(backend)[0](text)
+
+def code_line_count(html_body, backend=DEFAULT_BACKEND):
+    """Linhas de texto dentro das tags <code> de um body (um bloco sem '\\n' conta uma linha)."""
+    if not html_body:
+        return 0
+    return _backend(backend)[1](html_body)
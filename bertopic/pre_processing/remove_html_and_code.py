@@ -1,38 +1,122 @@
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
-from bs4 import BeautifulSoup
-import re
 
-TAG = "python"
+from body_cache import BodyCache
+from html_text import CLEAN_RULES, clean_html
+
+# Tags limpas em uma única execução (também podem ser passadas na linha de comando:
+# python remove_html_and_code.py python java)
+TAGS = ["python"]
+
+# Linhas do CSV lidas e limpas por vez; o arquivo nunca é carregado inteiro na memória
+CHUNK_SIZE = 2000
+
+# Processos usados para limpar os bodies; 1 limpa no próprio processo
+NUM_WORKERS = os.cpu_count() or 1
+
+# Backend da limpeza do HTML (ver html_text.py): 'regex' (rápido) ou 'bs4' (a referência)
+HTML_BACKEND = "regex"
 
-csv_path = f"../../../{TAG}-sample.csv"
-output_path = f"../../../{TAG}-no-code.csv"
+# Cache dos bodies já limpos, mantido entre execuções (None desliga): um body limpo numa amostra ou
+# exportação anterior não é limpo de novo. É invalidado quando as regras de limpeza mudam
+BODY_CACHE_PATH = "../../../cleanbody-cache.sqlite"
+# Tamanho máximo dos textos no cache, em MB; os bodies usados há mais execuções saem primeiro
+BODY_CACHE_MAX_MB = 2048
 
-df = pd.read_csv(csv_path)
+
+def input_csv_path(tag):
+    return f"../../../{tag}-sample.csv"
+
+def output_csv_path(tag):
+    return f"../../../{tag}-no-code.csv"
 
 def clean_body(text):
     if pd.isna(text):
         return ""
 
-    # Remove blocos de código entre <code>...</code>
-    text = re.sub(r"<code>.*?</code>", "", text, flags=re.DOTALL)
-
-    # Remove blocos de código em Markdown (``` ... ```)
-    text = re.sub(r"```.*?```", "", text, flags=re.DOTALL)
-
-    # Remove links
-    text = re.sub(r'https?://\S+|www\.\S+', '', text)
+    # Remove blocos de código, links e tags HTML e normaliza os espaços
+    return clean_html(text, HTML_BACKEND)
 
-    # Remove tags HTML restantes
-    soup = BeautifulSoup(text, "html.parser")
-    cleaned = soup.get_text(separator=" ", strip=True)
+def clean_bodies(bodies):
+    """Limpa os bodies de um bloco do CSV (uma tarefa do pool de processos)."""
+    return [clean_body(text) for text in bodies]
 
-    # Remove múltiplos espaços e linhas em branco
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+def clean_csv(tag, executor, cache=None):
+    """
+    Lê o CSV da tag em blocos de CHUNK_SIZE linhas, limpa os bodies de cada bloco no pool de
+    processos e grava {tag}-no-code.csv aos poucos, na ordem de entrada. No máximo dois blocos
+    por processo ficam em andamento, o que limita a memória usada em exportações completas.
+    Com `cache` (um BodyCache), só os bodies que não estão nele são limpos e depois guardados.
+    A saída é escrita num arquivo temporário e só substitui a anterior quando termina.
+    Retorna o número de linhas gravadas.
+    """
+    csv_path = input_csv_path(tag)
+    output_path = output_csv_path(tag)
+    temp_path = output_path + ".tmp"
+    max_pending = 2 * NUM_WORKERS
+    pending = deque()
+    rows = 0
 
-    return cleaned
+    def write_next(f):
+        nonlocal rows
+        chunk, keys, found, missing, cleaned = pending.popleft()
+        cleaned = cleaned.result() if executor else cleaned
+        if cache is not None:
+            cleaned = dict(zip(missing, cleaned))
+            cache.store(cleaned)
+            found.update(cleaned)
+            cleaned = [found[key] for key in keys]
+        chunk["cleanbody"] = cleaned
+        chunk.to_csv(f, index=False, header=rows == 0)
+        rows += len(chunk)
 
-df["cleanbody"] = df["body"].apply(clean_body)
+    with open(temp_path, "w", encoding="utf-8", newline="") as f:
+        # Lidos como texto: os valores das demais colunas são gravados como vieram
+        # (sem ids virando 123.0 num bloco que tem valores vazios)
+        for chunk in pd.read_csv(csv_path, chunksize=CHUNK_SIZE, dtype=str, keep_default_na=False):
+            bodies = chunk["body"].tolist()
+            keys = found = missing = None
+            if cache is not None:
+                keys, found, missing = cache.lookup(bodies)
+                bodies = list(missing.values())
+            cleaned = executor.submit(clean_bodies, bodies) if executor else clean_bodies(bodies)
+            pending.append((chunk, keys, found, missing, cleaned))
+            while len(pending) > max_pending:
+                write_next(f)
+        while pending:
+            write_next(f)
+    os.replace(temp_path, output_path)
+    return rows
 
-df.to_csv(output_path, index=False, encoding="utf-8")
+if __name__ == "__main__":
+    tags = sys.argv[1:] or TAGS
+    executor = ProcessPoolExecutor(max_workers=NUM_WORKERS) if NUM_WORKERS > 1 else None
+    cache = BodyCache(BODY_CACHE_PATH, CLEAN_RULES, BODY_CACHE_MAX_MB * 2 ** 20) if BODY_CACHE_PATH else None
+    if cache is not None and cache.invalidated:
+        print(f"Regras de limpeza alteradas: cache '{BODY_CACHE_PATH}' esvaziado")
+    missing = []
+    try:
+        for tag in tags:
+            if not os.path.exists(input_csv_path(tag)):
+                print(f"ERRO: Arquivo não encontrado em {input_csv_path(tag)}")
+                missing.append(tag)
+                continue
+            started = time.monotonic()
+            rows = clean_csv(tag, executor, cache)
+            elapsed = time.monotonic() - started
+            print(f"Arquivo salvo como '{output_csv_path(tag)}' ({rows} linhas em {elapsed:.1f}s)")
+    finally:
+        if executor:
+            executor.shutdown()
+        if cache is not None:
+            print(f"Cache: {cache.summary()}")
+            cache.close()
 
-print(f"Arquivo salvo como '{output_path}'")
+    if missing:
+        print(f"--- Tags sem CSV de entrada: {', '.join(missing)} ---")
+        raise SystemExit(1)
@@ -1,7 +1,14 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
 
 TAG = "julia"
 
+# Opcional: filtered_Posts.xml com o índice de pre_filter_tags/post_index.py, para mostrar
+# também a pergunta original e suas respostas direto do XML (None desativa)
+FILTERED_POSTS_XML = None
+
 csv_path = f"../../../{TAG}-no-code.csv"
 df = pd.read_csv(csv_path)
 
@@ -19,3 +26,16 @@ if 0 <= index_to_show < len(df):
     print("-" * 80)
 else:
     print(f"Indice {index_to_show} fora do intervalo (0 a {len(df)-1})")
+
+if FILTERED_POSTS_XML is not None and 0 <= index_to_show < len(df):
+    sys.path.append(str(Path(__file__).resolve().parents[2] / "pre_filter_tags"))
+    from post_index import PostIndex
+
+    with PostIndex(Path(FILTERED_POSTS_XML)) as index:
+        thread = index.thread(df.loc[index_to_show, "id"])
+    print(f"\n🧩 Post {df.loc[index_to_show, 'id']} no XML filtrado — pergunta e {max(len(thread) - 1, 0)} respostas:")
+    for _, row in thread:
+        print("-" * 80)
+        print(f"Id {row['Id']} (PostTypeId {row.get('PostTypeId')})")
+        print(row.get("Body", ""))
+    print("-" * 80)
@@ -0,0 +1,114 @@
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+from xml.sax.saxutils import quoteattr
+
+from row_validation import VALUE_PATTERNS, RowValidator
+from run_metrics import FileProgress
+from xml_to_sql import COPY_FORMATS, SCHEMA, compile_row_formatter, format_value, iter_table_rows
+
+# --- CONFIGURAÇÃO ---
+# Linhas do filtered_Posts.xml sintético
+NUM_ROWS = 100_000
+# Repetições de cada medição (vale a melhor)
+REPEAT = 3
+SEED = 42
+# --- FIM DA CONFIGURAÇÃO ---
+
+COLUMNS = SCHEMA['filtered_Posts.xml']['columns']
+
+# Datas no formato do dump que a conferência em bloco e a conferência valor a valor devem tratar
+# igual (também escritas como 'AAAA-MM-DD HH:MM:SS', que só passa pela conferência valor a valor)
+DATE_CASES = [
+    '2024-02-29T10:00:00.000', '2023-02-29T10:00:00.000', '2000-02-29T00:00:00.000', '1900-02-29T00:00:00.000',
+    '0000-01-01T00:00:00.000', '0001-01-01T00:00:00.000', '0999-12-31T23:59:59.999', '2019-04-31T12:00:00.000',
+    '2019-12-31T23:59:59.999', '2019-13-01T00:00:00.000', '2019-01-01T24:00:00.000',
+]
+
+def write_synthetic_posts(path, num_rows):
+    """Gera um filtered_Posts.xml com perguntas e respostas, atributos opcionais ausentes e corpos com aspas."""
+    rng = random.Random(SEED)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<posts>\n')
+        for post_id in range(1, num_rows + 1):
+            question = post_id == 1 or rng.random() < 0.4
+            row = {
+                'Id': post_id,
+                'PostTypeId': 1 if question else 2,
+                'AcceptedAnswerId': post_id + 1 if question and rng.random() < 0.5 else None,
+                'ParentId': None if question else rng.randint(1, post_id - 1),
+                'CreationDate': f'20{rng.randint(18, 25)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T10:00:00.{post_id % 1000:03d}',
+                'Score': rng.randint(-5, 50),
+                'ViewCount': rng.randint(1, 10_000) if question else None,
+                'Body': "<p>It's a \"test\" body\n" + 'x' * rng.randint(100, 1500) + '</p>',
+                'OwnerUserId': rng.randint(1, 100_000),
+                'LastActivityDate': '2024-01-01T00:00:00.000',
+                'Title': f"Question {post_id}: can't parse" if question else None,
+                'Tags': '|python|pandas|' if question else None,
+                'AnswerCount': rng.randint(0, 5) if question else None,
+                'CommentCount': rng.randint(0, 5),
+                'ContentLicense': 'CC BY-SA 4.0',
+            }
+            f.write('  <row ' + ' '.join(f'{key}={quoteattr(str(value))}' for key, value in row.items() if value is not None) + ' />\n')
+        f.write('</posts>\n')
+
+def format_row_per_value(values, output_format):
+    """Formatação anterior: a função de valor (format_value etc.) aplicada a cada coluna."""
+    if output_format == 'insert':
+        return f"({', '.join([format_value(value, col_type) for value, (_, col_type) in zip(values, COLUMNS)])})"
+    format_copy_value, separator, _, _ = COPY_FORMATS[output_format]
+    return separator.join([format_copy_value(value, col_type) for value, (_, col_type) in zip(values, COLUMNS)])
+
+def date_mismatches(directory):
+    """Casos de DATE_CASES em que o resultado de RowValidator difere da conferência valor a valor."""
+    columns = [('Id', 'int'), ('CreationDate', 'timestamp')]
+    valid_rows = [(str(row_id), '2020-06-15T08:30:00.000') for row_id in range(1, 100)]
+    mismatches = []
+    for value in DATE_CASES:
+        for text in (value, value[:19].replace('T', ' ')):
+            expected = RowValidator._value_is_valid(text, 'timestamp', re.compile(VALUE_PATTERNS['timestamp'], re.ASCII))
+            with RowValidator(columns, ('id',), Path(directory) / 'date-rejects.jsonl') as validator:
+                kept = validator.validate(valid_rows + [('100', text)])
+            if (len(kept) == len(valid_rows) + 1) != expected:
+                mismatches.append(text)
+    return mismatches
+
+def best_time(function):
+    best = None
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'filtered_Posts.xml'
+        print(f"Gerando {NUM_ROWS} posts sintéticos em '{path}'...")
+        write_synthetic_posts(path, NUM_ROWS)
+        started = time.perf_counter()
+        rows = list(iter_table_rows(path, COLUMNS, FileProgress(path.name)))
+        parse_seconds = time.perf_counter() - started
+        print(f"Leitura do XML (ElementTree): {NUM_ROWS / parse_seconds:,.0f} linhas/s\n")
+
+        mismatches = date_mismatches(directory)
+        if mismatches:
+            raise SystemExit(f"--- Datas tratadas de forma diferente pelas conferências em bloco e valor a valor: {mismatches} ---")
+
+        validator = RowValidator(COLUMNS, ('id',), Path(directory) / 'rejects.jsonl')
+        validate_seconds, _ = best_time(lambda: list(validator.filter(rows)))
+        if validator.rejected:
+            raise SystemExit("--- A validação rejeitou linhas válidas. ---")
+
+    for output_format in ('insert', 'copy-text', 'copy-csv'):
+        format_row = compile_row_formatter(COLUMNS, output_format)
+        before, expected = best_time(lambda: [format_row_per_value(values, output_format) for values in rows])
+        after, formatted = best_time(lambda: [format_row(values) for values in rows])
+        if formatted != expected:
+            raise SystemExit(f"--- {output_format}: a formatação compilada difere da formatação por valor. ---")
+        print(f"{output_format}: por valor {NUM_ROWS / before:,.0f} linhas/s, "
+              f"compilada {NUM_ROWS / after:,.0f} linhas/s ({before / after:.1f}x); validação (VALIDATE_ROWS) "
+              f"= {100 * validate_seconds / (parse_seconds + after + validate_seconds):.1f}% do tempo de conversão")
@@ -0,0 +1,70 @@
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from dump_reader import iter_rows
+
+# --- CONFIGURAÇÃO ---
+INPUT_DIR = Path('../stackoverflow-data/stackoverflow.com')
+
+FILES_TO_CHECK = [
+    'Tags.xml', 'Posts.xml', 'Comments.xml', 'Votes.xml',
+    'PostHistory.xml', 'PostLinks.xml', 'Users.xml', 'Badges.xml',
+]
+
+# Atributos lidos pelo leitor rápido em filter_dump_data.py
+CHECK_FIELDS = (
+    'Id', 'ParentId', 'PostTypeId', 'Tags', 'CreationDate', 'PostId', 'UserId',
+    'OwnerUserId', 'LastEditorUserId', 'RelatedPostId', 'TagName', 'Date',
+)
+
+# Limite de linhas verificadas por arquivo (None = arquivo inteiro)
+MAX_ROWS = 1_000_000
+MAX_REPORTED_MISMATCHES = 10
+# --- FIM DA CONFIGURAÇÃO ---
+
+def check_file(source_file):
+    """
+    Compara, linha a linha, o leitor rápido (iter_rows) com o ElementTree:
+    os atributos extraídos devem ser iguais e a linha copiada byte a byte deve
+    representar exatamente o mesmo elemento que o ElementTree leu.
+    """
+    print(f"Verificando {source_file.name}...")
+    et_rows = (elem for _, elem in ET.iterparse(source_file, events=('end',)) if elem.tag == 'row')
+    fast_rows = iter_rows(source_file, CHECK_FIELDS)
+
+    checked = 0
+    mismatches = 0
+    for elem, (raw, row) in zip(et_rows, fast_rows):
+        expected = {field: elem.get(field) for field in CHECK_FIELDS if elem.get(field) is not None}
+        problem = None
+        if row != expected:
+            problem = f"atributos diferentes: rápido={row} ElementTree={expected}"
+        elif ET.fromstring(raw.strip()).attrib != elem.attrib:
+            problem = "a linha copiada não corresponde ao elemento lido pelo ElementTree"
+
+        if problem:
+            mismatches += 1
+            if mismatches <= MAX_REPORTED_MISMATCHES:
+                print(f"  Linha {checked + 1}: {problem}")
+
+        checked += 1
+        elem.clear()
+        if MAX_ROWS and checked >= MAX_ROWS:
+            break
+
+    print(f"{source_file.name}: {checked} linhas verificadas, {mismatches} divergências.\n")
+    return mismatches
+
+if __name__ == '__main__':
+    total_mismatches = 0
+    for filename in FILES_TO_CHECK:
+        source_file = INPUT_DIR / filename
+        if not source_file.exists():
+            print(f"Arquivo {source_file} não encontrado. Pulando.\n")
+            continue
+        total_mismatches += check_file(source_file)
+
+    if total_mismatches:
+        print(f"--- Paridade FALHOU: {total_mismatches} divergências encontradas. ---")
+        raise SystemExit(1)
+    print("--- Paridade confirmada: leitor rápido e ElementTree produzem as mesmas linhas. ---")
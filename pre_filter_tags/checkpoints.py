@@ -0,0 +1,99 @@
+import json
+import os
+import re
+import shutil
+
+from id_sets import IdSet
+
+# Arquivo com a configuração da execução que gravou os checkpoints
+CONFIG_FILENAME = 'config.json'
+
+
+class CheckpointStore:
+    """
+    Guarda o progresso de uma execução longa numa pasta: para cada chave (uma etapa, um arquivo
+    ou um shard), um JSON com o estado (posições, contagens) e os IdSets encontrados até ali.
+    Cada gravação usa um número de sequência nos nomes dos IdSets e troca o JSON de forma
+    atômica, então uma interrupção no meio da gravação mantém o checkpoint anterior válido.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _state_path(self, key):
+        if not re.fullmatch(r'[\w.-]+', key):
+            raise ValueError(f"Chave de checkpoint inválida: {key!r}")
+        return self.directory / f'{key}.json'
+
+    def matches_config(self, config):
+        """
+        Indica se os checkpoints existentes foram gravados com a mesma configuração. Se não
+        foram (ou não existem), descarta tudo e registra `config` para a execução atual.
+        """
+        config_path = self.directory / CONFIG_FILENAME
+        if config_path.exists():
+            with open(config_path, encoding='utf-8') as f:
+                if json.load(f) == config:
+                    return True
+        self.clear()
+        os.makedirs(self.directory, exist_ok=True)
+        _write_json(config_path, config)
+        return False
+
+    def load(self, key):
+        """Retorna (estado, {nome: IdSet}) da chave, ou (None, {}) se não houver checkpoint."""
+        state_path = self._state_path(key)
+        if not state_path.exists():
+            return None, {}
+        with open(state_path, encoding='utf-8') as f:
+            saved = json.load(f)
+        id_sets = {name: IdSet.load(self.directory / filename) for name, filename in saved['id_sets'].items()}
+        return saved['state'], id_sets
+
+    def save(self, key, state, id_sets=None):
+        """Grava o estado e os IdSets da chave, substituindo o checkpoint anterior."""
+        os.makedirs(self.directory, exist_ok=True)
+        state_path = self._state_path(key)
+        sequence = 0
+        if state_path.exists():
+            with open(state_path, encoding='utf-8') as f:
+                sequence = json.load(f)['sequence'] + 1
+
+        filenames = {}
+        for name, id_set in (id_sets or {}).items():
+            filenames[name] = f'{key}.{sequence}.{name}.ids'
+            id_set.save(self.directory / filenames[name])
+        _write_json(state_path, {'sequence': sequence, 'state': state, 'id_sets': filenames})
+
+        # Os IdSets da gravação anterior não são mais referenciados
+        for name in (id_sets or {}):
+            previous = self.directory / f'{key}.{sequence - 1}.{name}.ids'
+            if previous.exists():
+                os.remove(previous)
+
+    def discard(self, key):
+        """Remove o checkpoint de uma chave e os IdSets associados."""
+        state_path = self._state_path(key)
+        if not state_path.exists():
+            return
+        with open(state_path, encoding='utf-8') as f:
+            filenames = json.load(f)['id_sets'].values()
+        os.remove(state_path)
+        for filename in filenames:
+            if (self.directory / filename).exists():
+                os.remove(self.directory / filename)
+
+    def clear(self):
+        """Remove todos os checkpoints."""
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
+
+
+def _write_json(path, data):
+    """Grava um JSON de forma atômica (arquivo temporário + rename), sincronizando com o disco."""
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
@@ -0,0 +1,332 @@
+import xml.etree.ElementTree as ET
+import bz2
+import gzip
+import html
+import os
+import re
+import shutil
+import signal
+import subprocess
+from contextlib import contextmanager
+
+try:
+    import zstandard
+except ImportError:  # Opcional: sem o módulo, arquivos .zst são lidos com o executável `zstd`
+    zstandard = None
+
+# Tamanho dos blocos lidos do disco ao procurar fronteiras e alimentar o parser
+READ_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Extensões de arquivos compactados aceitas como entrada
+COMPRESSED_SUFFIXES = ('.zst', '.bz2', '.gz', '.7z')
+
+# Descompactadores externos, do mais rápido (paralelo) para o mais simples
+EXTERNAL_DECOMPRESSORS = {
+    '.bz2': [['lbzip2', '-dc'], ['pbzip2', '-dc']],
+    '.gz': [['pigz', '-dc']],
+    '.zst': [['zstd', '-dc']],
+    '.7z': [['7z', 'x', '-so'], ['7za', 'x', '-so'], ['7zz', 'x', '-so']],
+}
+
+
+def find_dump_file(directory, filename):
+    """
+    Localiza um arquivo do dump (ex.: 'Posts.xml') em `directory`, aceitando tanto o XML
+    descompactado quanto os arquivos compactados: 'Posts.xml.zst', 'Posts.xml.bz2',
+    'Posts.xml.gz', 'Posts.7z' ou 'stackoverflow.com-Posts.7z'. Retorna None se não existir.
+    """
+    stem = filename[:-len('.xml')] if filename.endswith('.xml') else filename
+    candidates = [directory / filename]
+    candidates += [directory / f'{filename}{suffix}' for suffix in ('.zst', '.bz2', '.gz')]
+    candidates.append(directory / f'{stem}.7z')
+    candidates += sorted(directory.glob(f'*-{stem}.7z'))
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def strip_compression_suffix(name):
+    """Remove a extensão de compressão de um nome de arquivo ('filtered_Posts.xml.zst' -> 'filtered_Posts.xml')."""
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def is_compressed(path):
+    """Indica se o arquivo é lido através de um descompactador (e, portanto, não permite seek)."""
+    return path.suffix in COMPRESSED_SUFFIXES
+
+
+def _external_decompressor(suffix):
+    """Retorna o primeiro comando de descompactação disponível no PATH para a extensão."""
+    for command in EXTERNAL_DECOMPRESSORS.get(suffix, []):
+        if shutil.which(command[0]):
+            return command
+    return None
+
+
+@contextmanager
+def open_dump(path):
+    """
+    Abre um arquivo do dump para leitura binária sequencial, descompactando em fluxo se necessário.
+    Prefere um descompactador externo paralelo (lbzip2/pbzip2, pigz); sem ele, usa os módulos
+    bz2/gzip/zstandard. Arquivos .7z exigem o executável 7z.
+    """
+    suffix = path.suffix
+    if suffix not in COMPRESSED_SUFFIXES:
+        with open(path, 'rb') as f:
+            yield f
+        return
+
+    command = _external_decompressor(suffix)
+    if command is None or (suffix == '.zst' and zstandard is not None):
+        openers = {'.bz2': bz2.open, '.gz': gzip.open}
+        if zstandard is not None:
+            openers['.zst'] = zstandard.open
+        if suffix not in openers:
+            raise RuntimeError(f"Nenhum descompactador disponível para '{path}' (instale {EXTERNAL_DECOMPRESSORS[suffix][0][0]}).")
+        with openers[suffix](path, 'rb') as f:
+            yield f
+        return
+
+    process = subprocess.Popen(command + [str(path)], stdout=subprocess.PIPE, bufsize=READ_BLOCK_SIZE)
+    try:
+        yield process.stdout
+    finally:
+        process.stdout.close()
+        return_code = process.wait()
+    # Se a leitura parou antes do fim, o descompactador termina com SIGPIPE, o que não é um erro
+    if return_code not in (0, -signal.SIGPIPE):
+        raise RuntimeError(f"Falha ao descompactar '{path}' ({' '.join(command)} retornou {return_code}).")
+
+
+# Início de uma linha <row (a quebra de linha anterior, a indentação e a tag)
+ROW_LINE_START = re.compile(rb'\n[ \t]*<row[ \t/]')
+
+
+def find_row_boundary(f, offset):
+    """
+    Retorna a posição do início da primeira linha <row que começa em ou após `offset`.
+    A posição devolvida é o começo da linha (incluindo a indentação), para que cada
+    shard contenha apenas linhas completas.
+    """
+    # Começa um byte antes para reconhecer uma linha que começa exatamente em `offset`
+    position = max(0, offset - 1)
+    f.seek(position)
+    buffer = b''
+    while True:
+        block = f.read(READ_BLOCK_SIZE)
+        if not block:
+            return None
+        buffer += block
+        match = ROW_LINE_START.search(buffer)
+        if match:
+            return position + match.start() + 1
+        # Mantém o final do bloco, caso o início da linha esteja dividido entre dois blocos
+        keep = min(len(buffer), 64)
+        position += len(buffer) - keep
+        buffer = buffer[-keep:]
+
+
+def find_rows_end(f):
+    """Retorna a posição logo após o último '/>' do arquivo (fim da última linha <row)."""
+    size = f.seek(0, os.SEEK_END)
+    position = size
+    tail = b''
+    while position > 0:
+        start = max(0, position - READ_BLOCK_SIZE)
+        f.seek(start)
+        tail = f.read(position - start) + tail
+        index = tail.rfind(b'/>')
+        if index != -1:
+            return start + index + 2
+        position = start
+        tail = tail[:2]
+    return 0
+
+
+def split_into_shards(path, num_shards, start=0):
+    """
+    Divide um arquivo do dump (a partir da posição `start`) em até `num_shards` intervalos
+    de bytes [início, fim), alinhados nas fronteiras das linhas <row. O cabeçalho XML e a
+    tag raiz ficam de fora.
+    """
+    with open(path, 'rb') as f:
+        rows_start = find_row_boundary(f, start)
+        if rows_start is None:
+            return []
+        rows_end = find_rows_end(f)
+        if rows_end <= rows_start:
+            return []
+
+        shard_size = max(1, (rows_end - rows_start) // num_shards)
+        boundaries = [rows_start]
+        for i in range(1, num_shards):
+            boundary = find_row_boundary(f, rows_start + i * shard_size)
+            if boundary is None or boundary >= rows_end:
+                break
+            if boundary > boundaries[-1]:
+                boundaries.append(boundary)
+        boundaries.append(rows_end)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def find_rows_after_id(path, min_id):
+    """
+    Retorna a posição de uma linha <row a partir da qual estão todas as linhas com Id maior que
+    `min_id`, num arquivo descompactado ordenado por Id (como os do dump). A busca binária pula
+    a maior parte do arquivo; algumas linhas com Id <= min_id podem sobrar no início do intervalo
+    e devem ser descartadas por quem lê.
+    """
+    with open(path, 'rb') as f:
+        low = find_row_boundary(f, 0)
+        if low is None:
+            return None
+        high = f.seek(0, os.SEEK_END)
+        while high - low > READ_BLOCK_SIZE:
+            # Pula o resto da linha em que `middle` caiu; a seguinte começa uma row
+            f.seek((low + high) // 2)
+            f.readline()
+            middle = f.tell()
+            line = f.readline()
+            row = parse_row_line(line, ('Id',))
+            if row is None and line.lstrip().startswith(b'<row') and line.rstrip().endswith(b'/>'):
+                row = _parse_row_fallback(line, ('Id',))
+            if middle >= high or not row:
+                break
+            if int(row['Id']) <= min_id:
+                low = middle
+            else:
+                high = middle
+        return low
+
+
+# Cache das chaves de busca (b' Id="', b' PostId="', ...) usadas por parse_row_line
+_FIELD_KEYS = {}
+
+
+def _field_key(field):
+    """Retorna a sequência de bytes que inicia o atributo `field` numa linha."""
+    key = _FIELD_KEYS.get(field)
+    if key is None:
+        key = _FIELD_KEYS[field] = f' {field}="'.encode()
+    return key
+
+
+def parse_row_line(line, fields):
+    """
+    Extrai os atributos `fields` diretamente dos bytes de uma linha '<row ... />'.
+    Retorna None se a linha não estiver no formato simples esperado (uma linha por row,
+    atributos entre aspas duplas), caso em que o chamador deve recorrer ao ElementTree.
+    """
+    content = line.strip()
+    if not content.startswith(b'<row ') or not content.endswith(b'/>'):
+        return None
+    # Cada atributo no formato simples contribui exatamente um '="' e duas aspas duplas;
+    # qualquer outra forma (aspas simples, espaços ao redor do '=') vai para o ElementTree
+    if content.count(b'"') != 2 * content.count(b'="'):
+        return None
+
+    row = {}
+    for field in fields:
+        key = _field_key(field)
+        index = content.find(key)
+        if index == -1:
+            continue
+        value_start = index + len(key)
+        value_end = content.find(b'"', value_start)
+        if value_end == -1:
+            return None
+        value = content[value_start:value_end].decode('utf-8')
+        row[field] = html.unescape(value) if '&' in value else value
+    return row
+
+
+def _parse_row_fallback(raw, fields):
+    """Interpreta uma linha fora do formato simples com ElementTree."""
+    elem = ET.fromstring(raw.strip())
+    return {field: elem.get(field) for field in fields if elem.get(field) is not None}
+
+
+class RowScanner:
+    """
+    Itera sobre as linhas <row> de um arquivo do dump, devolvendo (bytes_da_linha, atributos).
+    Os dumps do Stack Exchange têm uma row por linha, então os atributos pedidos são extraídos
+    direto dos bytes e a linha original pode ser copiada para a saída sem reserialização.
+    Linhas fora desse formato (ex.: uma row quebrada em várias linhas) são acumuladas e
+    interpretadas com ElementTree. Com [start, end), lê apenas um intervalo de bytes (ex.: um
+    shard ou a retomada após um checkpoint); em arquivos compactados, os bytes anteriores a
+    `start` são descompactados e descartados.
+    `prefilter`, se dado, recebe os bytes de cada linha com uma row completa antes da extração
+    dos atributos; linhas para as quais devolve False são puladas sem serem interpretadas (e
+    contadas em `skipped`; `last_skipped` guarda a última delas e a posição logo após ela).
+    Durante a iteração, `position` é a posição logo após a última linha devolvida; ao final, é o
+    fim do intervalo (ou do arquivo), e `last_yielded_position` continua sendo a posição logo após
+    a última linha devolvida (para saber se a última linha do intervalo foi devolvida ou pulada).
+    """
+
+    def __init__(self, path, fields, start=None, end=None, prefilter=None):
+        self.path = path
+        self.fields = fields
+        self.start = start
+        self.end = end
+        self.prefilter = prefilter
+        self.position = self.last_yielded_position = start or 0
+        self.skipped = 0
+        self.last_skipped = None
+
+    def __iter__(self):
+        path, fields, end, prefilter = self.path, self.fields, self.end, self.prefilter
+        with open_dump(path) as f:
+            position = 0
+            if self.start:
+                if is_compressed(path):
+                    while position < self.start:
+                        block = f.read(min(READ_BLOCK_SIZE, self.start - position))
+                        if not block:
+                            break
+                        position += len(block)
+                else:
+                    f.seek(self.start)
+                    position = self.start
+
+            pending = b''
+            for line in f:
+                position += len(line)
+
+                if pending:
+                    pending += line
+                    if line.rstrip().endswith(b'/>'):
+                        self.position = self.last_yielded_position = position
+                        yield pending, _parse_row_fallback(pending, fields)
+                        pending = b''
+                elif b'<row' in line:
+                    if prefilter is not None and line.rstrip().endswith(b'/>') and not prefilter(line):
+                        self.skipped += 1
+                        self.last_skipped = (line, position)
+                        if end is not None and position >= end:
+                            break
+                        continue
+                    row = parse_row_line(line, fields)
+                    self.position = self.last_yielded_position = position
+                    if row is not None:
+                        yield line, row
+                    elif line.rstrip().endswith(b'/>'):
+                        yield line, _parse_row_fallback(line, fields)
+                    else:
+                        pending = line
+
+                if end is not None and position >= end:
+                    break
+
+            self.position = position
+            if pending:
+                raise ValueError(f"Linha <row> incompleta no final de '{path}' (posição {position}).")
+
+
+def iter_rows(path, fields, start=None, end=None, prefilter=None):
+    """Itera sobre as linhas <row> de um arquivo do dump (ver RowScanner)."""
+    return iter(RowScanner(path, fields, start, end, prefilter))
@@ -0,0 +1,156 @@
+import gzip
+import os
+import shutil
+import subprocess
+
+try:
+    import zstandard
+except ImportError:  # Opcional: sem o módulo, a compressão zstd usa o executável `zstd`
+    zstandard = None
+
+# Extensão acrescentada aos arquivos de saída para cada tipo de compressão
+COMPRESSION_SUFFIXES = {None: '', 'zstd': '.zst', 'gzip': '.gz'}
+
+
+def compressed_name(name, compression):
+    """Nome do arquivo de saída com a extensão da compressão escolhida (ex.: 'filtered_Posts.xml.zst')."""
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Compressão desconhecida: {compression!r}. Use uma de {list(COMPRESSION_SUFFIXES)}.")
+    return name + COMPRESSION_SUFFIXES[compression]
+
+
+def _zstd_command(level):
+    if not shutil.which('zstd'):
+        raise RuntimeError("Compressão zstd requer o módulo 'zstandard' ou o executável 'zstd'.")
+    return ['zstd', '-q', f'-{level}']
+
+
+class OutputWriter:
+    """
+    Arquivo de saída binário, compactado em fluxo com zstd ou gzip. A saída é gravada em
+    segmentos (frames zstd / membros gzip), que podem ser concatenados: isso permite juntar
+    as saídas dos shards com uma simples cópia de bytes e confirmar o que já foi escrito
+    com checkpoint(). Com `resume_at`, o arquivo é truncado nessa posição (um valor devolvido
+    por checkpoint()) e a escrita continua a partir dela.
+    """
+
+    def __init__(self, path, compression=None, level=3, resume_at=None):
+        compressed_name(path.name, compression)
+        self.path = path
+        self.compression = compression
+        self.level = level
+        if resume_at is None:
+            self._raw = open(path, 'wb')
+        else:
+            self._raw = open(path, 'r+b')
+            self._raw.truncate(resume_at)
+            self._raw.seek(resume_at)
+        self._stream = None
+        self._process = None
+        # write() é o método do fluxo atual, sem camada intermediária a cada linha escrita
+        self.write = self._start_segment_and_write
+
+    def _start_segment_and_write(self, data):
+        if self.compression is None:
+            self._stream = self._raw
+        elif self.compression == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode='wb', compresslevel=self.level)
+        elif zstandard is not None:
+            self._stream = zstandard.ZstdCompressor(level=self.level).stream_writer(self._raw, closefd=False)
+        else:
+            self._raw.flush()
+            self._process = subprocess.Popen(_zstd_command(self.level) + ['-c'], stdin=subprocess.PIPE, stdout=self._raw)
+            self._stream = self._process.stdin
+        self.write = self._stream.write
+        return self.write(data)
+
+    def _end_segment(self):
+        if self._stream is None:
+            return
+        if self._process is not None:
+            self._stream.close()
+            return_code = self._process.wait()
+            self._process = None
+            if return_code != 0:
+                raise RuntimeError(f"Falha ao compactar '{self.path}' (zstd retornou {return_code}).")
+            # O processo escreveu pelo mesmo descritor; a posição real é o fim do arquivo
+            self._raw.seek(0, os.SEEK_END)
+        elif self._stream is not self._raw:
+            self._stream.close()
+        self._stream = None
+        self.write = self._start_segment_and_write
+
+    def checkpoint(self):
+        """
+        Fecha o segmento atual, força a gravação em disco e devolve a posição do arquivo
+        até onde a saída está completa (para ser usada depois como `resume_at`).
+        """
+        self._end_segment()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        return self._raw.tell()
+
+    def close(self):
+        try:
+            self._end_segment()
+        finally:
+            self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TeeWriter:
+    """
+    Escreve num OutputWriter e entrega os mesmos bytes (descompactados) a outras saídas derivadas,
+    como a cópia Parquet ou o índice de posições. Cada saída derivada tem write(data),
+    checkpoint(posição) — chamado com a posição confirmada pelo OutputWriter — e close().
+    """
+
+    def __init__(self, writer, sinks):
+        self.writer = writer
+        self.sinks = sinks
+
+    def write(self, data):
+        self.writer.write(data)
+        for sink in self.sinks:
+            sink.write(data)
+
+    def checkpoint(self):
+        offset = self.writer.checkpoint()
+        for sink in self.sinks:
+            sink.checkpoint(offset)
+        return offset
+
+    def close(self):
+        try:
+            for sink in self.sinks:
+                sink.close()
+        finally:
+            self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_output(path, compression=None, level=3, resume_at=None):
+    """Abre um arquivo de saída para escrita binária (ver OutputWriter)."""
+    return OutputWriter(path, compression, level, resume_at)
+
+
+def compress_bytes(data, compression=None, level=3):
+    """Compacta um bloco pequeno (ex.: cabeçalho XML) como um frame/membro independente."""
+    compressed_name('', compression)
+    if compression is None:
+        return data
+    if compression == 'gzip':
+        return gzip.compress(data, compresslevel=level)
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return subprocess.run(_zstd_command(level) + ['-c'], input=data, stdout=subprocess.PIPE, check=True).stdout
@@ -1,15 +1,99 @@
 import xml.etree.ElementTree as ET
 import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
 from pathlib import Path
+from xml.sax.saxutils import escape
+
+from checkpoints import CheckpointStore
+from dump_reader import (
+    RowScanner, find_dump_file, find_rows_after_id, is_compressed, iter_rows, open_dump, parse_row_line,
+    split_into_shards, strip_compression_suffix,
+)
+from dump_writer import TeeWriter, compress_bytes, compressed_name, open_output
+from id_sets import IdSet, SharedIdSet, memory_report
+from parquet_sink import ParquetSink
+from post_index import PostOffsetSink, build_index, entries_path, index_path, read_index_entries, write_index
+from run_metrics import CountingReader, FileProgress, RunReport, merge_file_metrics
+from tag_matcher import TagMatcher, has_target_tag, matched_families, split_tags
 
 # --- CONFIGURAÇÃO ---
 TARGET_TAGS = {'r', 'julia', 'bash', 'dart', 'python', 'javascript', 'java', 'c#'}
 
+# Famílias de tags: padrões adicionais que contam como a tag alvo. Aceita nomes exatos,
+# prefixos ('python-*') e curingas do fnmatch. Uma família pode ser uma tag alvo nova.
+# Ex.: {'python': ['python-*', 'pandas', 'django', 'numpy']}
+TAG_FAMILIES = {}
+
 START_DATE = '2018-01-01T00:00:00.000'
 END_DATE = '2026-01-01T00:00:00.000' 
 
+# Aceita os XML descompactados ou os arquivos do dump compactados (.7z, .bz2, .gz, .zst),
+# que são descompactados em fluxo durante a leitura
 INPUT_DIR = Path('../stackoverflow-data/stackoverflow.com')
 OUTPUT_DIR = Path('../stackoverflow-data/filtered-data-stackoverflow.com')
+
+# Lê Posts.xml uma única vez; respostas que aparecem antes da pergunta são reconciliadas no final
+SINGLE_PASS_POSTS = True
+
+# Processos usados para ler cada arquivo grande em partes (shards) paralelas; 1 desativa
+NUM_WORKERS = os.cpu_count() or 1
+# Shards por processo, para equilibrar a carga entre partes com densidades diferentes
+SHARDS_PER_WORKER = 4
+# Arquivos menores que isso são lidos sequencialmente
+MIN_SHARD_FILE_SIZE = 256 * 1024 * 1024
+
+# Compressão dos arquivos filtrados: None, 'zstd' (.zst) ou 'gzip' (.gz)
+OUTPUT_COMPRESSION = None
+OUTPUT_COMPRESSION_LEVEL = 3
+
+# Grava checkpoints em OUTPUT_DIR/.checkpoints para que uma execução interrompida seja retomada:
+# etapas concluídas são puladas e arquivos grandes continuam do último ponto confirmado
+CHECKPOINTS = True
+# Bytes lidos de um arquivo entre dois checkpoints
+CHECKPOINT_INTERVAL_BYTES = 1024 ** 3
+
+# Modo incremental: cada execução registra o maior Id lido de cada arquivo e os IDs relevantes.
+# Com um dump novo, a execução seguinte lê apenas as linhas novas (Id acima da marca anterior),
+# mantendo as que apontam para posts já relevantes. Users e Badges são relidos por inteiro para
+# incluir usuários antigos que passaram a ser relevantes. Linhas antigas editadas no dump novo
+# não são atualizadas; uma execução completa (INCREMENTAL = False) refaz tudo.
+INCREMENTAL = False
+# Saída do delta: 'file' grava os arquivos filtrados com apenas as linhas novas em
+# OUTPUT_DIR/delta-NNN; 'append' acrescenta as linhas novas aos arquivos filtrados existentes
+# (apenas sem OUTPUT_COMPRESSION)
+DELTA_OUTPUT = 'file'
+
+# Grava também uma cópia Parquet de cada arquivo filtrado em OUTPUT_DIR/parquet/<tabela>, com os
+# tipos de xml_to_sql.SCHEMA e particionada por ano (year=AAAA) quando a tabela tem data.
+# É escrita na mesma passagem que o XML e requer o módulo pyarrow.
+PARQUET_OUTPUT = False
+# Linhas por row group; cada row group guarda estatísticas (mín./máx.) das colunas
+PARQUET_ROW_GROUP_ROWS = 128_000
+PARQUET_COMPRESSION = 'zstd'
+
+# Grava em OUTPUT_DIR/run-reports um JSON com tempo, vazão (linhas/s, MB/s), bytes escritos,
+# pico de memória e tamanho dos conjuntos de IDs de cada etapa e arquivo. Durante a leitura de
+# cada arquivo, uma linha de progresso é impressa periodicamente (run_metrics.PROGRESS_INTERVAL_SECONDS).
+RUN_REPORT = True
+
+# Gera filtered_Posts.xml.idx, um índice Id -> posição da linha (e pergunta -> respostas) gravado
+# durante a filtragem, para buscar posts e discussões direto no XML (ver post_index.py).
+# Apenas sem OUTPUT_COMPRESSION, pois um arquivo compactado não permite acesso por posição.
+POST_INDEX = True
+
+# filtered_PostTags.xml é gerado na mesma leitura de Posts.xml. Com True, o script apenas
+# recria filtered_PostTags.xml a partir dos filtered_Posts.xml e filtered_Tags.xml existentes.
+REBUILD_POST_TAGS = False
+
+# PostHistory.xml: tipos de revisão mantidos (PostHistoryTypeId, ex.: {'1', '2', '3'} para título,
+# corpo e tags iniciais); None mantém todos. Com POST_HISTORY_DROP_TEXT, o atributo Text (o
+# conteúdo completo de cada revisão, a maior parte do arquivo) é removido das linhas mantidas.
+POST_HISTORY_TYPE_IDS = None
+POST_HISTORY_DROP_TEXT = False
 # --- FIM DA CONFIGURAÇÃO ---
 
 def create_output_dir():
@@ -17,14 +101,267 @@ def create_output_dir():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     print(f"Arquivos filtrados serão salvos em: '{OUTPUT_DIR}'")
 
+# Pasta dos arquivos filtrados desta execução: OUTPUT_DIR ou, no modo incremental, a pasta do delta
+_current_output_dir = None
+
+# Métricas desta execução, preenchidas pelo processo principal
+_run_report = RunReport('filter_dump_data')
+
+def input_size(source_file):
+    """Tamanho de um arquivo do dump para o progresso da leitura; None se compactado (tamanho final desconhecido)."""
+    return None if is_compressed(source_file) else source_file.stat().st_size
+
+def filtered_path(filename):
+    """Caminho do arquivo filtrado correspondente a um arquivo do dump, com a extensão da compressão."""
+    return (_current_output_dir or OUTPUT_DIR) / compressed_name(f'filtered_{filename}', OUTPUT_COMPRESSION)
+
+def open_filtered_output(path, resume_at=None):
+    """
+    Abre um arquivo filtrado para escrita binária, aplicando OUTPUT_COMPRESSION.
+    Com `resume_at`, continua um arquivo parcial a partir da posição de um checkpoint.
+    Com PARQUET_OUTPUT, as linhas escritas também vão para a cópia Parquet do arquivo; com
+    POST_INDEX, as posições das linhas de filtered_Posts.xml (ou de um shard dele) são registradas.
+    """
+    writer = open_output(path, OUTPUT_COMPRESSION, OUTPUT_COMPRESSION_LEVEL, resume_at)
+    sinks = []
+    if PARQUET_OUTPUT:
+        sinks.append(ParquetSink(path, resume_at, PARQUET_ROW_GROUP_ROWS, PARQUET_COMPRESSION))
+    if POST_INDEX and OUTPUT_COMPRESSION is None and path.name.split('.part')[0] == 'filtered_Posts.xml':
+        sinks.append(PostOffsetSink(path, resume_at))
+    return TeeWriter(writer, sinks) if sinks else writer
+
+def post_index_parts(job, tasks):
+    """
+    Registros de posição gravados pelas tarefas de um job (ver open_filtered_output), com o
+    deslocamento de cada shard no arquivo final; lista vazia se o job não gera índice.
+    """
+    paths = [entries_path(task['output_file']) for task in tasks if task['output_file']]
+    if not paths or not all(path.exists() for path in paths):
+        return []
+    if len(tasks) == 1:
+        return [(paths[0], 0)]
+    parts = []
+    base = len(xml_header(job['root_tag']))
+    for task, path in zip(tasks, paths):
+        parts.append((path, base))
+        base += task['output_file'].stat().st_size
+    return parts
+
+# --- CHECKPOINTS ---
+def checkpoint_store():
+    """Retorna o CheckpointStore da pasta de saída, ou None se CHECKPOINTS estiver desativado."""
+    return CheckpointStore(OUTPUT_DIR / '.checkpoints') if CHECKPOINTS else None
+
+def run_config(base=None):
+    """Configuração que determina o resultado da execução (gravada nos checkpoints e no relatório)."""
+    return {
+        'target_tags': sorted(TARGET_TAGS),
+        'tag_families': TAG_FAMILIES,
+        'start_date': START_DATE,
+        'end_date': END_DATE,
+        'input_dir': str(INPUT_DIR),
+        'single_pass_posts': SINGLE_PASS_POSTS,
+        'shards': NUM_WORKERS * SHARDS_PER_WORKER if NUM_WORKERS > 1 else 1,
+        'min_shard_file_size': MIN_SHARD_FILE_SIZE,
+        'output_compression': OUTPUT_COMPRESSION,
+        'incremental_base': base and base[0]['run'],
+        'delta_output': DELTA_OUTPUT if base else None,
+        'parquet_output': PARQUET_OUTPUT,
+        'post_history_type_ids': sorted(POST_HISTORY_TYPE_IDS) if POST_HISTORY_TYPE_IDS is not None else None,
+        'post_history_drop_text': POST_HISTORY_DROP_TEXT,
+    }
+
+def start_checkpoints(base=None):
+    """
+    Prepara os checkpoints da execução. Checkpoints gravados com outra configuração
+    (tags, período, compressão, divisão em shards, execução incremental) são descartados.
+    Retorna True se a execução continua uma anterior.
+    """
+    store = checkpoint_store()
+    if store is None:
+        return False
+    if store.matches_config(run_config(base)):
+        print("Checkpoints de uma execução anterior encontrados: etapas concluídas serão puladas.")
+        return True
+    return False
+
+def finish_checkpoints():
+    """Remove os checkpoints depois que todas as etapas terminaram."""
+    store = checkpoint_store()
+    if store is not None:
+        store.clear()
+
+def completed_stage(name):
+    """Retorna (estado, IdSets) de uma etapa concluída numa execução anterior, ou None."""
+    store = checkpoint_store()
+    if store is None:
+        return None
+    state, id_sets = store.load(name)
+    if not state or not state.get('done'):
+        return None
+    print(f"{name} já processado numa execução anterior. Pulando.")
+    return state, id_sets
+
+def complete_stage(name, state=None, id_sets=None):
+    """Registra uma etapa como concluída, com seus resultados."""
+    store = checkpoint_store()
+    if store is not None:
+        store.save(name, {**(state or {}), 'done': True}, id_sets)
+
+# --- MODO INCREMENTAL ---
+# Maior Id lido de cada arquivo do dump nesta execução, gravado no estado incremental
+_high_water_marks = {}
+
+def incremental_store():
+    """Estado das execuções incrementais, guardado em OUTPUT_DIR/.incremental."""
+    return CheckpointStore(OUTPUT_DIR / '.incremental')
+
+def incremental_config():
+    """Parâmetros que precisam ser iguais para que uma execução continue a anterior."""
+    return {'target_tags': sorted(TARGET_TAGS), 'tag_families': TAG_FAMILIES, 'start_date': START_DATE, 'end_date': END_DATE}
+
+def load_incremental_base():
+    """
+    Retorna (estado, IdSets) da execução anterior, se ela puder servir de base para um delta,
+    ou None para fazer uma execução completa.
+    """
+    if DELTA_OUTPUT not in ('file', 'append'):
+        raise ValueError(f"DELTA_OUTPUT desconhecido: {DELTA_OUTPUT!r}. Use 'file' ou 'append'.")
+    if DELTA_OUTPUT == 'append' and OUTPUT_COMPRESSION:
+        raise ValueError("DELTA_OUTPUT = 'append' requer OUTPUT_COMPRESSION = None.")
+
+    state, id_sets = incremental_store().load('state')
+    if state is None:
+        print("Nenhuma execução anterior registrada: fazendo a filtragem completa.")
+        return None
+    if state['config'] != incremental_config():
+        print("A configuração mudou desde a execução anterior: fazendo a filtragem completa.")
+        return None
+    return state, id_sets
+
+def save_incremental_state(base, relevant_post_ids, relevant_user_ids):
+    """Registra as marcas de Id e os IDs relevantes acumulados para a próxima execução."""
+    high_water_marks = dict(base[0]['high_water_marks']) if base else {}
+    for filename, last_id in _high_water_marks.items():
+        if last_id is not None:
+            high_water_marks[filename] = max(last_id, high_water_marks.get(filename, last_id))
+    state = {
+        'run': base[0]['run'] + 1 if base else 1,
+        'config': incremental_config(),
+        'high_water_marks': high_water_marks,
+    }
+    incremental_store().save('state', state, {'post_ids': relevant_post_ids, 'user_ids': relevant_user_ids})
+    print(f"Estado incremental registrado (execução {state['run']}): {high_water_marks}")
+
+def delta_dir(base):
+    """Pasta dos arquivos filtrados de uma execução incremental."""
+    return OUTPUT_DIR / f"delta-{base[0]['run'] + 1:03d}"
+
+def min_id_for(filename, base):
+    """Maior Id já processado de um arquivo do dump (None numa execução completa ou arquivo novo)."""
+    return base[0]['high_water_marks'].get(filename) if base else None
+
+def record_high_water_mark(source_file, last_id):
+    """Guarda o maior Id lido de um arquivo do dump (caminho ou nome, ex.: 'Posts.xml') nesta execução."""
+    if last_id is None:
+        return
+    filename = strip_compression_suffix(Path(source_file).name)
+    _high_water_marks[filename] = max(last_id, _high_water_marks.get(filename, last_id))
+
+def last_row_id(raw):
+    """Id de uma linha do dump (a última lida de um intervalo tem o maior Id, já que o dump é ordenado)."""
+    if raw is None:
+        return None
+    row = parse_row_line(raw, ('Id',))
+    row_id = row.get('Id') if row is not None else ET.fromstring(raw.strip()).get('Id')
+    return int(row_id) if row_id else None
+
+def append_delta_files(source_dir):
+    """
+    Acrescenta as linhas dos arquivos do delta aos arquivos filtrados existentes, no lugar da
+    tag raiz de fechamento. Tags.xml é relido por inteiro e substitui o arquivo anterior.
+    Cada arquivo tem seu checkpoint, então uma interrupção não duplica linhas.
+    """
+    for delta_file in sorted(source_dir.glob('filtered_*.xml')) if source_dir.exists() else []:
+        target = OUTPUT_DIR / delta_file.name
+        if delta_file.name == 'filtered_Tags.xml' or not target.exists():
+            os.replace(delta_file, target)
+            if index_path(delta_file).exists():
+                os.replace(index_path(delta_file), index_path(target))
+            continue
+
+        stage_name = f'append-{delta_file.name}'
+        if completed_stage(stage_name):
+            continue
+        root_tag = delta_file.name[len('filtered_'):-len('.xml')].lower()
+        header, footer = xml_header(root_tag), xml_footer(root_tag)
+
+        store = checkpoint_store()
+        state, _ = store.load(stage_name) if store else (None, {})
+        if state:
+            append_at = state['append_at']
+        else:
+            append_at = target.stat().st_size - len(footer)
+            with open(target, 'rb') as f:
+                f.seek(append_at)
+                if f.read() != footer:
+                    raise ValueError(f"'{target}' não termina com {footer!r}; não é possível acrescentar o delta.")
+            if store:
+                store.save(stage_name, {'append_at': append_at})
+
+        with open_output(target, resume_at=append_at) as writer, open(delta_file, 'rb') as source:
+            remaining = delta_file.stat().st_size - len(header) - len(footer)
+            source.seek(len(header))
+            while remaining > 0:
+                block = source.read(min(remaining, 4 * 1024 * 1024))
+                writer.write(block)
+                remaining -= len(block)
+            writer.write(footer)
+        if index_path(delta_file).exists() and index_path(target).exists():
+            # As linhas do delta passam a começar em append_at; entradas de uma tentativa
+            # anterior interrompida (posição >= append_at) são descartadas
+            ids, parent_ids, offsets = read_index_entries(target)
+            keep = [i for i in range(len(ids)) if offsets[i] < append_at]
+            delta_ids, delta_parent_ids, delta_offsets = read_index_entries(delta_file)
+            shift = append_at - len(header)
+            write_index(
+                target,
+                [ids[i] for i in keep] + list(delta_ids),
+                [parent_ids[i] for i in keep] + list(delta_parent_ids),
+                [offsets[i] for i in keep] + [offset + shift for offset in delta_offsets])
+        complete_stage(stage_name)
+        print(f"{delta_file.name}: delta acrescentado a '{target}'.")
+
+    # A cópia Parquet é um dataset de vários arquivos: os do delta são movidos para junto dos
+    # existentes, com o nome do delta como prefixo. A tabela de tags é substituída.
+    delta_parquet_dir = source_dir / 'parquet'
+    for table_dir in sorted(delta_parquet_dir.iterdir()) if delta_parquet_dir.exists() else []:
+        target_table_dir = OUTPUT_DIR / 'parquet' / table_dir.name
+        if table_dir.name == 'tags':
+            shutil.rmtree(target_table_dir, ignore_errors=True)
+        for parquet_file in sorted(table_dir.rglob('*.parquet')):
+            target = target_table_dir / parquet_file.parent.relative_to(table_dir) / f'{source_dir.name}-{parquet_file.name}'
+            os.makedirs(target.parent, exist_ok=True)
+            os.replace(parquet_file, target)
+
+    if source_dir.exists():
+        shutil.rmtree(source_dir)
+
+def xml_header(root_tag):
+    """Cabeçalho XML e tag raiz de abertura."""
+    return f'<?xml version="1.0" encoding="utf-8"?>\n<{root_tag}>\n'.encode()
+
+def xml_footer(root_tag):
+    """Tag raiz de fechamento."""
+    return f'</{root_tag}>\n'.encode()
+
 def write_xml_header(writer, root_tag):
-    """Escreve o cabeçalho XML e a tag raiz de abertura."""
-    writer.write('<?xml version="1.0" encoding="utf-8"?>\n')
-    writer.write(f'<{root_tag}>\n')
+    """Escreve o cabeçalho XML e a tag raiz de abertura (o arquivo é aberto em modo binário)."""
+    writer.write(xml_header(root_tag))
 
 def write_xml_footer(writer, root_tag):
     """Escreve a tag raiz de fechamento."""
-    writer.write(f'</{root_tag}>\n')
+    writer.write(xml_footer(root_tag))
 
 def is_date_in_range(date_str):
     """Verifica se uma string de data está no intervalo definido."""
@@ -33,114 +370,739 @@ def is_date_in_range(date_str):
     # A comparação de strings funciona porque o formato é ISO 8601 (AAAA-MM-DD)
     return START_DATE <= date_str < END_DATE
 
+def target_tag_matcher():
+    """TagMatcher com uma família por tag alvo (a própria tag mais os padrões de TAG_FAMILIES)."""
+    families = {tag: [tag] for tag in sorted(TARGET_TAGS)}
+    for family, patterns in TAG_FAMILIES.items():
+        families.setdefault(family, [family]).extend(patterns)
+    return TagMatcher(families)
+
 def filter_tags():
     """
-    Filtra o arquivo Tags.xml, salvando as linhas das tags alvo.
+    Filtra o arquivo Tags.xml, salvando as linhas das tags alvo e das tags de suas famílias.
+    Retorna ({nome da tag: famílias alvo}, {nome da tag: Id}): os curingas são resolvidos aqui,
+    uma única vez, e Posts.xml só precisa consultar esses dicionários.
     """
+    stage = completed_stage('Tags.xml')
+    if stage:
+        return {tag: tuple(families) for tag, families in stage[0]['tags'].items()}, stage[0]['tag_ids']
+
     print("Processando Tags.xml...")
-    source_file = INPUT_DIR / 'Tags.xml'
-    output_file = OUTPUT_DIR / 'filtered_Tags.xml'
+    source_file = find_dump_file(INPUT_DIR, 'Tags.xml')
+    if source_file is None:
+        raise FileNotFoundError(f"Arquivo {INPUT_DIR / 'Tags.xml'} não encontrado.")
+    output_file = filtered_path('Tags.xml')
     
-    found_tags = set()
+    matcher = target_tag_matcher()
+    found_tags = {}
+    tag_ids = {}
     count = 0
+    scanner = RowScanner(source_file, ('Id', 'TagName'))
+    progress = FileProgress(source_file.name, total_bytes=input_size(source_file))
 
-    with open(output_file, 'w', encoding='utf-8') as writer:
+    with open_filtered_output(output_file) as writer:
         write_xml_header(writer, 'tags')
         
-        context = ET.iterparse(source_file, events=('end',))
-        for _, elem in context:
-            if elem.tag == 'row':
-                tag_name = elem.get('TagName')
-                if tag_name and tag_name.lower() in TARGET_TAGS:
-                    writer.write('  ' + ET.tostring(elem, encoding='unicode'))
-                    found_tags.add(tag_name)
-                    count += 1
-                elem.clear()
+        for raw, row in scanner:
+            tag_name = row.get('TagName')
+            families = matcher.families_for_tag(tag_name) if tag_name else ()
+            if families:
+                write_row(writer, raw)
+                found_tags[tag_name] = families
+                tag_ids[tag_name] = row['Id']
+                count += 1
+            progress.tick(scanner.position, bool(families))
         
         write_xml_footer(writer, 'tags')
     
+    _run_report.add_file(progress.finish(output_file.stat().st_size))
     print(f"Tags.xml processado. {count} tags relevantes encontradas e salvas em '{output_file}'.\n")
-    return found_tags
+    complete_stage('Tags.xml', {'tags': found_tags, 'tag_ids': tag_ids})
+    return found_tags, tag_ids
+
+def is_relevant_question(row, tag_families):
+    """Verifica se a linha é uma pergunta (PostTypeId=1) com as tags desejadas e dentro do período."""
+    if row.get('PostTypeId') != '1':
+        return False
+    if not has_target_tag(row.get('Tags'), tag_families):
+        return False
+    return is_date_in_range(row.get('CreationDate'))
+
+def target_tag_rows(row):
+    """
+    Linhas de filtered_QuestionTargetTags.xml para uma pergunta relevante: uma por família
+    alvo em que suas tags se encaixam, para separar as perguntas por tag sem reler os posts.
+    """
+    if row.get('PostTypeId') != '1':
+        return b''
+    post_id = row.get('Id')
+    return ''.join(
+        f'  <row PostId="{post_id}" TargetTag="{escape(family, QUOTE_ENTITIES)}" />\n'
+        for family in matched_families(row.get('Tags'), _filter_context['tag_families'])
+    ).encode()
+
+def post_tag_rows(row):
+    """
+    Linhas de filtered_PostTags.xml para um post mantido: uma por tag do post presente em
+    filtered_Tags.xml, com o Id da tag (as respostas não têm tags e não geram linhas).
+    """
+    tag_ids = _filter_context['tag_ids']
+    post_id = row.get('Id')
+    return ''.join(
+        f'  <row PostId="{post_id}" TagId="{tag_ids[name]}" />\n'
+        for name in split_tags(row.get('Tags')) if name in tag_ids
+    ).encode()
+
+def write_row(writer, raw):
+    """Copia uma linha mantida, byte a byte, para o arquivo de saída."""
+    writer.write(raw)
+    if not raw.endswith(b'\n'):
+        writer.write(b'\n')
+
+def record_post_ids(row, relevant_post_ids, relevant_user_ids):
+    """Registra o ID de um post relevante e os IDs de usuários associados a ele."""
+    post_id = row.get('Id')
+    if post_id:
+        relevant_post_ids.add(post_id)
+
+    owner_id = row.get('OwnerUserId')
+    if owner_id:
+        relevant_user_ids.add(owner_id)
+
+    last_editor_id = row.get('LastEditorUserId')
+    if last_editor_id:
+        relevant_user_ids.add(last_editor_id)
+
+# Entidades para escapar valores de atributos entre aspas duplas
+QUOTE_ENTITIES = {'"': '&quot;'}
+
+# Atributos extraídos de cada linha para cada tipo de arquivo
+POST_FIELDS = ('Id', 'ParentId', 'PostTypeId', 'Tags', 'CreationDate', 'OwnerUserId', 'LastEditorUserId')
+POST_DEPENDENT_FIELDS = ('PostId', 'CreationDate', 'UserId', 'OwnerUserId')
+POST_LINK_FIELDS = ('PostId', 'RelatedPostId', 'CreationDate')
+POST_HISTORY_FIELDS = POST_DEPENDENT_FIELDS + ('PostHistoryTypeId',)
+USER_FIELDS = ('Id',)
+BADGE_FIELDS = ('UserId', 'Date')
+
+# --- NÚCLEOS DE FILTRAGEM ---
+# Cada núcleo recebe uma linha e os conjuntos de IDs encontrados até agora, decide se a linha
+# deve ser mantida e registra os IDs que ela referencia. Os conjuntos de referência (perguntas,
+# posts e usuários relevantes) ficam em _filter_context, que também é entregue aos processos de shard.
+_filter_context = {}
+
+def _init_worker(context):
+    """Inicializa um processo de shard com os conjuntos de referência do processo principal."""
+    _filter_context.update(context)
+
+def question_id_row(row, found_post_ids, found_user_ids):
+    """Etapa 1 de Posts.xml: apenas registra as perguntas relevantes."""
+    if is_relevant_question(row, _filter_context['tag_families']):
+        found_post_ids.add(row.get('Id'))
+    return False
+
+def post_row(row, found_post_ids, found_user_ids):
+    """Etapa 2 de Posts.xml: mantém perguntas relevantes e suas respostas."""
+    question_ids = _filter_context['question_ids']
+    # Aqui, incluímos todas as respostas de perguntas relevantes, independentemente da data da resposta
+    if row.get('Id') in question_ids or row.get('ParentId') in question_ids:
+        record_post_ids(row, found_post_ids, found_user_ids)
+        return True
+    return False
+
+def post_dependent_row(row, found_post_ids, found_user_ids):
+    """Comments, Votes e PostHistory: mantém linhas de posts relevantes dentro do período."""
+    if row.get('PostId') in _filter_context['post_ids']:
+        if is_date_in_range(row.get('CreationDate')):
+            user_id = row.get('UserId') or row.get('OwnerUserId')
+            if user_id:
+                found_user_ids.add(user_id)
+            return True
+    return False
+
+def post_history_row(row, found_post_ids, found_user_ids):
+    """PostHistory com POST_HISTORY_TYPE_IDS: como post_dependent_row, apenas para os tipos de revisão escolhidos."""
+    if row.get('PostHistoryTypeId') not in _filter_context['post_history_type_ids']:
+        return False
+    return post_dependent_row(row, found_post_ids, found_user_ids)
+
+# Início do atributo PostId nos bytes de uma linha
+_POST_ID_KEY = b' PostId="'
+
+def post_id_prefilter(line):
+    """
+    Pré-filtro de Comments, Votes e PostHistory: lê o PostId direto dos bytes da linha e descarta
+    as linhas de posts irrelevantes (quase todas) sem interpretar os demais atributos. Linhas fora
+    do formato simples seguem para o filtro completo. Os valores dos atributos nunca contêm '"'
+    (vem escapado como &quot;), então a busca não confunde o atributo com texto dentro de outro.
+    """
+    index = line.find(_POST_ID_KEY)
+    if index == -1:
+        return True
+    value_start = index + len(_POST_ID_KEY)
+    value_end = line.find(b'"', value_start)
+    value = line[value_start:value_end]
+    if not value.isdigit():
+        return True
+    return int(value) in _filter_context['post_ids']
+
+# Atributo Text de uma linha de PostHistory (o valor não contém '"', mas pode ter quebras de linha)
+_TEXT_ATTRIBUTE = re.compile(rb' Text="[^"]*"')
+
+def drop_text_attribute(raw):
+    """Remove o atributo Text de uma linha de PostHistory mantida (POST_HISTORY_DROP_TEXT)."""
+    return _TEXT_ATTRIBUTE.sub(b'', raw, count=1)
+
+def post_link_row(row, found_post_ids, found_user_ids):
+    """PostLinks: mantém links em que qualquer um dos lados é um post relevante."""
+    post_ids = _filter_context['post_ids']
+    if row.get('PostId') in post_ids or row.get('RelatedPostId') in post_ids:
+        return is_date_in_range(row.get('CreationDate'))
+    return False
+
+def user_row(row, found_post_ids, found_user_ids):
+    """Users: mantém usuários relevantes (sem filtro de data)."""
+    return row.get('Id') in _filter_context['user_ids']
+
+def badge_row(row, found_post_ids, found_user_ids):
+    """Badges: mantém medalhas de usuários relevantes dentro do período."""
+    if row.get('UserId') in _filter_context['user_ids']:
+        return is_date_in_range(row.get('Date'))
+    return False
+
+def new_user_row(row, found_post_ids, found_user_ids):
+    """Users (incremental): mantém usuários que passaram a ser relevantes nesta execução."""
+    return row.get('Id') in _filter_context['new_user_ids']
+
+def new_badge_row(row, found_post_ids, found_user_ids):
+    """
+    Badges (incremental): mantém medalhas novas de usuários relevantes e todas as medalhas
+    de usuários que passaram a ser relevantes nesta execução, dentro do período.
+    """
+    user_id = row.get('UserId')
+    if user_id in _filter_context['new_user_ids'] or (
+        user_id in _filter_context['user_ids'] and int(row['Id']) > _filter_context['badges_min_id']
+    ):
+        return is_date_in_range(row.get('Date'))
+    return False
+
+# --- LEITURA SEQUENCIAL E EM SHARDS ---
+def should_shard(source_file):
+    """
+    Indica se o arquivo é grande o suficiente para ser lido em shards paralelos.
+    Arquivos compactados não permitem acesso por posição e são sempre lidos em fluxo.
+    """
+    if NUM_WORKERS <= 1 or is_compressed(source_file):
+        return False
+    return source_file.stat().st_size >= MIN_SHARD_FILE_SIZE
+
+def _filter_task(task):
+    """
+    Filtra um arquivo inteiro ou um intervalo de bytes dele. O arquivo inteiro é escrito direto
+    na saída final, com cabeçalho e rodapé; um shard é gravado num arquivo parcial. Com `min_id`
+    (modo incremental), linhas com Id até esse valor são ignoradas. Cada saída secundária de
+    `side_outputs` (arquivo, tag raiz, função) recebe as linhas (bytes) que a função gera para
+    cada linha mantida. `prefilter` descarta linhas pelos bytes antes da extração dos atributos
+    e `row_transform` altera os bytes de cada linha mantida antes da escrita.
+    A cada CHECKPOINT_INTERVAL_BYTES lidos, a saída é confirmada em disco e a posição, a contagem
+    e os IDs encontrados são gravados; se a tarefa for interrompida, continua desse ponto.
+    Retorna (linhas mantidas, IDs de posts, IDs de usuários, Id da última linha lida, métricas).
+    """
+    source_file = task['source_file']
+    output_file = task['output_file']
+    side_outputs = task['side_outputs']
+    row_filter = task['row_filter']
+    whole_file = task['whole_file']
+    min_id = task['min_id']
+    store = checkpoint_store()
+
+    state, id_sets = store.load(task['key']) if store else (None, {})
+    if state and (state['start'], state['end']) != (task['start'], task['end']):
+        state = None  # A divisão em shards mudou: o checkpoint não vale mais
+    if state and state['done']:
+        return state['count'], id_sets['post_ids'], id_sets['user_ids'], state['last_id'], state.get('metrics')
+    if state and any(path and not path.exists() for path in [output_file] + [side[0] for side in side_outputs]):
+        state = None
+
+    if state:
+        count = state['count']
+        found_post_ids = id_sets['post_ids']
+        found_user_ids = id_sets['user_ids']
+        resume_from = state['input_offset']
+        output_offset = state['output_offset']
+        side_output_offsets = state['side_output_offsets']
+        last_id = state['last_id']
+        print(f"Retomando {source_file.name} a partir do byte {resume_from} ({count} linhas já mantidas)...")
+    else:
+        count = 0
+        found_post_ids = IdSet()
+        found_user_ids = IdSet()
+        resume_from = task['start']
+        output_offset = None
+        side_output_offsets = [None] * len(side_outputs)
+        last_id = None
+
+    def save_progress(done, input_offset, output_offset, side_output_offsets, metrics=None):
+        store.save(
+            task['key'],
+            {'start': task['start'], 'end': task['end'], 'done': done, 'count': count,
+             'input_offset': input_offset, 'output_offset': output_offset,
+             'side_output_offsets': side_output_offsets, 'last_id': last_id, 'metrics': metrics},
+            {'post_ids': found_post_ids, 'user_ids': found_user_ids},
+        )
+
+    scanner = RowScanner(source_file, task['fields'] + ('Id',) if min_id is not None else task['fields'],
+                         resume_from, task['end'], task['prefilter'])
+    row_transform = task['row_transform']
+    rows = scanner if min_id is None else ((raw, row) for raw, row in scanner if int(row['Id']) > min_id)
+    next_checkpoint = scanner.position + CHECKPOINT_INTERVAL_BYTES if store else float('inf')
+    progress = FileProgress(task['label'], scanner.position, input_size(source_file))
+    raw = None
+    with ExitStack() as stack:
+        writer = stack.enter_context(open_filtered_output(output_file, output_offset)) if output_file else None
+        side_writers = [
+            (stack.enter_context(open_filtered_output(side_file, offset)), side_root_tag, side_rows)
+            for (side_file, side_root_tag, side_rows), offset in zip(side_outputs, side_output_offsets)
+        ]
+        if whole_file and output_offset is None:
+            if writer:
+                write_xml_header(writer, task['root_tag'])
+            for side_writer, side_root_tag, _ in side_writers:
+                write_xml_header(side_writer, side_root_tag)
+        for raw, row in rows:
+            kept = row_filter(row, found_post_ids, found_user_ids)
+            if kept:
+                if writer:
+                    write_row(writer, row_transform(raw) if row_transform else raw)
+                for side_writer, _, side_rows in side_writers:
+                    side_writer.write(side_rows(row))
+                count += 1
+            progress.tick(scanner.position, kept)
+            if scanner.position >= next_checkpoint:
+                last_id = last_row_id(raw)
+                save_progress(False, scanner.position, writer.checkpoint() if writer else None,
+                              [side_writer.checkpoint() for side_writer, _, _ in side_writers])
+                next_checkpoint = scanner.position + CHECKPOINT_INTERVAL_BYTES
+        if whole_file:
+            if writer:
+                write_xml_footer(writer, task['root_tag'])
+            for side_writer, side_root_tag, _ in side_writers:
+                write_xml_footer(side_writer, side_root_tag)
+
+    if scanner.last_skipped and scanner.last_skipped[1] > scanner.last_yielded_position:
+        # As últimas linhas do intervalo foram descartadas pelo pré-filtro
+        raw = scanner.last_skipped[0]
+    if raw is not None:
+        last_id = last_row_id(raw)
+    progress.position = scanner.position
+    progress.rows_read += scanner.skipped
+    bytes_written = sum(
+        path.stat().st_size - (offset or 0)
+        for path, offset in zip([output_file] + [side[0] for side in side_outputs], [output_offset] + side_output_offsets) if path)
+    metrics = progress.finish(bytes_written)
+    if store:
+        save_progress(True, scanner.position, None, None, metrics)
+    return count, found_post_ids, found_user_ids, last_id, metrics
+
+def make_filter_job(source_file, output_file, root_tag, row_filter, fields, key=None, min_id=None, side_outputs=(),
+                    prefilter=None, row_transform=None):
+    """
+    Descreve um filtro a ser executado por run_filter_jobs: `row_filter` recebe os atributos
+    `fields` de cada linha de `source_file` e as linhas mantidas são copiadas para `output_file`
+    (ou para lugar nenhum, se for None). `key` identifica o job nos checkpoints
+    (por padrão, o nome do arquivo de saída). Com `min_id`, só as linhas com Id maior são lidas.
+    Cada item de `side_outputs` = (arquivo, tag raiz, função) grava uma saída secundária: a função
+    recebe os atributos de cada linha mantida e devolve as linhas (bytes) a escrever nela.
+    `prefilter(bytes da linha)` descarta linhas antes da extração dos atributos (ver
+    post_id_prefilter) e `row_transform(bytes)` altera as linhas mantidas antes da escrita.
+    """
+    return {
+        'source_file': source_file,
+        'output_file': output_file,
+        'root_tag': root_tag,
+        'row_filter': row_filter,
+        'fields': fields,
+        'key': key or output_file.name,
+        'min_id': min_id,
+        'side_outputs': list(side_outputs),
+        'prefilter': prefilter,
+        'row_transform': row_transform,
+    }
+
+def _split_job(job):
+    """
+    Divide um job em tarefas: uma por shard, ou uma única para o arquivo inteiro. Com `min_id`,
+    um arquivo descompactado é lido a partir da posição encontrada por busca binária.
+    """
+    source_file = job['source_file']
+    output_file = job['output_file']
+    start = None
+    if job['min_id'] is not None and not is_compressed(source_file):
+        start = find_rows_after_id(source_file, job['min_id'])
+    shards = split_into_shards(source_file, NUM_WORKERS * SHARDS_PER_WORKER, start or 0) if should_shard(source_file) else []
+    if len(shards) > 1:
+        print(f"Lendo {source_file.name} em {len(shards)} shards...")
+    else:
+        shards = [(start, None)]
+    whole_file = len(shards) == 1
+
+    return [
+        {
+            'source_file': source_file,
+            'label': source_file.name if whole_file else f'{source_file.name} (shard {i + 1}/{len(shards)})',
+            'start': start,
+            'end': end,
+            'whole_file': whole_file,
+            'output_file': _part_path(output_file, i) if output_file and not whole_file else output_file,
+            'side_outputs': [
+                (side_file if whole_file else _part_path(side_file, i), side_root_tag, side_rows)
+                for side_file, side_root_tag, side_rows in job['side_outputs']
+            ],
+            'root_tag': job['root_tag'],
+            'row_filter': job['row_filter'],
+            'prefilter': job['prefilter'],
+            'row_transform': job['row_transform'],
+            'fields': job['fields'],
+            'min_id': job['min_id'],
+            'key': f"{job['key']}.part{i:04d}",
+        }
+        for i, (start, end) in enumerate(shards)
+    ]
+
+def _part_path(output_file, index):
+    """Arquivo parcial de um shard, ao lado da saída final ('filtered_Posts.xml.part0003')."""
+    return output_file.with_name(f'{output_file.name}.part{index:04d}')
+
+def _merge_parts(job, tasks):
+    """
+    Concatena, na ordem original, os arquivos parciais dos shards de um job (saída principal e
+    saídas secundárias). Com compressão, cada parte é um frame/membro independente, então a
+    concatenação dos bytes continua válida.
+    """
+    if len(tasks) == 1:
+        return
+    outputs = [(job['output_file'], job['root_tag'], [task['output_file'] for task in tasks])]
+    outputs += [
+        (side_file, side_root_tag, [task['side_outputs'][i][0] for task in tasks])
+        for i, (side_file, side_root_tag, _) in enumerate(job['side_outputs'])
+    ]
+    for output_file, root_tag, parts in outputs:
+        if not output_file:
+            continue
+        with open(output_file, 'wb') as writer:
+            writer.write(compress_bytes(xml_header(root_tag), OUTPUT_COMPRESSION, OUTPUT_COMPRESSION_LEVEL))
+            for part_file in parts:
+                with open(part_file, 'rb') as part:
+                    shutil.copyfileobj(part, writer)
+            writer.write(compress_bytes(xml_footer(root_tag), OUTPUT_COMPRESSION, OUTPUT_COMPRESSION_LEVEL))
+        for part_file in parts:
+            os.remove(part_file)
+
+def _complete_job(job, tasks, result, started):
+    """
+    Junta as partes de um job concluído, registra suas métricas (`started` é o início de
+    run_filter_jobs) e troca os checkpoints das tarefas pelo do job.
+    """
+    index_parts = post_index_parts(job, tasks)
+    _merge_parts(job, tasks)
+    if index_parts:
+        build_index(job['output_file'], index_parts)
+    count, found_post_ids, found_user_ids, last_id, task_metrics = result
+    record_high_water_mark(job['source_file'], last_id)
+    metrics = merge_file_metrics(job['source_file'].name, task_metrics, time.monotonic() - started)
+    if job['output_file']:
+        metrics['output_file'] = job['output_file'].name
+    _run_report.add_file(metrics)
+    store = checkpoint_store()
+    if store:
+        store.save(job['key'], {'done': True, 'count': count, 'last_id': last_id}, {'post_ids': found_post_ids, 'user_ids': found_user_ids})
+        for task in tasks:
+            store.discard(task['key'])
+
+def run_filter_jobs(jobs):
+    """
+    Executa filtros independentes ao mesmo tempo. Todas as tarefas (arquivos pequenos inteiros
+    e shards dos arquivos grandes) vão para um único pool de processos, então o tempo total
+    tende ao do maior arquivo em vez da soma de todos. Os IdSets de _filter_context
+    são entregues aos processos como bitmaps em memória compartilhada (SharedIdSet).
+    Jobs concluídos numa execução anterior são lidos dos checkpoints em vez de refeitos.
+    Retorna, para cada job, (linhas mantidas, IDs de posts encontrados, IDs de usuários encontrados).
+    """
+    store = checkpoint_store()
+    started = time.monotonic()
+    results = [[0, IdSet(), IdSet(), None, []] for _ in jobs]
+    job_tasks = [[] for _ in jobs]
+    for job_index, job in enumerate(jobs):
+        state, id_sets = store.load(job['key']) if store else (None, {})
+        if state and state.get('done'):
+            print(f"{job['source_file'].name} já filtrado numa execução anterior. Pulando.")
+            results[job_index] = [state['count'], id_sets['post_ids'], id_sets['user_ids'], state['last_id'], []]
+            record_high_water_mark(job['source_file'], state['last_id'])
+        else:
+            job_tasks[job_index] = _split_job(job)
+
+    def collect(job_index, task_result):
+        count, found_post_ids, found_user_ids, last_id, metrics = task_result
+        if metrics:
+            results[job_index][4].append(metrics)
+        results[job_index][0] += count
+        results[job_index][1] |= found_post_ids
+        results[job_index][2] |= found_user_ids
+        if last_id is not None:
+            results[job_index][3] = max(last_id, results[job_index][3] or last_id)
 
-def filter_posts(relevant_tags):
+    all_tasks = [(job_index, task) for job_index, tasks in enumerate(job_tasks) for task in tasks]
+    if NUM_WORKERS <= 1 or len(all_tasks) <= 1:
+        for job_index, task in all_tasks:
+            collect(job_index, _filter_task(task))
+        for job_index, tasks in enumerate(job_tasks):
+            if tasks:
+                _complete_job(jobs[job_index], tasks, results[job_index], started)
+        return [tuple(result[:3]) for result in results]
+
+    shared_context = {
+        key: value.share() if isinstance(value, IdSet) else value
+        for key, value in _filter_context.items()
+    }
+    try:
+        with ProcessPoolExecutor(max_workers=NUM_WORKERS, initializer=_init_worker, initargs=(shared_context,)) as executor:
+            futures = {executor.submit(_filter_task, task): job_index for job_index, task in all_tasks}
+            pending_tasks = [len(tasks) for tasks in job_tasks]
+            for future in as_completed(futures):
+                job_index = futures[future]
+                collect(job_index, future.result())
+                pending_tasks[job_index] -= 1
+                if pending_tasks[job_index] == 0:
+                    _complete_job(jobs[job_index], job_tasks[job_index], results[job_index], started)
+    finally:
+        for value in shared_context.values():
+            if isinstance(value, SharedIdSet):
+                value.close()
+
+    return [tuple(result[:3]) for result in results]
+
+def filter_rows(source_file, output_file, root_tag, row_filter, fields, key=None, min_id=None, side_outputs=()):
+    """Executa um único filtro com run_filter_jobs (em shards paralelos, se o arquivo for grande)."""
+    return run_filter_jobs([make_filter_job(source_file, output_file, root_tag, row_filter, fields, key, min_id, side_outputs)])[0]
+
+def filter_posts(relevant_tags, tag_ids, base=None):
     """
     Filtra Posts.xml com base nas tags e no intervalo de datas, incluindo perguntas e suas respostas.
-    Utiliza uma abordagem de duas passagens para garantir que as respostas sejam incluídas.
+    `relevant_tags` e `tag_ids` são os dicionários devolvidos por filter_tags. Na mesma leitura,
+    as famílias de cada pergunta mantida são gravadas em filtered_QuestionTargetTags.xml e as
+    relações post-tag em filtered_PostTags.xml.
+    Por padrão lê o arquivo uma única vez (SINGLE_PASS_POSTS); caso contrário usa duas passagens.
+    No modo incremental (`base`), lê só os posts novos, nas duas passagens, e mantém também as
+    respostas novas de perguntas já relevantes; os IDs devolvidos são apenas os dos posts novos.
     """
+    stage = completed_stage('Posts.xml')
+    if stage:
+        record_high_water_mark('Posts.xml', stage[0]['last_id'])
+        return stage[1]['post_ids'], stage[1]['user_ids']
+
     print(f"Processando Posts.xml para o período {START_DATE[:4]}-{END_DATE[:4]} (isso pode demorar bastante)...")
-    source_file = INPUT_DIR / 'Posts.xml'
-    output_file = OUTPUT_DIR / 'filtered_Posts.xml'
+    source_file = find_dump_file(INPUT_DIR, 'Posts.xml')
+    if source_file is None:
+        raise FileNotFoundError(f"Arquivo {INPUT_DIR / 'Posts.xml'} não encontrado.")
+    output_file = filtered_path('Posts.xml')
+    side_files = (filtered_path('QuestionTargetTags.xml'), filtered_path('PostTags.xml'))
+    _filter_context['tag_families'] = relevant_tags
+    _filter_context['tag_ids'] = tag_ids
 
-    tag_search_patterns = [f"<{tag}>" for tag in relevant_tags]
-    
+    # A leitura em shards não preserva a ordem global de Id, então usa as duas passagens (paralelas)
+    if base:
+        relevant_post_ids, relevant_user_ids, count = filter_posts_two_pass(
+            source_file, output_file, *side_files, min_id_for('Posts.xml', base), base[1]['post_ids'])
+    elif SINGLE_PASS_POSTS and not should_shard(source_file):
+        relevant_post_ids, relevant_user_ids, count = filter_posts_single_pass(source_file, output_file, *side_files)
+    else:
+        relevant_post_ids, relevant_user_ids, count = filter_posts_two_pass(source_file, output_file, *side_files)
+
+    print(f"Posts.xml processado. {count} posts relevantes (perguntas e respostas) salvos em '{output_file}'.")
+    print(f"Tags alvo de cada pergunta salvas em '{side_files[0]}' e relações post-tag em '{side_files[1]}'.")
+    print(f"Encontrados {len(relevant_post_ids)} IDs de posts e {len(relevant_user_ids)} IDs de usuários.")
+    print(memory_report("IDs de posts", relevant_post_ids))
+    print(memory_report("IDs de usuários", relevant_user_ids) + "\n")
+    _run_report.record_id_set('post_ids', relevant_post_ids)
+    _run_report.record_id_set('user_ids', relevant_user_ids)
+    complete_stage('Posts.xml', {'count': count, 'last_id': _high_water_marks.get('Posts.xml')}, {'post_ids': relevant_post_ids, 'user_ids': relevant_user_ids})
+    return relevant_post_ids, relevant_user_ids
+
+def filter_posts_two_pass(source_file, output_file, target_tags_file, post_tags_file, min_id=None, previous_post_ids=None):
+    """
+    Abordagem de duas passagens: primeiro coleta os IDs das perguntas relevantes,
+    depois escreve as perguntas e suas respostas. Com `min_id`, lê apenas os posts com Id
+    maior, aceitando respostas a qualquer post de `previous_post_ids`.
+    """
     # --- ETAPA 1: Encontrar IDs de todas as perguntas relevantes ---
     print("Etapa 1/2: Identificando IDs de perguntas relevantes...")
-    relevant_question_ids = set()
-    context = ET.iterparse(source_file, events=('end',))
-    for _, elem in context:
-        if elem.tag == 'row':
-            # Filtra apenas por perguntas (PostTypeId=1) que tenham as tags desejadas
-            if elem.get('PostTypeId') == '1':
-                tags_str = elem.get('Tags', '')
-                if any(pattern in tags_str for pattern in tag_search_patterns):
-                    creation_date = elem.get('CreationDate')
-                    if is_date_in_range(creation_date):
-                        relevant_question_ids.add(elem.get('Id'))
-            elem.clear()
+    _, relevant_question_ids, _ = filter_rows(source_file, None, 'posts', question_id_row, POST_FIELDS, key='Posts.xml.questions', min_id=min_id)
     print(f"Encontradas {len(relevant_question_ids)} perguntas relevantes.")
+    print(memory_report("IDs de perguntas", relevant_question_ids))
+    _run_report.record_id_set('question_ids', relevant_question_ids)
 
     # --- ETAPA 2: Filtrar e escrever perguntas e suas respostas ---
     print("Etapa 2/2: Escrevendo perguntas e respostas correspondentes...")
-    relevant_post_ids = set()
-    relevant_user_ids = set()
-    count = 0
-    
-    with open(output_file, 'w', encoding='utf-8') as writer:
-        write_xml_header(writer, 'posts')
-        
-        context = ET.iterparse(source_file, events=('end',))
-        for _, elem in context:
-            if elem.tag == 'row':
-                post_id = elem.get('Id')
-                parent_id = elem.get('ParentId')
-                
-                # Condição: O post é uma pergunta relevante OU é uma resposta de uma pergunta relevante
-                is_relevant_question = post_id in relevant_question_ids
-                is_relevant_answer = parent_id in relevant_question_ids
-
-                if is_relevant_question or is_relevant_answer:
-                    # A data da resposta também deve estar no intervalo, caso queira filtrar
-                    # Aqui, incluímos todas as respostas de perguntas relevantes, independentemente da data da resposta
-                    writer.write('  ' + ET.tostring(elem, encoding='unicode'))
-                    
-                    if post_id:
-                        relevant_post_ids.add(post_id)
-                    
-                    owner_id = elem.get('OwnerUserId')
-                    if owner_id:
-                        relevant_user_ids.add(owner_id)
-                        
-                    last_editor_id = elem.get('LastEditorUserId')
-                    if last_editor_id:
-                        relevant_user_ids.add(last_editor_id)
+    _filter_context['question_ids'] = relevant_question_ids | previous_post_ids if previous_post_ids else relevant_question_ids
+    count, relevant_post_ids, relevant_user_ids = filter_rows(
+        source_file, output_file, 'posts', post_row, POST_FIELDS, min_id=min_id,
+        side_outputs=[(target_tags_file, 'questiontargettags', target_tag_rows), (post_tags_file, 'posttags', post_tag_rows)])
+    del _filter_context['question_ids']
+
+    return relevant_post_ids, relevant_user_ids, count
+
+def filter_posts_single_pass(source_file, output_file, target_tags_file, post_tags_file):
+    """
+    Abordagem de passagem única. O dump é ordenado por Id, então quando uma resposta aparece
+    sua pergunta normalmente já foi vista: ela é escrita (ou descartada) na hora.
+    Respostas cujo ParentId ainda não foi visto vão para um arquivo de espera e são
+    reconciliadas no final, sendo anexadas depois das demais linhas.
+    Como em _filter_task, grava checkpoints periódicos para retomar a leitura no meio do arquivo.
+    """
+    spill_file = OUTPUT_DIR / 'filtered_Posts.pending.xml'
+    checkpoint_key = 'Posts.xml.single-pass'
+    store = checkpoint_store()
+
+    tag_families = _filter_context['tag_families']
+
+    state, id_sets = store.load(checkpoint_key) if store else (None, {})
+    if state and not all(path.exists() for path in (output_file, spill_file, target_tags_file, post_tags_file)):
+        state = None
+
+    if state:
+        relevant_question_ids = id_sets['question_ids']
+        relevant_post_ids = id_sets['post_ids']
+        relevant_user_ids = id_sets['user_ids']
+        late_question_ids = id_sets['late_question_ids']
+        max_id_seen = state['max_id_seen']
+        ids_in_order = state['ids_in_order']
+        count = state['count']
+        spilled = state['spilled']
+        if state['phase'] == 'scan':
+            print(f"Retomando Posts.xml a partir do byte {state['input_offset']} ({count} posts já mantidos)...")
+        else:
+            print("Leitura de Posts.xml já concluída numa execução anterior. Retomando a reconciliação...")
+    else:
+        relevant_question_ids = IdSet()
+        relevant_post_ids = IdSet()
+        relevant_user_ids = IdSet()
+        # Perguntas relevantes que chegaram fora da ordem de Id (respostas anteriores a elas podem ter sido descartadas)
+        late_question_ids = IdSet()
+        max_id_seen = 0
+        ids_in_order = True
+        count = 0
+        spilled = 0
+
+    def save_progress(phase, input_offset, output_offset, spill_offset, target_tags_offset, post_tags_offset):
+        store.save(
+            checkpoint_key,
+            {'phase': phase, 'input_offset': input_offset, 'output_offset': output_offset,
+             'spill_offset': spill_offset, 'target_tags_offset': target_tags_offset,
+             'post_tags_offset': post_tags_offset, 'max_id_seen': max_id_seen, 'ids_in_order': ids_in_order,
+             'count': count, 'spilled': spilled},
+            {'question_ids': relevant_question_ids, 'post_ids': relevant_post_ids,
+             'user_ids': relevant_user_ids, 'late_question_ids': late_question_ids},
+        )
+
+    with open_filtered_output(output_file, state and state['output_offset']) as writer:
+        if not state:
+            write_xml_header(writer, 'posts')
 
+        if not state or state['phase'] == 'scan':
+            scanner = RowScanner(source_file, POST_FIELDS, state and state['input_offset'])
+            next_checkpoint = scanner.position + CHECKPOINT_INTERVAL_BYTES if store else float('inf')
+            progress = FileProgress(source_file.name, scanner.position, input_size(source_file))
+            count_before = count
+            with open_output(spill_file, resume_at=state and state['spill_offset']) as spill, \
+                    open_filtered_output(target_tags_file, state and state['target_tags_offset']) as target_tags_writer, \
+                    open_filtered_output(post_tags_file, state and state['post_tags_offset']) as post_tags_writer:
+                if not state:
+                    write_xml_header(spill, 'posts')
+                    write_xml_header(target_tags_writer, 'questiontargettags')
+                    write_xml_header(post_tags_writer, 'posttags')
+
+                for raw, row in scanner:
+                    post_id = row.get('Id')
+                    parent_id = row.get('ParentId')
+
+                    numeric_id = int(post_id)
+                    arrived_late = numeric_id <= max_id_seen
+                    if arrived_late and ids_in_order:
+                        print(f"Aviso: Posts.xml não está ordenado por Id (Id {post_id} após {max_id_seen}).")
+                        ids_in_order = False
+                    max_id_seen = max(max_id_seen, numeric_id)
+
+                    if is_relevant_question(row, tag_families):
+                        relevant_question_ids.add(post_id)
+                        if arrived_late:
+                            late_question_ids.add(post_id)
+                        write_row(writer, raw)
+                        target_tags_writer.write(target_tag_rows(row))
+                        post_tags_writer.write(post_tag_rows(row))
+                        record_post_ids(row, relevant_post_ids, relevant_user_ids)
+                        count += 1
+                    elif parent_id:
+                        if parent_id in relevant_question_ids:
+                            write_row(writer, raw)
+                            record_post_ids(row, relevant_post_ids, relevant_user_ids)
+                            count += 1
+                        elif not ids_in_order or int(parent_id) > max_id_seen:
+                            # A pergunta ainda não apareceu: decide no final
+                            write_row(spill, raw)
+                            spilled += 1
+
+                    progress.tick(scanner.position, count > count_before)
+                    count_before = count
+                    if scanner.position >= next_checkpoint:
+                        save_progress('scan', scanner.position, writer.checkpoint(), spill.checkpoint(),
+                                      target_tags_writer.checkpoint(), post_tags_writer.checkpoint())
+                        next_checkpoint = scanner.position + CHECKPOINT_INTERVAL_BYTES
+
+                write_xml_footer(spill, 'posts')
+                write_xml_footer(target_tags_writer, 'questiontargettags')
+                write_xml_footer(post_tags_writer, 'posttags')
+            progress.position = scanner.position
+            _run_report.add_file(progress.finish())
+
+            if store:
+                save_progress('reconcile', None, writer.checkpoint(), None, None, None)
+
+        # --- Reconciliação das respostas em espera ---
+        if spilled:
+            print(f"Reconciliando {spilled} respostas que apareceram antes de suas perguntas...")
+            for raw, row in iter_rows(spill_file, POST_FIELDS):
+                if row.get('ParentId') in relevant_question_ids:
+                    write_row(writer, raw)
+                    record_post_ids(row, relevant_post_ids, relevant_user_ids)
+                    count += 1
+
+        # Caso raro: respostas descartadas antes de uma pergunta relevante fora de ordem
+        if late_question_ids:
+            print(f"Relendo Posts.xml para {len(late_question_ids)} perguntas fora de ordem...")
+            for raw, row in iter_rows(source_file, POST_FIELDS):
+                if row.get('ParentId') in late_question_ids and row.get('Id') not in relevant_post_ids:
+                    write_row(writer, raw)
+                    record_post_ids(row, relevant_post_ids, relevant_user_ids)
                     count += 1
-            elem.clear()
 
         write_xml_footer(writer, 'posts')
 
-    print(f"Posts.xml processado. {count} posts relevantes (perguntas e respostas) salvos em '{output_file}'.")
-    print(f"Encontrados {len(relevant_post_ids)} IDs de posts e {len(relevant_user_ids)} IDs de usuários.\n")
-    return relevant_post_ids, relevant_user_ids
+    os.remove(spill_file)
+    if entries_path(output_file).exists():
+        build_index(output_file, [(entries_path(output_file), 0)])
+    record_high_water_mark(source_file, max_id_seen or None)
+    if store:
+        store.discard(checkpoint_key)
+    return relevant_post_ids, relevant_user_ids, count
 
 def create_post_tags_from_files():
     """
-    Cria o arquivo filtered_PostTags.xml a partir dos posts e tags já filtrados.
+    Recria o arquivo filtered_PostTags.xml a partir dos posts e tags já filtrados
+    (REBUILD_POST_TAGS). Na filtragem normal, as relações são gravadas por filter_posts.
     """
     print("Gerando PostTags a partir de Posts.xml e Tags.xml...")
-    tags_filepath = OUTPUT_DIR / 'filtered_Tags.xml'
-    posts_filepath = OUTPUT_DIR / 'filtered_Posts.xml'
-    output_filepath = OUTPUT_DIR / 'filtered_PostTags.xml'
+    tags_filepath = filtered_path('Tags.xml')
+    posts_filepath = filtered_path('Posts.xml')
+    output_filepath = filtered_path('PostTags.xml')
 
     if not tags_filepath.exists() or not posts_filepath.exists():
         print(f"Aviso: Arquivos necessários '{tags_filepath.name}' ou '{posts_filepath.name}' não encontrados. Pulando.")
@@ -148,168 +1110,193 @@ def create_post_tags_from_files():
 
     # Etapa 1: Mapear nome da tag para seu ID
     tag_to_id_map = {}
-    context = ET.iterparse(tags_filepath, events=('end',))
-    for _, elem in context:
-        if elem.tag == 'row':
-            tag_name = elem.get('TagName')
-            tag_id = elem.get('Id')
-            if tag_name and tag_id:
-                tag_to_id_map[tag_name] = tag_id
-        elem.clear()
+    with open_dump(tags_filepath) as source:
+        context = ET.iterparse(source, events=('end',))
+        for _, elem in context:
+            if elem.tag == 'row':
+                tag_name = elem.get('TagName')
+                tag_id = elem.get('Id')
+                if tag_name and tag_id:
+                    tag_to_id_map[tag_name] = tag_id
+            elem.clear()
     
     print(f"Mapeamento de {len(tag_to_id_map)} tags para IDs criado.")
 
     # Etapa 2: Ler os posts, extrair tags e escrever as relações
     count = 0
-    with open(output_filepath, 'w', encoding='utf-8') as writer:
+    progress = FileProgress(posts_filepath.name, total_bytes=input_size(posts_filepath))
+    with open_filtered_output(output_filepath) as writer, open_dump(posts_filepath) as source:
         write_xml_header(writer, 'posttags')
         
-        context = ET.iterparse(posts_filepath, events=('end',))
+        source = CountingReader(source)
+        context = ET.iterparse(source, events=('end',))
         for _, elem in context:
             if elem.tag == 'row':
+                progress.tick(source.bytes_read, elem.get('Tags') is not None)
                 post_id = elem.get('Id')
                 tags_str = elem.get('Tags')
 
                 if post_id and tags_str:
                     # Extrai os nomes das tags da string, ex: "<python><pandas>" -> ["python", "pandas"]
-                    tag_names = tags_str.replace('><', ' ').replace('<', '').replace('>', '').split()
-                    
-                    for name in tag_names:
+                    for name in split_tags(tags_str):
                         if name in tag_to_id_map:
                             tag_id = tag_to_id_map[name]
                             # Escreve a linha no formato XML para a tabela de junção
-                            writer.write(f'  <row PostId="{post_id}" TagId="{tag_id}" />\n')
+                            writer.write(f'  <row PostId="{post_id}" TagId="{tag_id}" />\n'.encode())
                             count += 1
             elem.clear()
 
         write_xml_footer(writer, 'posttags')
 
-    print(f"filtered_PostTags.xml gerado com {count} relações Post-Tag.\n")
-def filter_file_by_post_id(filename, relevant_post_ids):
+    progress.position = source.bytes_read
+    _run_report.add_file(progress.finish(output_filepath.stat().st_size))
+    print(f"{output_filepath.name} gerado com {count} relações Post-Tag.\n")
+
+def post_file_job(filename, base=None):
     """
-    Filtra arquivos (Comments, Votes, PostHistory) por PostId e data.
+    Monta o job de um arquivo filtrado por PostId e data (Comments, Votes, PostHistory ou PostLinks).
+    No modo incremental, lê apenas as linhas novas do arquivo. Exceto em PostLinks, as linhas de
+    posts irrelevantes são descartadas pelo pré-filtro de bytes (post_id_prefilter).
     """
     print(f"Processando {filename}...")
-    source_file = INPUT_DIR / filename
-    output_file = OUTPUT_DIR / f'filtered_{filename}'
+    source_file = find_dump_file(INPUT_DIR, filename)
+    output_file = filtered_path(filename)
     root_tag = filename.lower().replace('.xml', '')
 
-    found_user_ids = set()
-    count = 0
+    if source_file is None:
+        print(f"Arquivo {INPUT_DIR / filename} não encontrado. Pulando.")
+        return None
 
-    if not source_file.exists():
-        print(f"Arquivo {source_file} não encontrado. Pulando.")
-        return found_user_ids
+    # PostLinks é relevante se qualquer um dos lados do link for um post relevante
+    min_id = min_id_for(filename, base)
+    if filename == 'PostLinks.xml':
+        return make_filter_job(source_file, output_file, root_tag, post_link_row, POST_LINK_FIELDS, min_id=min_id)
+    if filename == 'PostHistory.xml':
+        row_filter, fields = post_dependent_row, POST_DEPENDENT_FIELDS
+        if POST_HISTORY_TYPE_IDS is not None:
+            _filter_context['post_history_type_ids'] = {str(type_id) for type_id in POST_HISTORY_TYPE_IDS}
+            row_filter, fields = post_history_row, POST_HISTORY_FIELDS
+        return make_filter_job(source_file, output_file, root_tag, row_filter, fields, min_id=min_id,
+                               prefilter=post_id_prefilter,
+                               row_transform=drop_text_attribute if POST_HISTORY_DROP_TEXT else None)
+    return make_filter_job(source_file, output_file, root_tag, post_dependent_row, POST_DEPENDENT_FIELDS, min_id=min_id,
+                           prefilter=post_id_prefilter)
 
-    with open(output_file, 'w', encoding='utf-8') as writer:
-        write_xml_header(writer, root_tag)
-        
-        context = ET.iterparse(source_file, events=('end',))
-        for _, elem in context:
-            if elem.tag == 'row':
-                if elem.get('PostId') in relevant_post_ids:
-                    creation_date = elem.get('CreationDate')
-                    if is_date_in_range(creation_date):
-                        writer.write('  ' + ET.tostring(elem, encoding='unicode'))
-                        
-                        user_id = elem.get('UserId') or elem.get('OwnerUserId')
-                        if user_id:
-                            found_user_ids.add(user_id)
-                        count += 1
-                elem.clear()
+def user_file_job(filename, base=None):
+    """
+    Monta o job de Users.xml (sem filtro de data) ou Badges.xml (com filtro de data).
+    No modo incremental, os arquivos são lidos por inteiro com os núcleos new_user_row e new_badge_row.
+    """
+    print(f"Processando {filename}...")
+    source_file = find_dump_file(INPUT_DIR, filename)
+    output_file = filtered_path(filename)
+    root_tag = filename.lower().replace('.xml', '')
 
-        write_xml_footer(writer, root_tag)
-    
-    print(f"{filename} processado. {count} linhas relevantes salvas em '{output_file}'.\n")
-    return found_user_ids
+    if source_file is None:
+        print(f"Arquivo {INPUT_DIR / filename} não encontrado. Pulando.")
+        return None
 
-def filter_post_links(relevant_post_ids):
-    """Filtra PostLinks.xml por PostId e data."""
-    print("Processando PostLinks.xml...")
-    source_file = INPUT_DIR / 'PostLinks.xml'
-    output_file = OUTPUT_DIR / 'filtered_PostLinks.xml'
-    
-    count = 0
-    
-    if not source_file.exists():
-        print(f"Arquivo {source_file} não encontrado. Pulando.")
-        return
+    # Aplica filtro de data apenas para o arquivo de Badges
+    if 'Badges' in filename:
+        if base:
+            _filter_context['badges_min_id'] = min_id_for(filename, base) or 0
+            return make_filter_job(source_file, output_file, root_tag, new_badge_row, BADGE_FIELDS + ('Id',))
+        return make_filter_job(source_file, output_file, root_tag, badge_row, BADGE_FIELDS)
+    return make_filter_job(source_file, output_file, root_tag, new_user_row if base else user_row, USER_FIELDS)
 
-    with open(output_file, 'w', encoding='utf-8') as writer:
-        write_xml_header(writer, 'postlinks')
-        
-        context = ET.iterparse(source_file, events=('end',))
-        for _, elem in context:
-            if elem.tag == 'row':
-                post_id = elem.get('PostId')
-                related_post_id = elem.get('RelatedPostId')
-                if post_id in relevant_post_ids or related_post_id in relevant_post_ids:
-                    creation_date = elem.get('CreationDate')
-                    if is_date_in_range(creation_date):
-                        writer.write('  ' + ET.tostring(elem, encoding='unicode'))
-                        count += 1
-                elem.clear()
-        
-        write_xml_footer(writer, 'postlinks')
+def run_file_jobs(jobs):
+    """Executa os jobs existentes ao mesmo tempo e informa o resultado de cada arquivo."""
+    jobs = [job for job in jobs if job]
+    found_user_ids = IdSet()
+    for job, (count, _, job_user_ids) in zip(jobs, run_filter_jobs(jobs)):
+        print(f"{job['output_file'].name.replace('filtered_', '')} processado. {count} linhas relevantes salvas em '{job['output_file']}'.")
+        found_user_ids |= job_user_ids
+    print()
+    return found_user_ids
 
-    print(f"PostLinks.xml processado. {count} links relevantes salvos em '{output_file}'.\n")
+def filter_files_by_post_id(filenames, relevant_post_ids, base=None):
+    """
+    Filtra, ao mesmo tempo, arquivos que dependem apenas dos posts relevantes
+    (Comments, Votes, PostHistory, PostLinks). Retorna os IDs de usuários encontrados.
+    """
+    _filter_context['post_ids'] = relevant_post_ids
+    return run_file_jobs([post_file_job(filename, base) for filename in filenames])
 
-def filter_file_by_user_id(filename, relevant_user_ids):
+def filter_files_by_user_id(filenames, relevant_user_ids, base=None):
     """
-    Filtra Users.xml (sem filtro de data) e Badges.xml (com filtro de data).
+    Filtra, ao mesmo tempo, arquivos que dependem apenas dos usuários relevantes (Users, Badges).
+    No modo incremental, `relevant_user_ids` inclui os usuários da execução anterior.
     """
-    print(f"Processando {filename}...")
-    source_file = INPUT_DIR / filename
-    output_file = OUTPUT_DIR / f'filtered_{filename}'
-    root_tag = filename.lower().replace('.xml', '')
-    
-    count = 0
-    is_badges_file = 'Badges' in filename
-    id_attribute = 'UserId' if is_badges_file else 'Id'
+    _filter_context['user_ids'] = relevant_user_ids
+    if base:
+        _filter_context['new_user_ids'] = relevant_user_ids - base[1]['user_ids']
+        print(f"{len(_filter_context['new_user_ids'])} usuários passaram a ser relevantes nesta execução.")
+    run_file_jobs([user_file_job(filename, base) for filename in filenames])
 
-    if not source_file.exists():
-        print(f"Arquivo {source_file} não encontrado. Pulando.")
-        return
+def filter_file_by_post_id(filename, relevant_post_ids):
+    """
+    Filtra arquivos (Comments, Votes, PostHistory) por PostId e data.
+    """
+    return filter_files_by_post_id([filename], relevant_post_ids)
 
-    with open(output_file, 'w', encoding='utf-8') as writer:
-        write_xml_header(writer, root_tag)
-        
-        context = ET.iterparse(source_file, events=('end',))
-        for _, elem in context:
-            if elem.tag == 'row':
-                if elem.get(id_attribute) in relevant_user_ids:
-                    # Aplica filtro de data apenas para o arquivo de Badges
-                    if is_badges_file:
-                        badge_date = elem.get('Date')
-                        if is_date_in_range(badge_date):
-                            writer.write('  ' + ET.tostring(elem, encoding='unicode'))
-                            count += 1
-                    else: # Para Users.xml, não há filtro de data
-                        writer.write('  ' + ET.tostring(elem, encoding='unicode'))
-                        count += 1
-                elem.clear()
-        
-        write_xml_footer(writer, root_tag)
+def filter_post_links(relevant_post_ids):
+    """Filtra PostLinks.xml por PostId e data."""
+    filter_files_by_post_id(['PostLinks.xml'], relevant_post_ids)
 
-    print(f"{filename} processado. {count} linhas relevantes salvas em '{output_file}'.\n")
+def filter_file_by_user_id(filename, relevant_user_ids):
+    """
+    Filtra Users.xml (sem filtro de data) e Badges.xml (com filtro de data).
+    """
+    filter_files_by_user_id([filename], relevant_user_ids)
 
 if __name__ == '__main__':
     create_output_dir()
+    if REBUILD_POST_TAGS:
+        with _run_report.stage('PostTags'):
+            create_post_tags_from_files()
+        if RUN_REPORT:
+            print(f"Relatório da execução salvo em '{_run_report.write(OUTPUT_DIR / 'run-reports')}'.")
+        raise SystemExit
+    base = load_incremental_base() if INCREMENTAL else None
+    if base:
+        _current_output_dir = delta_dir(base)
+        os.makedirs(_current_output_dir, exist_ok=True)
+        print(f"Modo incremental: lendo apenas as linhas novas desde a execução {base[0]['run']}. "
+              f"O delta será salvo em '{_current_output_dir}'.")
+    resuming = start_checkpoints(base)
+    if PARQUET_OUTPUT and not resuming:
+        # Arquivos Parquet de outra execução podem ter outra divisão em shards
+        shutil.rmtree((_current_output_dir or OUTPUT_DIR) / 'parquet', ignore_errors=True)
     
-    relevant_tags = filter_tags()
-    relevant_post_ids, relevant_user_ids = filter_posts(relevant_tags)
+    _run_report.data['config'] = run_config(base)
     
-    files_to_filter_by_post = ['Comments.xml', 'Votes.xml', 'PostHistory.xml']
-    for filename in files_to_filter_by_post:
-        found_users = filter_file_by_post_id(filename, relevant_post_ids)
-        relevant_user_ids.update(found_users)
-        
-    filter_post_links(relevant_post_ids)
+    with _run_report.stage('Tags'):
+        relevant_tags, tag_ids = filter_tags()
+    with _run_report.stage('Posts'):
+        relevant_post_ids, relevant_user_ids = filter_posts(relevant_tags, tag_ids, base)
+    if base:
+        # Linhas novas de Comments, Votes etc. podem apontar para posts de execuções anteriores
+        relevant_post_ids = relevant_post_ids | base[1]['post_ids']
+        relevant_user_ids = relevant_user_ids | base[1]['user_ids']
     
-    create_post_tags_from_files()
+    # Estes arquivos dependem apenas de relevant_post_ids e são filtrados ao mesmo tempo
+    files_to_filter_by_post = ['Comments.xml', 'Votes.xml', 'PostHistory.xml', 'PostLinks.xml']
+    with _run_report.stage('Arquivos por PostId'):
+        found_users = filter_files_by_post_id(files_to_filter_by_post, relevant_post_ids, base)
+        relevant_user_ids |= found_users
+        _run_report.record_id_set('user_ids', relevant_user_ids)
     
     print(f"Total de {len(relevant_user_ids)} usuários únicos para filtrar.")
-    filter_file_by_user_id('Users.xml', relevant_user_ids)
-    filter_file_by_user_id('Badges.xml', relevant_user_ids)
+    print(memory_report("IDs de usuários", relevant_user_ids))
+    with _run_report.stage('Arquivos por UserId'):
+        filter_files_by_user_id(['Users.xml', 'Badges.xml'], relevant_user_ids, base)
     
+    if base and DELTA_OUTPUT == 'append':
+        with _run_report.stage('Acréscimo do delta'):
+            append_delta_files(_current_output_dir)
+    if INCREMENTAL:
+        save_incremental_state(base, relevant_post_ids, relevant_user_ids)
+    finish_checkpoints()
+    if RUN_REPORT:
+        print(f"Relatório da execução salvo em '{_run_report.write(OUTPUT_DIR / 'run-reports')}'.")
     print("--- Processo de filtragem concluído! ---")
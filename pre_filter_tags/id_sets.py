@@ -0,0 +1,249 @@
+import json
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele, as operações em lote usam laços Python
+    np = None
+
+
+def _to_int(value):
+    """Converte um ID vindo do XML (string, bytes ou inteiro) para int; None para valores vazios."""
+    if value is None or value == '' or value == b'':
+        return None
+    return int(value)
+
+
+class IdSet:
+    """
+    Conjunto compacto de IDs inteiros, guardado como bitmap (1 bit por ID possível).
+    Os IDs do Stack Overflow são densos e chegam a algumas dezenas de milhões, então um
+    bitmap ocupa poucos MB, contra vários GB de um set Python de strings. IDs negativos
+    (ex.: o usuário Community, Id=-1) são raros e ficam num set à parte.
+    Aceita os IDs como strings (como vêm do XML) ou inteiros.
+    """
+
+    def __init__(self, ids=()):
+        self._bits = bytearray()
+        self._negatives = set()
+        self._count = 0
+        self.update(ids)
+
+    # --- Inserção ---
+    def _grow(self, max_id):
+        needed = (max_id >> 3) + 1
+        if needed > len(self._bits):
+            self._bits.extend(bytes(max(needed, 2 * len(self._bits)) - len(self._bits)))
+
+    def add(self, value):
+        value = _to_int(value)
+        if value is None:
+            return
+        if value < 0:
+            self._negatives.add(value)
+            self._count = None
+            return
+        index = value >> 3
+        if index >= len(self._bits):
+            self._grow(value)
+        self._bits[index] |= 1 << (value & 7)
+        self._count = None
+
+    def update(self, values):
+        """Insere vários IDs de uma vez (vetorizado com NumPy quando `values` é um array)."""
+        if isinstance(values, IdSet):
+            self |= values
+            return
+        if np is not None and isinstance(values, np.ndarray):
+            values = values.astype(np.int64, copy=False)
+            negatives = values[values < 0]
+            self._negatives.update(int(value) for value in negatives)
+            values = values[values >= 0]
+            if values.size:
+                self._grow(int(values.max()))
+                bits = np.frombuffer(self._bits, dtype=np.uint8)
+                np.bitwise_or.at(bits, values >> 3, (1 << (values & 7)).astype(np.uint8))
+            self._count = None
+            return
+        for value in values:
+            self.add(value)
+
+    # --- Consulta ---
+    def __contains__(self, value):
+        value = _to_int(value)
+        if value is None:
+            return False
+        if value < 0:
+            return value in self._negatives
+        index = value >> 3
+        return index < len(self._bits) and bool(self._bits[index] & (1 << (value & 7)))
+
+    def contains_many(self, values):
+        """
+        Testa vários IDs de uma vez. Com NumPy, devolve um array booleano calculado de forma
+        vetorizada; sem NumPy, uma lista de booleanos.
+        """
+        if np is None:
+            return [value in self for value in values]
+        values = np.asarray(values, dtype=np.int64)
+        bits = np.frombuffer(self._bits, dtype=np.uint8)
+        result = np.zeros(values.shape, dtype=bool)
+        in_range = (values >= 0) & ((values >> 3) < bits.size)
+        candidates = values[in_range]
+        result[in_range] = (bits[candidates >> 3] >> (candidates & 7)) & 1 == 1
+        if self._negatives:
+            negative = values < 0
+            result[negative] = np.isin(values[negative], list(self._negatives))
+        return result
+
+    def __len__(self):
+        if self._count is None:
+            self._count = int.from_bytes(self._bits, 'little').bit_count() + len(self._negatives)
+        return self._count
+
+    def __iter__(self):
+        yield from sorted(self._negatives)
+        for index, byte in enumerate(self._bits):
+            if byte:
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        yield (index << 3) | bit
+
+    # --- União (usada para juntar os resultados dos shards) e diferença ---
+    def __ior__(self, other):
+        if len(other._bits) > len(self._bits):
+            self._bits.extend(bytes(len(other._bits) - len(self._bits)))
+        size = len(other._bits)
+        merged = int.from_bytes(self._bits[:size], 'little') | int.from_bytes(other._bits, 'little')
+        self._bits[:size] = merged.to_bytes(size, 'little')
+        self._negatives |= other._negatives
+        self._count = None
+        return self
+
+    def __or__(self, other):
+        result = self.copy()
+        result |= other
+        return result
+
+    def __sub__(self, other):
+        """IDs deste conjunto que não estão em `other` (ex.: usuários que passaram a ser relevantes)."""
+        result = self.copy()
+        size = min(len(self._bits), len(other._bits))
+        kept = int.from_bytes(self._bits[:size], 'little') & ~int.from_bytes(other._bits[:size], 'little')
+        result._bits[:size] = kept.to_bytes(size, 'little')
+        result._negatives -= other._negatives
+        result._count = None
+        return result
+
+    def difference(self, other):
+        return self - other
+
+    def union(self, *others):
+        result = self.copy()
+        for other in others:
+            result |= other
+        return result
+
+    def copy(self):
+        result = IdSet()
+        result._bits = bytearray(self._bits)
+        result._negatives = set(self._negatives)
+        result._count = self._count
+        return result
+
+    # --- Memória e persistência ---
+    @property
+    def nbytes(self):
+        """Memória ocupada pelo bitmap e pelos IDs negativos."""
+        return len(self._bits) + sys.getsizeof(self._negatives)
+
+    def save(self, path):
+        """Grava o conjunto em disco: uma linha JSON de cabeçalho seguida do bitmap bruto."""
+        header = {'size': len(self._bits), 'negatives': sorted(self._negatives)}
+        with open(path, 'wb') as f:
+            f.write(json.dumps(header).encode() + b'\n')
+            f.write(self._bits)
+
+    @classmethod
+    def load(cls, path):
+        """Lê um conjunto gravado com save()."""
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline())
+            result = cls()
+            result._bits = bytearray(f.read(header['size']))
+            result._negatives = set(header['negatives'])
+            result._count = None
+        return result
+
+    def share(self):
+        """Copia o conjunto para memória compartilhada, para consulta por outros processos."""
+        return SharedIdSet.from_id_set(self)
+
+
+class SharedIdSet:
+    """
+    Versão somente leitura de um IdSet guardada em memória compartilhada. Os processos de
+    filtragem consultam o mesmo bloco de memória em vez de cada um receber uma cópia.
+    Ao ser enviado para outro processo, apenas o nome do bloco é serializado.
+    """
+
+    def __init__(self, name, size, negatives, count, owner=False):
+        self.name = name
+        self.size = size
+        self.negatives = frozenset(negatives)
+        self.count = count
+        self._owner = owner
+        self._shm = shared_memory.SharedMemory(name=name)
+        if not owner:
+            # O bloco pertence ao processo principal: o processo que apenas o lê não deve removê-lo
+            resource_tracker.unregister(self._shm._name, 'shared_memory')
+        self._bits = self._shm.buf
+
+    @classmethod
+    def from_id_set(cls, id_set):
+        """Cria o bloco compartilhado a partir do bitmap de um IdSet."""
+        size = max(1, len(id_set._bits))
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shm.buf[:len(id_set._bits)] = id_set._bits
+        name = shm.name
+        shm.close()
+        return cls(name, size, id_set._negatives, len(id_set), owner=True)
+
+    def __contains__(self, value):
+        value = _to_int(value)
+        if value is None:
+            return False
+        if value < 0:
+            return value in self.negatives
+        index = value >> 3
+        return index < self.size and bool(self._bits[index] & (1 << (value & 7)))
+
+    def __len__(self):
+        return self.count
+
+    def __reduce__(self):
+        return (SharedIdSet, (self.name, self.size, self.negatives, self.count))
+
+    def close(self):
+        """Libera o mapeamento; o processo dono também remove o bloco compartilhado."""
+        self._bits = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def estimated_str_set_bytes(count, average_id_length=8):
+    """Estimativa da memória de um set Python com `count` IDs em string (objetos + tabela hash)."""
+    str_bytes = sys.getsizeof('0' * average_id_length)
+    # A tabela hash de um set mantém de 1,5 a 3 entradas de 16 bytes por elemento
+    return count * (str_bytes + 2 * 16)
+
+
+def memory_report(label, id_set):
+    """Linha de log com o tamanho do conjunto e a memória economizada em relação a um set de strings."""
+    count = len(id_set)
+    return (
+        f"{label}: {count} IDs em {id_set.nbytes / 1024 ** 2:.1f} MB "
+        f"(um set de strings equivalente ocuparia ~{estimated_str_set_bytes(count) / 1024 ** 2:.1f} MB)"
+    )
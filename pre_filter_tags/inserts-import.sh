@@ -1,19 +1,41 @@
+# Com NUM_WORKERS > 1 em xml_to_sql.py, tabelas grandes são geradas em partes
+# (posts_inserts.001.sql, posts_inserts.002.sql, ...) e, com MAX_CHUNK_ROWS/MAX_CHUNK_BYTES, em arquivos
+# menores (posts_inserts.chunk0001.sql, posts_inserts.001.chunk0001.sql, ...); importa todos, em ordem
+importar() {
+    for f in "$1"_inserts.sql "$1"_inserts.chunk[0-9]*.sql "$1"_inserts.[0-9][0-9][0-9].sql "$1"_inserts.[0-9][0-9][0-9].chunk[0-9]*.sql; do
+        [ -f "$f" ] && psql -h localhost -U postgres -d stackoverflow_db -f "$f"
+    done > log_importacao.txt 2>&1
+}
+
+# 0. Cria as tabelas sem chaves nem índices (schema-create.sql, gerado por xml_to_sql.py)
+psql -h localhost -U postgres -d stackoverflow_db -f schema-create.sql > log_importacao.txt 2>&1
+
 # 1. Tabelas sem dependências
-psql -h localhost -U postgres -d stackoverflow_db -f users_inserts.sql > log_importacao.txt 2>&1
-psql -h localhost -U postgres -d stackoverflow_db -f tags_inserts.sql > log_importacao.txt 2>&1
+importar users
+importar tags
 
 # 2. Tabelas que dependem das anteriores (ex: Posts dependem de Users)
-psql -h localhost -U postgres -d stackoverflow_db -f posts_inserts.sql > log_importacao.txt 2>&1
-psql -h localhost -U postgres -d stackoverflow_db -f posttags_inserts.sql > log_importacao.txt 2>&1
+importar posts
+importar posttags
+importar questiontargettags
 
 # 3. Tabelas que dependem de Posts
-psql -h localhost -U postgres -d stackoverflow_db -f comments_inserts.sql > log_importacao.txt 2>&1
-psql -h localhost -U postgres -d stackoverflow_db -f votes_inserts.sql > log_importacao.txt 2>&1
-psql -h localhost -U postgres -d stackoverflow_db -f posthistory_inserts.sql > log_importacao.txt 2>&1
-psql -h localhost -U postgres -d stackoverflow_db -f postlinks_inserts.sql > log_importacao.txt 2>&1
+importar comments
+importar votes
+importar posthistory
+importar postlinks
 
 # 4. Tabela que depende de Users
-psql -h localhost -U postgres -d stackoverflow_db -f badges_inserts.sql > log_importacao.txt 2>&1
+importar badges
+
+# Cria chaves e índices depois de adicionar todos os dados
+psql -h localhost -U postgres -d stackoverflow_db -f schema-post-load.sql > log_importacao.txt 2>&1
+
+# Alternativa bem mais rápida: com OUTPUT_FORMAT = 'copy-text' (ou 'copy-csv') em xml_to_sql.py,
+# os dados saem no formato do COPY e são carregados todos, na ordem acima, por copy-import.sql
+# (entre schema-create.sql e schema-post-load.sql):
+# cd ../stackoverflow-data/sql-stackoverflow.com && psql -h localhost -U postgres -d stackoverflow_db -f copy-import.sql > log_importacao.txt 2>&1
 
-# Atualiza constraints depois de adicionar todos os dados
-# psql -h localhost -U postgres -d stackoverflow_db -f alter-table-schemas.sql
+# Com MAX_CHUNK_ROWS ou MAX_CHUNK_BYTES, os arquivos (INSERT ou COPY) ficam listados em manifest.json e
+# load_chunks.py carrega vários ao mesmo tempo, repetindo só os que falharem:
+# python load_chunks.py
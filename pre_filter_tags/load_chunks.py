@@ -0,0 +1,121 @@
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+# --- CONFIGURAÇÃO ---
+# Pasta com os arquivos e o manifest.json gerados por xml_to_sql.py
+SQL_DIR = Path('../stackoverflow-data/sql-stackoverflow.com')
+
+# Conexão com o banco (os mesmos argumentos do psql em inserts-import.sh)
+PSQL_ARGS = ['-h', 'localhost', '-U', 'postgres', '-d', 'stackoverflow_db']
+
+# Arquivos carregados ao mesmo tempo (uma conexão psql por arquivo)
+NUM_WORKERS = 4
+# Tentativas de cada arquivo nesta execução; os que ainda falharem são repetidos na próxima
+MAX_ATTEMPTS = 2
+# --- FIM DA CONFIGURAÇÃO ---
+
+# Estado da carga: o que já foi carregado, para retomar sem repetir arquivos
+STATE_FILE = 'load-state.json'
+LOG_DIR = 'load-logs'
+
+def load_state(manifest):
+    """Estado salvo da carga deste manifesto; um manifesto regerado começa do zero."""
+    path = SQL_DIR / STATE_FILE
+    if path.exists():
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('manifest_created_at') == manifest['created_at']:
+            return state
+    return {'manifest_created_at': manifest['created_at'], 'steps': {}}
+
+def save_state(state):
+    path = SQL_DIR / STATE_FILE
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+def run_psql(name, args):
+    """
+    Executa o psql a partir de SQL_DIR (os caminhos do manifesto são relativos a ela), parando no
+    primeiro erro. Como cada arquivo é uma única transação (um script entre BEGIN e COMMIT ou um
+    \\copy), um arquivo que falha não deixa linhas no banco e pode ser carregado de novo.
+    Retorna (sucesso, segundos); a saída de uma falha fica em LOG_DIR/<arquivo>.log.
+    """
+    started = time.monotonic()
+    result = subprocess.run(
+        ['psql', *PSQL_ARGS, '-X', '-q', '-v', 'ON_ERROR_STOP=1', *args],
+        cwd=SQL_DIR, capture_output=True, text=True)
+    seconds = round(time.monotonic() - started, 3)
+    if result.returncode != 0:
+        os.makedirs(SQL_DIR / LOG_DIR, exist_ok=True)
+        with open(SQL_DIR / LOG_DIR / f'{name}.log', 'w', encoding='utf-8') as f:
+            f.write(result.stdout + result.stderr)
+    return result.returncode == 0, seconds
+
+def load_chunk(chunk):
+    """Carrega um arquivo do manifesto, com até MAX_ATTEMPTS tentativas; retorna (sucesso, tentativas, segundos)."""
+    args = ['-c', chunk['command']] if chunk['command'] else ['-f', chunk['file']]
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        ok, seconds = run_psql(chunk['file'], args)
+        if ok:
+            break
+    return ok, attempt, seconds
+
+def run_step(state, name):
+    """Executa um script de schema do manifesto uma única vez (fica registrado no estado)."""
+    if state['steps'].get(name) == 'done':
+        return True
+    print(f"Executando {name}...")
+    ok, _ = run_psql(name, ['-f', name])
+    state['steps'][name] = 'done' if ok else 'failed'
+    save_state(state)
+    if not ok:
+        print(f"Falha em {name}; veja '{SQL_DIR / LOG_DIR / (name + '.log')}'.")
+    return ok
+
+if __name__ == '__main__':
+    with open(SQL_DIR / 'manifest.json', encoding='utf-8') as f:
+        manifest = json.load(f)
+    state = load_state(manifest)
+    chunk_states = state.setdefault('chunks', {})
+
+    if not run_step(state, manifest['schema_create']):
+        raise SystemExit(1)
+
+    pending = [chunk for chunk in manifest['chunks'] if chunk_states.get(chunk['file'], {}).get('status') != 'done']
+    done_count = len(manifest['chunks']) - len(pending)
+    print(f"{len(pending)} arquivos a carregar ({done_count} já carregados) com {NUM_WORKERS} conexões...")
+
+    # Os maiores primeiro, para que o tempo total fique próximo ao do maior arquivo
+    pending.sort(key=lambda chunk: chunk['bytes'], reverse=True)
+    started = time.monotonic()
+    loaded_rows = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=NUM_WORKERS) as executor:
+        futures = {executor.submit(load_chunk, chunk): chunk for chunk in pending}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            ok, attempts, seconds = future.result()
+            chunk_states[chunk['file']] = {'status': 'done' if ok else 'failed', 'attempts': attempts, 'seconds': seconds}
+            save_state(state)
+            if ok:
+                loaded_rows += chunk['rows']
+                print(f"  {chunk['file']}: {chunk['rows']} linhas em {seconds:.1f}s")
+            else:
+                failed.append(chunk['file'])
+                print(f"  {chunk['file']}: FALHOU após {attempts} tentativas")
+
+    elapsed = time.monotonic() - started
+    print(f"{loaded_rows} linhas carregadas em {elapsed:.1f}s ({loaded_rows / elapsed if elapsed else 0:.0f} linhas/s).")
+    if failed:
+        print(f"--- {len(failed)} arquivos falharam (logs em '{SQL_DIR / LOG_DIR}'); execute de novo para repetir só esses. ---")
+        raise SystemExit(1)
+
+    if not run_step(state, manifest['post_load']):
+        raise SystemExit(1)
+    print("--- Carga concluída! ---")
@@ -0,0 +1,119 @@
+import sqlite3
+import time
+
+try:
+    import duckdb
+    import pyarrow as pa
+except ImportError:  # Opcional: só é necessário com OUTPUT_FORMAT = 'duckdb'
+    duckdb = None
+
+# Tipos das colunas de xml_to_sql.SCHEMA em cada banco
+SQLITE_TYPES = {'int': 'INTEGER', 'smallint': 'INTEGER', 'boolean': 'INTEGER'}
+DUCKDB_TYPES = {
+    'int': 'INTEGER', 'smallint': 'SMALLINT', 'timestamp': 'TIMESTAMP', 'date': 'DATE',
+    'boolean': 'BOOLEAN', 'uuid': 'UUID',
+}
+
+
+def _quote(name):
+    return f'"{name.lower()}"'
+
+
+def _sqlite_value(dtype):
+    """Conversão do texto do XML para o valor gravado no SQLite (datas ficam como texto ISO)."""
+    if dtype in ['int', 'smallint']:
+        return int
+    if dtype == 'boolean':
+        return lambda value: 1 if value.lower() == 'true' else 0
+    if dtype == 'date':
+        # Votes.CreationDate vem como '2018-01-01T00:00:00.000'
+        return lambda value: value[:10]
+    return None
+
+
+class LocalDatabase:
+    """
+    Carga dos arquivos filtrados num banco local embutido, sem servidor: SQLite (padrão do Python)
+    ou DuckDB (requer os módulos 'duckdb' e 'pyarrow'). As tabelas são criadas a partir das colunas
+    de xml_to_sql.SCHEMA, sem índices nem chaves; cada tabela é carregada em lotes dentro de uma
+    única transação e os índices são criados só depois da carga (create_indexes), o que é bem
+    mais rápido do que mantê-los atualizados linha a linha.
+    """
+
+    def __init__(self, path, backend='sqlite'):
+        if backend not in ('sqlite', 'duckdb'):
+            raise ValueError(f"Banco local inválido: '{backend}' (use 'sqlite' ou 'duckdb').")
+        if backend == 'duckdb' and duckdb is None:
+            raise RuntimeError("O banco DuckDB requer os módulos 'duckdb' e 'pyarrow' (pip install duckdb pyarrow).")
+        self.path = path
+        self.backend = backend
+        self.tables = {}
+        if path.exists():
+            path.unlink()
+        if backend == 'sqlite':
+            # isolation_level=None: as transações são abertas e confirmadas explicitamente
+            self.connection = sqlite3.connect(path, isolation_level=None)
+            # O banco é recriado a cada execução, então não precisa sobreviver a uma falha no meio da carga
+            self.connection.execute('PRAGMA journal_mode = OFF')
+            self.connection.execute('PRAGMA synchronous = OFF')
+            self.connection.execute('PRAGMA cache_size = -262144')
+        else:
+            self.connection = duckdb.connect(str(path))
+
+    def create_table(self, table_name, columns):
+        """Cria a tabela e abre a transação da sua carga."""
+        types = SQLITE_TYPES if self.backend == 'sqlite' else DUCKDB_TYPES
+        column_defs = ', '.join(f'{_quote(name)} {types.get(dtype, "TEXT")}' for name, dtype in columns)
+        self.connection.execute(f'CREATE TABLE {table_name} ({column_defs})')
+        self.connection.execute('BEGIN')
+        self.tables[table_name] = columns
+
+    def insert_batch(self, table_name, rows):
+        """Insere um lote de linhas (listas com os textos do XML, None para atributos ausentes)."""
+        columns = self.tables[table_name]
+        if self.backend == 'sqlite':
+            converters = [_sqlite_value(dtype) for _, dtype in columns]
+            placeholders = ', '.join('?' * len(columns))
+            self.connection.executemany(
+                f'INSERT INTO {table_name} VALUES ({placeholders})',
+                ([value if value is None or convert is None else convert(value) for value, convert in zip(row, converters)]
+                 for row in rows))
+            return
+        # DuckDB: o lote vai como uma tabela Arrow de textos e a conversão de tipos é feita pelo banco
+        batch = pa.table({f'c{i}': pa.array([row[i] for row in rows], type=pa.string()) for i in range(len(columns))})
+        casts = ', '.join(
+            f'CAST(CAST(c{i} AS TIMESTAMP) AS DATE)' if dtype == 'date' else f'CAST(c{i} AS {DUCKDB_TYPES.get(dtype, "VARCHAR")})'
+            for i, (_, dtype) in enumerate(columns))
+        self.connection.register('batch', batch)
+        self.connection.execute(f'INSERT INTO {table_name} SELECT {casts} FROM batch')
+        self.connection.unregister('batch')
+
+    def finish_table(self, table_name):
+        """Confirma a carga da tabela."""
+        self.connection.execute('COMMIT')
+
+    def create_indexes(self, indexes=()):
+        """
+        Cria, depois da carga, um índice único em Id para cada tabela que tem essa coluna e os
+        índices de `indexes`, [(tabela, colunas)] (os de xml_to_sql.POST_LOAD_INDEXES), das tabelas
+        carregadas. Retorna [(comando, segundos)].
+        """
+        statements = [
+            f'CREATE UNIQUE INDEX pk_{table_name} ON {table_name} ("id")'
+            for table_name, columns in self.tables.items() if columns[0][0] == 'Id'
+        ]
+        statements += [
+            f'CREATE INDEX idx_{table_name}_{"_".join(columns)} ON {table_name} ({", ".join(map(_quote, columns))})'
+            for table_name, columns in indexes if table_name in self.tables
+        ]
+        timings = []
+        for statement in statements:
+            started = time.monotonic()
+            self.connection.execute(statement)
+            timings.append((statement, round(time.monotonic() - started, 3)))
+        if self.backend == 'sqlite':
+            self.connection.execute('ANALYZE')
+        return timings
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,159 @@
+import xml.etree.ElementTree as ET
+import os
+import re
+
+from dump_reader import parse_row_line, strip_compression_suffix
+from xml_to_sql import SCHEMA
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # Opcional: só é necessário com a saída Parquet ativada
+    pa = None
+
+# Colunas usadas para particionar as tabelas por ano, na ordem de preferência
+PARTITION_COLUMNS = ('CreationDate', 'Date')
+
+# Quantidade de bytes XML acumulados antes de interpretar as linhas
+PARSE_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Sufixo dos arquivos parciais dos shards ('filtered_Posts.xml.part0003')
+_PART_SUFFIX = re.compile(r'\.(part\d+)$')
+
+
+def arrow_type(dtype):
+    """Tipo Arrow correspondente a um tipo de coluna de xml_to_sql.SCHEMA."""
+    return {
+        'int': pa.int64(),
+        'smallint': pa.int16(),
+        'timestamp': pa.timestamp('ms'),
+        'date': pa.date32(),
+        'boolean': pa.bool_(),
+    }.get(dtype, pa.string())
+
+
+def to_arrow(values, dtype):
+    """Converte uma coluna de strings do XML (None para atributos ausentes) para o tipo do SCHEMA."""
+    array = pa.array(values, type=pa.string())
+    if dtype == 'date':
+        # Votes.CreationDate vem como '2018-01-01T00:00:00.000'
+        return pc.utf8_slice_codeunits(array, 0, 10).cast(pa.date32())
+    return array.cast(arrow_type(dtype))
+
+
+class ParquetSink:
+    """
+    Converte as linhas escritas num arquivo filtrado em Parquet tipado, usando os tipos de
+    xml_to_sql.SCHEMA. Tabelas com data são particionadas por ano no estilo Hive
+    (parquet/posts/year=2019/...), o que permite ler apenas os anos e colunas necessários.
+    Cada arquivo XML (ou parte de shard) gera seus próprios arquivos Parquet, nomeados pela
+    posição do XML em que começam: depois de um checkpoint, os arquivos anteriores ficam
+    completos e, ao retomar, os posteriores à posição retomada são descartados.
+    """
+
+    def __init__(self, xml_path, resume_at=None, row_group_rows=128_000, compression='zstd'):
+        if pa is None:
+            raise RuntimeError("A saída Parquet requer o módulo 'pyarrow' (pip install pyarrow).")
+        match = _PART_SUFFIX.search(xml_path.name)
+        self.label = match.group(1) if match else 'all'
+        filename = strip_compression_suffix(_PART_SUFFIX.sub('', xml_path.name))
+        if filename not in SCHEMA:
+            raise ValueError(f"Nenhum schema definido para '{filename}' em xml_to_sql.SCHEMA.")
+
+        self.table_name = SCHEMA[filename]['table_name']
+        self.columns = SCHEMA[filename]['columns']
+        self.fields = tuple(column for column, _ in self.columns)
+        self.partition_column = next((column for column in PARTITION_COLUMNS if column in self.fields), None)
+        self.schema = pa.schema([(column, arrow_type(dtype)) for column, dtype in self.columns])
+        self.directory = xml_path.parent / 'parquet' / self.table_name
+        self.row_group_rows = row_group_rows
+        self.compression = compression
+
+        self._segment = resume_at or 0
+        self._remove_files_from(self._segment)
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._pending = b''
+        self._rows = {}
+        self._writers = {}
+
+    def _remove_files_from(self, segment):
+        """Apaga arquivos desta saída que começam em `segment` ou depois (escritos após o último checkpoint)."""
+        if not self.directory.exists():
+            return
+        pattern = re.compile(rf'{self.label}-(\d+)\.parquet$')
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                match = pattern.match(filename)
+                if match and int(match.group(1)) >= segment:
+                    os.remove(os.path.join(root, filename))
+
+    def write(self, data):
+        """Recebe os mesmos bytes escritos no arquivo XML."""
+        self._buffer.append(data)
+        self._buffer_bytes += len(data)
+        if self._buffer_bytes >= PARSE_BLOCK_SIZE:
+            self._parse_buffer()
+
+    def _parse_buffer(self):
+        data = self._pending + b''.join(self._buffer)
+        self._buffer = []
+        self._buffer_bytes = 0
+        lines = data.split(b'\n')
+        # A última parte é uma linha incompleta (ou vazia, se os dados terminam em '\n')
+        self._pending = lines.pop()
+        row_lines = []
+        for line in lines:
+            if row_lines and not row_lines[-1].rstrip().endswith(b'/>'):
+                row_lines[-1] += b'\n' + line
+            elif b'<row' in line:
+                row_lines.append(line)
+        if row_lines and not row_lines[-1].rstrip().endswith(b'/>'):
+            self._pending = row_lines.pop() + b'\n' + self._pending
+        for line in row_lines:
+            self._add_row(line)
+
+    def _add_row(self, line):
+        row = parse_row_line(line, self.fields)
+        if row is None:
+            elem = ET.fromstring(line.strip())
+            row = {field: elem.get(field) for field in self.fields if elem.get(field) is not None}
+        year = row.get(self.partition_column, '')[:4] if self.partition_column else None
+        columns = self._rows.get(year)
+        if columns is None:
+            columns = self._rows[year] = {field: [] for field in self.fields}
+        for field in self.fields:
+            columns[field].append(row.get(field))
+        if len(columns[self.fields[0]]) >= self.row_group_rows:
+            self._write_rows(year)
+
+    def _write_rows(self, year):
+        """Grava as linhas acumuladas de um ano como um row group do arquivo desse ano."""
+        columns = self._rows.pop(year)
+        table = pa.Table.from_arrays(
+            [to_arrow(columns[column], dtype) for column, dtype in self.columns], schema=self.schema)
+        writer = self._writers.get(year)
+        if writer is None:
+            directory = self.directory / f'year={year or "unknown"}' if self.partition_column else self.directory
+            os.makedirs(directory, exist_ok=True)
+            path = directory / f'{self.label}-{self._segment:015d}.parquet'
+            writer = self._writers[year] = pq.ParquetWriter(path, self.schema, compression=self.compression)
+        writer.write_table(table, row_group_size=self.row_group_rows)
+
+    def _close_files(self):
+        self._parse_buffer()
+        for year in list(self._rows):
+            self._write_rows(year)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+    def checkpoint(self, offset):
+        """Fecha os arquivos atuais; as próximas linhas vão para arquivos que começam em `offset`."""
+        self._close_files()
+        self._segment = offset
+
+    def close(self):
+        self._close_files()
+
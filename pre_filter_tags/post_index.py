@@ -0,0 +1,241 @@
+import xml.etree.ElementTree as ET
+import argparse
+import bisect
+import mmap
+import os
+import struct
+from array import array
+from pathlib import Path
+
+from dump_reader import RowScanner, parse_row_line
+
+# --- CONFIGURAÇÃO ---
+# Pasta com filtered_Posts.xml e seu índice (usada pela linha de comando)
+INPUT_DIR = Path('../stackoverflow-data/filtered-data-stackoverflow.com')
+# --- FIM DA CONFIGURAÇÃO ---
+
+# Cabeçalho do índice: identificação do formato e quantidades de posts e de respostas
+INDEX_MAGIC = b'SOPIDX01'
+_HEADER = struct.Struct('<8sqq')
+
+# Registro das posições gravadas durante a filtragem: Id, ParentId (0 se não houver), posição
+_ENTRY = struct.Struct('<qqq')
+
+# Atributos usados para indexar um post
+INDEX_FIELDS = ('Id', 'ParentId')
+
+
+def index_path(xml_path):
+    """Caminho do índice de um arquivo de posts ('filtered_Posts.xml' -> 'filtered_Posts.xml.idx')."""
+    return xml_path.with_name(xml_path.name + '.idx')
+
+
+def entries_path(xml_path):
+    """Arquivo temporário com as posições registradas enquanto `xml_path` é escrito."""
+    return xml_path.with_name(xml_path.name + '.offsets')
+
+
+class PostOffsetSink:
+    """
+    Registra, enquanto um arquivo de posts descompactado é escrito, a posição de cada linha <row>
+    (Id, ParentId, posição) num arquivo de registros de tamanho fixo, ao lado do XML. Cada
+    chamada de write() com uma linha <row> deve conter exatamente uma row, como em write_row.
+    No checkpoint os registros são confirmados em disco; ao retomar em `resume_at`, os
+    registros de linhas posteriores a essa posição são descartados.
+    """
+
+    def __init__(self, xml_path, resume_at=None):
+        self.path = entries_path(xml_path)
+        self.position = resume_at or 0
+        if resume_at is None:
+            self._file = open(self.path, 'wb')
+        else:
+            self._file = open(self.path, 'r+b')
+            self._file.truncate(_entries_before(self.path, resume_at) * _ENTRY.size)
+            self._file.seek(0, os.SEEK_END)
+        self._entries = array('q')
+
+    def write(self, data):
+        if b'<row' in data:
+            row = parse_row_line(data, INDEX_FIELDS)
+            if row is None:
+                row = _parse_fallback(data)
+            self._entries.extend((int(row['Id']), int(row.get('ParentId') or 0), self.position))
+        self.position += len(data)
+
+    def _flush(self):
+        self._file.write(self._entries.tobytes())
+        self._entries = array('q')
+
+    def checkpoint(self, offset):
+        self._flush()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._flush()
+        self._file.close()
+
+
+def _parse_fallback(data):
+    elem = ET.fromstring(data.strip())
+    return {field: elem.get(field) for field in INDEX_FIELDS if elem.get(field) is not None}
+
+
+def _entries_before(path, offset):
+    """Quantidade de registros de `path` cuja linha começa antes de `offset` (estão em ordem de posição)."""
+    entries = array('q', path.read_bytes())
+    offsets = memoryview(entries)[2::3]
+    return bisect.bisect_left(offsets, offset)
+
+
+def build_index(xml_path, parts):
+    """
+    Gera o índice de `xml_path` a partir dos registros de posição gravados durante a filtragem.
+    `parts` é uma lista de (arquivo de registros, deslocamento): o deslocamento é a posição, no
+    arquivo final, do início do arquivo em que os registros foram gravados (um shard, por
+    exemplo). Os arquivos de registros são removidos.
+    """
+    entries = array('q')
+    for path, base in parts:
+        part = array('q', path.read_bytes())
+        if base:
+            for i in range(2, len(part), 3):
+                part[i] += base
+        entries.extend(part)
+    write_index(xml_path, entries[0::3], entries[1::3], entries[2::3])
+    for path, _ in parts:
+        os.remove(path)
+
+
+def rebuild_index(xml_path):
+    """Gera o índice lendo um arquivo de posts já existente (descompactado)."""
+    ids, parent_ids, offsets = array('q'), array('q'), array('q')
+    scanner = RowScanner(xml_path, INDEX_FIELDS)
+    for raw, row in scanner:
+        # `position` é o fim da linha devolvida
+        ids.append(int(row['Id']))
+        parent_ids.append(int(row.get('ParentId') or 0))
+        offsets.append(scanner.position - len(raw))
+    write_index(xml_path, ids, parent_ids, offsets)
+    return len(ids)
+
+
+def read_index_entries(xml_path):
+    """Retorna (ids, parent_ids, offsets) de um índice existente, em ordem de Id."""
+    with PostIndex(xml_path) as index:
+        return array('q', index.ids), array('q', index.parent_ids), array('q', index.offsets)
+
+
+def write_index(xml_path, ids, parent_ids, offsets):
+    """
+    Grava o índice: os posts ordenados por Id (Id, ParentId, posição) e, para as respostas,
+    a ordem por (ParentId, posição), o que permite buscar um post ou uma discussão inteira
+    por busca binária. A gravação é atômica (arquivo temporário + rename).
+    """
+    order = sorted(range(len(ids)), key=ids.__getitem__)
+    sorted_ids = array('q', (ids[i] for i in order))
+    sorted_parents = array('q', (parent_ids[i] for i in order))
+    sorted_offsets = array('q', (offsets[i] for i in order))
+    answers = array('q', sorted(
+        (i for i in range(len(order)) if sorted_parents[i]),
+        key=lambda i: (sorted_parents[i], sorted_offsets[i])))
+
+    path = index_path(xml_path)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'wb') as f:
+        f.write(_HEADER.pack(INDEX_MAGIC, len(sorted_ids), len(answers)))
+        for values in (sorted_ids, sorted_parents, sorted_offsets, answers):
+            f.write(values.tobytes())
+    os.replace(temp_path, path)
+
+
+class PostIndex:
+    """
+    Acesso direto às linhas de um filtered_Posts.xml descompactado pelo índice gerado na
+    filtragem (ou por rebuild_index). O índice é mapeado em memória, então abrir e consultar
+    custa poucos milissegundos mesmo com milhões de posts.
+    """
+
+    def __init__(self, xml_path):
+        self.xml_path = xml_path
+        with open(index_path(xml_path), 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, answer_count = _HEADER.unpack_from(self._mmap)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"'{index_path(xml_path)}' não é um índice de posts.")
+        self._view = view = memoryview(self._mmap)[_HEADER.size:].cast('q')
+        self.ids = view[:count]
+        self.parent_ids = view[count:2 * count]
+        self.offsets = view[2 * count:3 * count]
+        self.answers = view[3 * count:3 * count + answer_count]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _position(self, post_id):
+        i = bisect.bisect_left(self.ids, post_id)
+        return i if i < len(self.ids) and self.ids[i] == post_id else None
+
+    def offset(self, post_id):
+        """Posição da linha do post no XML, ou None se o post não estiver no arquivo."""
+        i = self._position(int(post_id))
+        return None if i is None else self.offsets[i]
+
+    def answer_offsets(self, question_id):
+        """Posições das respostas de uma pergunta, na ordem do arquivo."""
+        question_id = int(question_id)
+        parents = self.parent_ids
+        start = bisect.bisect_left(self.answers, question_id, key=lambda i: parents[i])
+        end = bisect.bisect_right(self.answers, question_id, lo=start, key=lambda i: parents[i])
+        return [self.offsets[i] for i in self.answers[start:end]]
+
+    def read_rows(self, offsets, fields=('Id', 'ParentId', 'PostTypeId', 'Title', 'Body')):
+        """Lê as linhas nas posições dadas; retorna uma lista de (bytes da linha, atributos)."""
+        rows = []
+        for offset in offsets:
+            rows.append(next(iter(RowScanner(self.xml_path, fields, start=offset))))
+        return rows
+
+    def get(self, post_id, fields=('Id', 'ParentId', 'PostTypeId', 'Title', 'Body')):
+        """(bytes da linha, atributos) de um post, ou None se ele não estiver no arquivo."""
+        offset = self.offset(post_id)
+        return None if offset is None else self.read_rows([offset], fields)[0]
+
+    def thread(self, question_id, fields=('Id', 'ParentId', 'PostTypeId', 'Title', 'Body')):
+        """A pergunta (se estiver no arquivo) seguida de suas respostas, como em get()."""
+        offset = self.offset(question_id)
+        offsets = ([offset] if offset is not None else []) + self.answer_offsets(question_id)
+        return self.read_rows(offsets, fields)
+
+    def close(self):
+        for view in (self.ids, self.parent_ids, self.offsets, self.answers, self._view):
+            view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Busca posts de filtered_Posts.xml pelo Id, usando o índice de posições.")
+    parser.add_argument('post_ids', nargs='*', type=int, help="Ids dos posts a mostrar")
+    parser.add_argument('--thread', action='store_true', help="mostra também as respostas de cada pergunta")
+    parser.add_argument('--posts', type=Path, default=INPUT_DIR / 'filtered_Posts.xml', help="arquivo de posts (descompactado)")
+    parser.add_argument('--rebuild', action='store_true', help="gera o índice a partir do arquivo de posts")
+    args = parser.parse_args()
+
+    if args.rebuild or not index_path(args.posts).exists():
+        print(f"Gerando o índice de '{args.posts}'...")
+        print(f"{rebuild_index(args.posts)} posts indexados em '{index_path(args.posts)}'.")
+
+    with PostIndex(args.posts) as index:
+        for post_id in args.post_ids:
+            rows = index.thread(post_id) if args.thread else [row for row in [index.get(post_id)] if row]
+            if not rows:
+                print(f"Post {post_id} não encontrado em '{args.posts}'.")
+            for raw, _ in rows:
+                print(raw.decode('utf-8').strip())
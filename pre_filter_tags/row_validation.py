@@ -0,0 +1,217 @@
+import json
+import re
+from itertools import chain, islice
+from datetime import date
+from functools import lru_cache
+
+# Limites dos tipos inteiros do PostgreSQL
+INT_RANGES = {'int': (-2 ** 31, 2 ** 31 - 1), 'smallint': (-2 ** 15, 2 ** 15 - 1)}
+
+_DATE = r'\d{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12]\d|3[01])'
+_TIMESTAMP = rf'{_DATE}[T ](?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d(?:\.\d{{1,6}})?'
+
+# Formato aceito para um valor de cada tipo do SCHEMA; 'text' e 'varchar' aceitam qualquer valor
+VALUE_PATTERNS = {
+    'int': r'-?\d{1,10}',
+    'smallint': r'-?\d{1,5}',
+    'timestamp': _TIMESTAMP,
+    'date': rf'{_DATE}(?:[T ](?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d(?:\.\d{{1,6}})?)?',
+    'boolean': r'(?i:true|false)',
+    'uuid': r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}',
+}
+
+# Timestamps no formato do dump, 'AAAA-MM-DDTHH:MM:SS.mmm': com os dígitos trocados por '0', todos
+# ficam iguais a este modelo
+_DUMP_TIMESTAMP_TEMPLATE = b'0000-00-00T00:00:00.000'
+_DIGITS_TO_ZERO = bytes.maketrans(b'0123456789', b'0' * 10)
+
+# Um campo de dois dígitos (mês, dia, hora) vira um byte com a dezena no meio byte alto e a unidade
+# no baixo ('12' -> 0x12): as dezenas e as unidades de todos os valores são trocadas por esses meios
+# bytes e somadas de uma vez como dois inteiros grandes
+_TENS = bytes.maketrans(b'0123456789', bytes(range(0, 160, 16)))
+_UNITS = bytes.maketrans(b'0123456789', bytes(range(10)))
+_VALID_MONTHS = bytes(int(f'{month:02d}', 16) for month in range(1, 13))
+_VALID_DAYS = bytes(int(f'{day:02d}', 16) for day in range(1, 32))
+_VALID_HOURS = bytes(int(f'{hour:02d}', 16) for hour in range(24))
+# Para o calendário: o número do mês no meio byte baixo e, no alto, 1, 2 ou 3 para os dias 29, 30 e 31
+_MONTH_NUMBERS = bytes({int(f'{month:02d}', 16): month for month in range(1, 13)}.get(code, 0) for code in range(256))
+_LAST_DAYS = bytes({0x29: 0x10, 0x30: 0x20, 0x31: 0x30}.get(code, 0) for code in range(256))
+# 29 de fevereiro depende do ano e fica para a conferência valor a valor
+_VALID_MONTH_DAYS = bytes(
+    last << 4 | month
+    for month, days in enumerate((31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31), 1)
+    for last in range(4) if last == 0 or 28 + last <= days
+)
+
+# Tamanho máximo de um valor copiado para o motivo da rejeição
+_REASON_VALUE_CHARS = 80
+
+
+def _valid_dates(values):
+    # Confere o calendário (ex.: 2019-02-30); o formato já foi conferido pelo padrão
+    try:
+        for value in values:
+            date.fromisoformat(value[:10])
+    except ValueError:
+        return False
+    return True
+
+
+def _ints_are_valid(text, count, dtype):
+    """
+    Todos os valores são inteiros com menos dígitos que o maior valor do tipo (os demais, que podem
+    ou não estar no limite, são conferidos um a um). Com os dígitos trocados por '0', o texto da
+    coluna só pode ter '0', '\\n' entre valores e '-' no início de um valor.
+    """
+    try:
+        shape = text.encode('ascii').translate(_DIGITS_TO_ZERO)
+    except UnicodeEncodeError:
+        return False
+    # Um valor com '\n' passaria como se fossem dois
+    if shape.translate(None, b'0\n-') or shape.count(b'\n') != count - 1:
+        return False
+    if not shape or b'\n\n' in shape or shape.startswith(b'\n') or shape.endswith(b'\n'):
+        return False
+    if b'-' in shape and shape.count(b'-') != shape.count(b'\n-0') + shape.startswith(b'-0'):
+        return False
+    return b'0' * len(str(INT_RANGES[dtype][1])) not in shape
+
+
+@lru_cache(maxsize=8)
+def _dump_timestamp_template(count):
+    return b'\n'.join([_DUMP_TIMESTAMP_TEMPLATE] * count)
+
+
+def _two_digit_fields(data, position, step, count):
+    """O campo de dois dígitos em `position` de cada valor de tamanho fixo `step` (com o '\\n'), um byte por valor."""
+    tens = int.from_bytes(data[position::step].translate(_TENS), 'big')
+    units = int.from_bytes(data[position + 1::step].translate(_UNITS), 'big')
+    return (tens | units).to_bytes(count, 'big')
+
+
+def _dump_timestamps_are_valid(text, count):
+    """
+    Todos os valores estão no formato do dump, com ano a partir de 1000, e existem no calendário.
+    Os valores têm o mesmo tamanho, então o formato é conferido comparando o texto inteiro com o
+    modelo repetido e cada campo (o mês, por exemplo) sai dos bytes como uma fatia com passo fixo.
+    """
+    try:
+        data = text.encode('ascii')
+    except UnicodeEncodeError:
+        return False
+    if data.translate(_DIGITS_TO_ZERO) != _dump_timestamp_template(count):
+        return False
+    step = len(_DUMP_TIMESTAMP_TEMPLATE) + 1
+    # Anos antes de 1000 (incluindo 0000, que não existe) ficam para a conferência valor a valor
+    if b'0' in data[::step]:
+        return False
+    months = _two_digit_fields(data, 5, step, count)
+    days = _two_digit_fields(data, 8, step, count)
+    if (months.translate(None, _VALID_MONTHS) or days.translate(None, _VALID_DAYS)
+            or _two_digit_fields(data, 11, step, count).translate(None, _VALID_HOURS)):
+        return False
+    # Dezenas dos minutos e dos segundos até 5
+    if data[14::step].translate(None, b'012345') or data[17::step].translate(None, b'012345'):
+        return False
+    month_days = int.from_bytes(months.translate(_MONTH_NUMBERS), 'big') | int.from_bytes(days.translate(_LAST_DAYS), 'big')
+    return not month_days.to_bytes(count, 'big').translate(None, _VALID_MONTH_DAYS)
+
+
+class RowValidator:
+    """
+    Confere as linhas de iter_table_rows contra os tipos das colunas (xml_to_sql.SCHEMA) antes da
+    formatação: inteiros dentro do limite do tipo, datas que existem, booleanos 'true'/'false',
+    UUIDs e colunas de `required` (a chave primária) preenchidas. As linhas são conferidas em
+    blocos de `batch_size`, coluna por coluna: os valores de uma coluna no bloco são unidos num
+    único texto e conferidos com poucas operações de string sobre ele (os timestamps do dump têm
+    tamanho fixo, então cada posição é uma fatia do texto). Só uma coluna que não passa por essa
+    conferência é conferida valor a valor, para achar as linhas inválidas. Linhas rejeitadas não
+    chegam à saída e vão para `reject_path` (JSON Lines, criado só se houver rejeições) com o motivo.
+    """
+
+    def __init__(self, columns, required, reject_path, batch_size=1000):
+        self.columns = columns
+        self.reject_path = reject_path
+        self.batch_size = batch_size
+        self.rejected = 0
+        # (posição, nome, tipo, obrigatória, padrão de um valor) das colunas a conferir
+        self._checks = [
+            (i, name, dtype, name.lower() in required, re.compile(VALUE_PATTERNS[dtype], re.ASCII) if dtype in VALUE_PATTERNS else None)
+            for i, (name, dtype) in enumerate(columns) if dtype in VALUE_PATTERNS or name.lower() in required
+        ]
+        self._reject_file = None
+
+    def filter(self, rows):
+        """As linhas válidas de `rows`, na mesma ordem, registrando as rejeitadas."""
+        return chain.from_iterable(self._validated_batches(iter(rows)))
+
+    def _validated_batches(self, rows):
+        # Os blocos são montados e percorridos por islice e chain, sem passar por Python a cada linha
+        while batch := list(islice(rows, self.batch_size)):
+            yield self.validate(batch)
+
+    def validate(self, batch):
+        """Retorna as linhas válidas de um bloco e grava as rejeitadas."""
+        reasons = {}
+        for i, name, dtype, required, value_pattern in self._checks:
+            present = column = [values[i] for values in batch]
+            try:
+                text = '\n'.join(present)
+            except TypeError:
+                # Há valores ausentes (None)
+                if required:
+                    for row, value in enumerate(present):
+                        if value is None:
+                            reasons.setdefault(row, f"{name}: valor ausente")
+                present = [value for value in present if value is not None]
+                text = '\n'.join(present)
+            if value_pattern is None or not present or self._column_is_valid(present, text, dtype, value_pattern):
+                continue
+            for row, value in enumerate(column):
+                if value is not None and row not in reasons and not self._value_is_valid(value, dtype, value_pattern):
+                    reasons[row] = f"{name}: valor inválido para {dtype}: {value[:_REASON_VALUE_CHARS]!r}"
+        if not reasons:
+            return batch
+        self._reject(batch, reasons)
+        return [values for row, values in enumerate(batch) if row not in reasons]
+
+    @classmethod
+    def _column_is_valid(cls, present, text, dtype, value_pattern):
+        """Todos os valores de `present` (unidos em `text`) são válidos."""
+        if dtype in INT_RANGES and _ints_are_valid(text, len(present), dtype):
+            return True
+        if dtype in ('timestamp', 'date') and _dump_timestamps_are_valid(text, len(present)):
+            return True
+        # Valores repetidos (booleanos, UUIDs e datas fora do formato do dump) são conferidos uma vez só
+        return all(cls._value_is_valid(value, dtype, value_pattern) for value in set(present))
+
+    @staticmethod
+    def _value_is_valid(value, dtype, value_pattern):
+        if not value_pattern.fullmatch(value):
+            return False
+        if dtype in INT_RANGES:
+            low, high = INT_RANGES[dtype]
+            return low <= int(value) <= high
+        if dtype in ('timestamp', 'date'):
+            return _valid_dates([value])
+        return True
+
+    def _reject(self, batch, reasons):
+        if self._reject_file is None:
+            self.reject_path.parent.mkdir(parents=True, exist_ok=True)
+            self._reject_file = open(self.reject_path, 'w', encoding='utf-8')
+        for row in sorted(reasons):
+            record = {'reason': reasons[row], 'row': dict(zip((name for name, _ in self.columns), batch[row]))}
+            self._reject_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.rejected += len(reasons)
+
+    def close(self):
+        if self._reject_file:
+            self._reject_file.close()
+            self._reject_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
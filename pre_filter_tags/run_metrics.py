@@ -0,0 +1,188 @@
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Intervalo entre duas linhas de progresso durante a leitura de um arquivo
+PROGRESS_INTERVAL_SECONDS = 60
+# O relógio só é consultado a cada tantas linhas, para não pesar no laço de leitura
+_ROWS_BETWEEN_CLOCK_CHECKS = 4096
+
+MB = 1024 ** 2
+
+
+def peak_rss_bytes(children=False):
+    """
+    Pico de memória residente (RSS) do processo atual ou, com `children`, do maior processo
+    filho já encerrado (ex.: os processos de um ProcessPoolExecutor fechado).
+    """
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # No Linux ru_maxrss está em KB; no macOS, em bytes
+    return usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+
+
+def _rate(amount, seconds):
+    return round(amount / seconds, 1) if seconds > 0 else None
+
+
+class FileProgress:
+    """
+    Mede a leitura de um arquivo (ou de um shard): linhas lidas e mantidas, bytes lidos e escritos,
+    tempo e pico de memória. Enquanto a leitura avança, imprime a cada PROGRESS_INTERVAL_SECONDS
+    uma linha com a posição, a vazão e o RSS. `total_bytes` (o tamanho do arquivo descompactado,
+    quando conhecido) permite mostrar a porcentagem lida.
+    """
+
+    def __init__(self, label, start=0, total_bytes=None):
+        self.label = label
+        self.start = start or 0
+        self.total_bytes = total_bytes
+        self.position = self.start
+        self.rows_read = 0
+        self.rows_kept = 0
+        self.bytes_written = 0
+        self.started = time.monotonic()
+        self.seconds = None
+        self._next_clock_check = _ROWS_BETWEEN_CLOCK_CHECKS
+        self._next_report = self.started + PROGRESS_INTERVAL_SECONDS
+
+    def tick(self, position, kept=False):
+        """Registra uma linha lida, terminando na posição `position` do arquivo."""
+        self.rows_read += 1
+        self.rows_kept += kept
+        self.position = position
+        if self.rows_read >= self._next_clock_check:
+            self._next_clock_check = self.rows_read + _ROWS_BETWEEN_CLOCK_CHECKS
+            now = time.monotonic()
+            if now >= self._next_report:
+                self._next_report = now + PROGRESS_INTERVAL_SECONDS
+                print(self.progress_line(now), flush=True)
+
+    def progress_line(self, now=None):
+        elapsed = (now or time.monotonic()) - self.started
+        bytes_read = self.position - self.start
+        done = f" ({100 * self.position / self.total_bytes:.1f}%)" if self.total_bytes else ''
+        return (
+            f"  {self.label}: {self.rows_read} linhas lidas, {self.rows_kept} mantidas, "
+            f"{self.position / MB:.0f} MB{done} em {elapsed:.0f}s — "
+            f"{_rate(bytes_read / MB, elapsed) or 0} MB/s, {_rate(self.rows_read, elapsed) or 0:.0f} linhas/s, "
+            f"RSS máx. {peak_rss_bytes() / MB:.0f} MB"
+        )
+
+    def finish(self, bytes_written=0):
+        """Encerra a medição e retorna as métricas como um dicionário (serializável em JSON)."""
+        self.seconds = time.monotonic() - self.started
+        self.bytes_written = bytes_written
+        return self.as_dict()
+
+    def as_dict(self):
+        seconds = self.seconds if self.seconds is not None else time.monotonic() - self.started
+        bytes_read = self.position - self.start
+        return {
+            'file': self.label,
+            'rows_read': self.rows_read,
+            'rows_kept': self.rows_kept,
+            'bytes_read': bytes_read,
+            'bytes_written': self.bytes_written,
+            'seconds': round(seconds, 3),
+            'rows_per_second': _rate(self.rows_read, seconds),
+            'input_mb_per_second': _rate(bytes_read / MB, seconds),
+            'peak_rss_mb': round(peak_rss_bytes() / MB, 1),
+        }
+
+
+def merge_file_metrics(label, parts, seconds):
+    """
+    Soma as métricas dos shards de um arquivo. Os shards são lidos ao mesmo tempo (e junto com
+    outros arquivos), então a vazão do arquivo é calculada sobre `seconds`, o tempo decorrido
+    até o último shard terminar.
+    """
+    total = {'file': label, 'shards': len(parts)}
+    for key in ('rows_read', 'rows_kept', 'bytes_read', 'bytes_written'):
+        total[key] = sum(part[key] for part in parts)
+    total['seconds'] = round(seconds, 3)
+    total['rows_per_second'] = _rate(total['rows_read'], seconds)
+    total['input_mb_per_second'] = _rate(total['bytes_read'] / MB, seconds)
+    total['peak_rss_mb'] = max((part['peak_rss_mb'] for part in parts), default=None)
+    return total
+
+
+class CountingReader:
+    """Envolve um arquivo aberto para leitura e conta os bytes lidos (ex.: pelo ET.iterparse)."""
+
+    def __init__(self, f):
+        self.f = f
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class RunReport:
+    """
+    Relatório de uma execução: tempo e memória de cada etapa, métricas de cada arquivo lido e o
+    tamanho dos conjuntos de IDs. Ao final é gravado como JSON, junto com a configuração e a
+    máquina, para comparar execuções entre dumps e hardwares diferentes.
+    """
+
+    def __init__(self, script, config=None):
+        self.started = time.monotonic()
+        self.data = {
+            'script': script,
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'machine': {
+                'hostname': platform.node(),
+                'platform': platform.platform(),
+                'python': platform.python_version(),
+                'cpu_count': os.cpu_count(),
+            },
+            'config': config or {},
+            'stages': [],
+        }
+        self._stage = None
+
+    @contextmanager
+    def stage(self, name):
+        """Mede uma etapa; arquivos e IdSets registrados dentro dela ficam associados a ela."""
+        stage = {'name': name, 'files': [], 'id_sets': {}}
+        previous, self._stage = self._stage, stage
+        started = time.monotonic()
+        try:
+            yield stage
+        finally:
+            stage['seconds'] = round(time.monotonic() - started, 3)
+            stage['peak_rss_mb'] = round(peak_rss_bytes() / MB, 1)
+            stage['workers_peak_rss_mb'] = round(peak_rss_bytes(children=True) / MB, 1)
+            self.data['stages'].append(stage)
+            self._stage = previous
+            print(f"[métricas] {name}: {stage['seconds']:.1f}s, RSS máx. {stage['peak_rss_mb']:.0f} MB "
+                  f"(processos auxiliares: {stage['workers_peak_rss_mb']:.0f} MB)")
+
+    def add_file(self, metrics):
+        """Registra as métricas de um arquivo (FileProgress.finish ou merge_file_metrics)."""
+        if self._stage is not None:
+            self._stage['files'].append(metrics)
+
+    def record_id_set(self, name, id_set):
+        """Registra a quantidade de IDs e a memória de um IdSet."""
+        if self._stage is not None:
+            self._stage['id_sets'][name] = {'count': len(id_set), 'mb': round(id_set.nbytes / MB, 2)}
+
+    def write(self, directory):
+        """Grava o relatório em `directory` com a data da execução no nome; retorna o caminho."""
+        self.data['finished_at'] = datetime.now().isoformat(timespec='seconds')
+        self.data['seconds'] = round(time.monotonic() - self.started, 3)
+        self.data['peak_rss_mb'] = round(peak_rss_bytes() / MB, 1)
+        self.data['workers_peak_rss_mb'] = round(peak_rss_bytes(children=True) / MB, 1)
+        os.makedirs(directory, exist_ok=True)
+        stamp = self.data['started_at'].replace(':', '').replace('-', '')
+        path = directory / f"{self.data['script']}-{stamp}.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        return path
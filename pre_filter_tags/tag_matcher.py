@@ -0,0 +1,65 @@
+import fnmatch
+import re
+
+# Caracteres que transformam um padrão de tag em curinga (sintaxe do fnmatch)
+WILDCARD_CHARS = '*?['
+
+
+def split_tags(tags_str):
+    """
+    Separa o atributo Tags de um post em nomes de tags. Aceita o formato antigo do dump
+    ('<python><pandas>') e o atual ('|python|pandas|').
+    """
+    if not tags_str:
+        return []
+    if tags_str[0] == '<':
+        return tags_str[1:-1].split('><')
+    return tags_str.strip('|').split('|')
+
+
+class TagMatcher:
+    """
+    Associa tags do Stack Overflow às tags alvo do estudo. Cada tag alvo define uma família
+    de padrões: nomes exatos ('pandas'), prefixos ('python-*') ou curingas no estilo fnmatch
+    ('*-python'). O resultado de cada tag concreta é guardado em cache, então os padrões são
+    avaliados uma vez por tag do vocabulário e não uma vez por post.
+    """
+
+    def __init__(self, families):
+        self.families = {family.lower(): [pattern.lower() for pattern in patterns] for family, patterns in families.items()}
+        self._exact = {}
+        self._prefixes = []
+        self._wildcards = []
+        for family, patterns in self.families.items():
+            for pattern in patterns:
+                if not any(char in pattern for char in WILDCARD_CHARS):
+                    self._exact.setdefault(pattern, []).append(family)
+                elif pattern.endswith('*') and not any(char in pattern[:-1] for char in WILDCARD_CHARS):
+                    self._prefixes.append((pattern[:-1], family))
+                else:
+                    self._wildcards.append((re.compile(fnmatch.translate(pattern)), family))
+        self._cache = {}
+
+    def families_for_tag(self, tag):
+        """Famílias (tags alvo) em que a tag se encaixa, na ordem de definição; () se nenhuma."""
+        result = self._cache.get(tag)
+        if result is None:
+            name = tag.lower()
+            matched = set(self._exact.get(name, ()))
+            matched.update(family for prefix, family in self._prefixes if name.startswith(prefix))
+            matched.update(family for regex, family in self._wildcards if regex.match(name))
+            result = self._cache[tag] = tuple(family for family in self.families if family in matched)
+        return result
+
+
+def has_target_tag(tags_str, tag_families):
+    """Indica se alguma tag do post está em `tag_families` (o dicionário {tag: famílias} de filter_tags)."""
+    return not tag_families.keys().isdisjoint(split_tags(tags_str))
+
+
+def matched_families(tags_str, tag_families):
+    """Famílias alvo, sem repetição e em ordem alfabética, das tags de um post."""
+    found = set()
+    for tag in split_tags(tags_str):
+        found.update(tag_families.get(tag, ()))
+    return sorted(found)
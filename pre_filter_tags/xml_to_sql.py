@@ -1,12 +1,64 @@
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
 from pathlib import Path
+import json
+import math
 import os
+import time
+from datetime import datetime
+
+from dump_reader import find_dump_file, is_compressed, open_dump, split_into_shards, strip_compression_suffix
+from local_db import LocalDatabase
+from row_validation import RowValidator
+from run_metrics import CountingReader, FileProgress, RunReport, merge_file_metrics
 
 # --- CONFIGURAÇÃO ---
+# Os arquivos filtrados podem estar compactados (.zst, .gz, .bz2); são lidos em fluxo
 INPUT_DIR = Path('../stackoverflow-data/filtered-data-stackoverflow.com')
 
 OUTPUT_SQL_DIR = Path('../stackoverflow-data/sql-stackoverflow.com')
 BATCH_SIZE = 500
+
+# Formato da saída:
+# - 'insert': um script <tabela>_inserts.sql com INSERTs em lote de BATCH_SIZE linhas
+# - 'copy-text' ou 'copy-csv': um arquivo de dados por tabela (<tabela>.copy ou <tabela>.csv)
+#   no formato do COPY do PostgreSQL e o script copy-import.sql, que carrega todos com \copy
+#   (execute com `psql -f copy-import.sql` a partir de OUTPUT_SQL_DIR). Bem mais rápido de carregar.
+# - 'sqlite' ou 'duckdb': carrega tudo direto num banco local, OUTPUT_SQL_DIR/stackoverflow.sqlite
+#   (ou .duckdb), sem precisar de um servidor PostgreSQL. O DuckDB requer 'duckdb' e 'pyarrow'.
+OUTPUT_FORMAT = 'insert'
+# Linhas inseridas por lote no banco local
+LOCAL_DB_BATCH_SIZE = 50_000
+
+# Processos que convertem as tabelas em paralelo (saídas 'insert' e 'copy-*'); 1 converte uma
+# tabela por vez. O banco local ('sqlite', 'duckdb') é sempre carregado por um único processo.
+NUM_WORKERS = os.cpu_count() or 1
+# Com NUM_WORKERS > 1, arquivos descompactados maiores que isso são divididos em partes de linhas
+# de até esse tamanho, cada uma convertida num arquivo numerado (posts_inserts.001.sql, ...)
+CHUNK_FILE_SIZE = 256 * 1024 * 1024
+
+# Nas saídas 'insert' e 'copy-*', limita cada arquivo gerado a até tantas linhas e/ou bytes: cada
+# tabela (ou parte) vira vários arquivos (posts_inserts.chunk0001.sql, ...), cada script com sua
+# própria transação. O manifest.json lista todos para o load_chunks.py, que os carrega em paralelo
+# e recarrega só os que falharem. None não limita.
+MAX_CHUNK_ROWS = None
+MAX_CHUNK_BYTES = None
+
+# Nas saídas 'insert' e 'copy-*', gera também schema-create.sql (tabelas sem chaves nem índices,
+# para a carga) e schema-post-load.sql (chaves primárias e estrangeiras e índices, para depois dela).
+# Com PARTITION_YEARS (ex.: range(2008, 2026)), as tabelas de PARTITIONED_TABLES são particionadas
+# por ano de creationdate, com uma partição padrão para as datas fora do intervalo.
+PARTITION_YEARS = None
+PARTITIONED_TABLES = ('posts', 'comments', 'votes', 'posthistory', 'postlinks')
+
+# Confere os tipos de cada linha (inteiros no limite do tipo, datas, booleanos, UUIDs e chave primária
+# preenchida) antes de escrevê-la: uma linha inválida não entra na saída (onde faria o PostgreSQL
+# rejeitar o lote inteiro no meio da carga) e vai, com o motivo, para OUTPUT_SQL_DIR/rejects/<tabela>.jsonl
+VALIDATE_ROWS = True
+
+# Grava em OUTPUT_SQL_DIR/run-reports um JSON com tempo, vazão e memória de cada tabela
+RUN_REPORT = True
 # --- FIM DA CONFIGURAÇÃO ---
 
 SCHEMA = {
@@ -82,9 +134,51 @@ SCHEMA = {
             ('PostId', 'int'),
             ('TagId', 'int')
         ]
+    },
+    'filtered_QuestionTargetTags.xml': {
+        'table_name': 'questiontargettags',
+        'columns': [
+            ('PostId', 'int'),
+            ('TargetTag', 'varchar')
+        ]
     }
 }
 
+# Tipos das colunas do SCHEMA no PostgreSQL
+POSTGRES_TYPES = {
+    'int': 'INTEGER', 'smallint': 'SMALLINT', 'timestamp': 'TIMESTAMP', 'date': 'DATE',
+    'boolean': 'BOOLEAN', 'uuid': 'UUID', 'varchar': 'VARCHAR', 'text': 'TEXT',
+}
+
+# Chaves primárias que não são (id)
+PRIMARY_KEYS = {
+    'posttags': ('postid', 'tagid'),
+    'questiontargettags': ('postid', 'targettag'),
+}
+
+# Chaves estrangeiras: (tabela, coluna, tabela referenciada). As de usuários ficam de fora, já que
+# posts e comentários de usuários removidos apontam para Ids que não existem em Users; PostLinks
+# também, porque um dos lados do link pode ser um post fora do filtro.
+FOREIGN_KEYS = [
+    ('posts', 'parentid', 'posts'),
+    ('posttags', 'postid', 'posts'),
+    ('posttags', 'tagid', 'tags'),
+    ('questiontargettags', 'postid', 'posts'),
+    ('comments', 'postid', 'posts'),
+    ('votes', 'postid', 'posts'),
+    ('posthistory', 'postid', 'posts'),
+]
+
+# Índices usados pelas consultas de analysis/ (a busca por tag usa posttags (tagid, postid))
+POST_LOAD_INDEXES = [
+    ('posts', ('posttypeid', 'creationdate')),
+    ('posts', ('parentid',)),
+    ('posttags', ('tagid', 'postid')),
+    ('comments', ('postid',)),
+    ('votes', ('postid',)),
+    ('posthistory', ('postid',)),
+]
+
 
 def format_value(value, dtype):
     """Formata um valor Python para uma string SQL válida."""
@@ -100,9 +194,209 @@ def format_value(value, dtype):
     escaped_value = value.replace("'", "''")
     return f"'{escaped_value}'"
 
-def generate_inserts_for_file(filepath, writer):
-    """Lê um arquivo XML e gera instruções INSERT em lote."""
-    filename = filepath.name
+def copy_text_value(value, dtype):
+    """Formata um valor para o formato texto do COPY (colunas separadas por tabulação)."""
+    if value is None:
+        return '\\N'
+    if dtype in ['int', 'smallint']:
+        return value
+    if dtype == 'boolean':
+        return 't' if value.lower() == 'true' else 'f'
+    # Barra invertida primeiro, para não escapar as barras dos escapes seguintes (NULL é \N).
+    # str.replace encadeado é bem mais rápido que str.translate com um dicionário em textos longos
+    return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+def copy_csv_value(value, dtype):
+    """
+    Formata um valor para o formato CSV do COPY: NULL é um campo vazio sem aspas e todo o resto
+    vai entre aspas, para que uma string vazia não seja lida como NULL.
+    """
+    if value is None:
+        return ''
+    if dtype in ['int', 'smallint']:
+        return value
+    if dtype == 'boolean':
+        return 't' if value.lower() == 'true' else 'f'
+    return '"' + value.replace('"', '""') + '"'
+
+# Por formato: (formatação de um valor, separador de colunas, extensão do arquivo, opções do COPY)
+COPY_FORMATS = {
+    'copy-text': (copy_text_value, '\t', 'copy', 'FORMAT text'),
+    'copy-csv': (copy_csv_value, ',', 'csv', 'FORMAT csv'),
+}
+
+# Por formato: o texto de NULL e a expressão que formata um valor não nulo `{v}` de cada tipo
+# (None: os demais tipos), equivalentes a format_value, copy_text_value e copy_csv_value
+_ROW_FORMAT_EXPRESSIONS = {
+    'insert': ('NULL', {
+        'int': '{v}',
+        'boolean': "('TRUE' if {v}.lower() == 'true' else 'FALSE')",
+        None: "\"'\" + {v}.replace(\"'\", \"''\") + \"'\"",
+    }),
+    'copy-text': ('\\N', {
+        'int': '{v}',
+        'boolean': "('t' if {v}.lower() == 'true' else 'f')",
+        None: "{v}.replace('\\\\', '\\\\\\\\').replace('\\t', '\\\\t').replace('\\n', '\\\\n').replace('\\r', '\\\\r')",
+    }),
+    'copy-csv': ('', {
+        'int': '{v}',
+        'boolean': "('t' if {v}.lower() == 'true' else 'f')",
+        None: '\'"\' + {v}.replace(\'"\', \'""\') + \'"\'',
+    }),
+}
+
+def compile_row_formatter(columns, output_format):
+    """
+    Gera, uma única vez por tabela, uma função que formata uma linha inteira (os valores de
+    iter_table_rows, na ordem de `columns`) no formato de saída: '(...)' de um INSERT ou uma linha
+    do COPY. Cada coluna vira uma expressão especializada para o seu tipo, sem as comparações de
+    tipo feitas a cada valor, e a linha é montada com um único join. O resultado é o mesmo de
+    aplicar format_value (ou copy_text_value, copy_csv_value) a cada coluna.
+    """
+    null, expressions = _ROW_FORMAT_EXPRESSIONS[output_format]
+    formatted = []
+    for i, (_, dtype) in enumerate(columns):
+        key = 'int' if dtype in ['int', 'smallint'] else dtype if dtype in expressions else None
+        formatted.append(f"({null!r} if v{i} is None else {expressions[key].format(v=f'v{i}')})")
+    separator = ', ' if output_format == 'insert' else COPY_FORMATS[output_format][1]
+    row = f"{separator!r}.join(({', '.join(formatted)},))"
+    if output_format == 'insert':
+        row = f"'(' + {row} + ')'"
+    source = (
+        "def format_row(values):\n"
+        f"    {', '.join(f'v{i}' for i in range(len(columns)))}, = values\n"
+        f"    return {row}\n"
+    )
+    namespace = {}
+    exec(source, namespace)
+    return namespace['format_row']
+
+class RowRangeReader:
+    """
+    Lê apenas o intervalo [start, end) de um arquivo descompactado, com linhas <row> completas
+    (ver dump_reader.split_into_shards), como um documento XML próprio dentro de uma tag raiz.
+    """
+
+    def __init__(self, f, start, end):
+        f.seek(start)
+        self.f = f
+        self.remaining = end - start
+        self.prefix = b'<rows>'
+        self.suffix = b'</rows>'
+
+    def read(self, size=-1):
+        if self.prefix:
+            data, self.prefix = self.prefix, b''
+            return data
+        if self.remaining > 0:
+            data = self.f.read(self.remaining if size < 0 else min(size, self.remaining))
+            self.remaining = self.remaining - len(data) if data else 0
+            if data:
+                return data
+        data, self.suffix = self.suffix, b''
+        return data
+
+def iter_table_rows(filepath, columns, progress, start=None, end=None):
+    """
+    Lê um arquivo XML (compactado ou não) e gera, para cada <row>, os valores das colunas (None se
+    ausentes). Com `start` e `end`, lê apenas esse intervalo de bytes de um arquivo descompactado.
+    """
+    col_names = [col[0] for col in columns]
+    with open_dump(filepath) as source:
+        if start is not None:
+            source = RowRangeReader(source, start, end)
+        source = CountingReader(source)
+        context = ET.iterparse(source, events=('end',))
+        for _, elem in context:
+            if elem.tag == 'row':
+                progress.tick((start or 0) + source.bytes_read, True)
+                yield [elem.get(col_name) for col_name in col_names]
+                elem.clear()
+    progress.position = (start or 0) + source.bytes_read
+
+class ChunkWriter:
+    """
+    Saída de uma tarefa de conversão. Com MAX_CHUNK_ROWS ou MAX_CHUNK_BYTES, é dividida em arquivos
+    numerados (posts_inserts.chunk0001.sql, ...) de até esse tamanho, cada um com seu próprio
+    cabeçalho e rodapé (num script de INSERTs, a sua própria transação); sem limites, é escrita
+    apenas em `path`. As linhas chegam em lotes completos por write_rows e `rows_left` diz quantas
+    ainda cabem no arquivo atual. `chunks` lista os arquivos gerados ({'file', 'rows', 'bytes'}).
+    """
+
+    def __init__(self, path, header='', footer=''):
+        self.path = path
+        self.header = header.encode('utf-8')
+        self.footer = footer.encode('utf-8')
+        self.chunked = bool(MAX_CHUNK_ROWS or MAX_CHUNK_BYTES)
+        self.chunks = []
+        self._file = None
+        self._open_chunk()
+
+    def _open_chunk(self):
+        path = self.path.with_name(f"{self.path.stem}.chunk{len(self.chunks) + 1:04d}{self.path.suffix}") if self.chunked else self.path
+        self._file = open(path, 'wb')
+        self._file.write(self.header)
+        self.chunks.append({'file': path.name, 'rows': 0, 'bytes': len(self.header)})
+
+    def _close_chunk(self):
+        self._file.write(self.footer)
+        self.chunks[-1]['bytes'] += len(self.footer)
+        self._file.close()
+        self._file = None
+
+    @property
+    def rows_left(self):
+        if not MAX_CHUNK_ROWS:
+            return float('inf')
+        return MAX_CHUNK_ROWS - self.chunks[-1]['rows'] if self._file else MAX_CHUNK_ROWS
+
+    def write_rows(self, text, rows):
+        """Escreve um lote de `rows` linhas, começando um novo arquivo se ele não couber no atual."""
+        data = text.encode('utf-8')
+        chunk = self.chunks[-1]
+        if self._file and MAX_CHUNK_BYTES and chunk['rows'] and chunk['bytes'] + len(data) + len(self.footer) > MAX_CHUNK_BYTES:
+            self._close_chunk()
+        if self._file is None:
+            self._open_chunk()
+            chunk = self.chunks[-1]
+        self._file.write(data)
+        chunk['rows'] += rows
+        chunk['bytes'] += len(data)
+        if MAX_CHUNK_ROWS and chunk['rows'] >= MAX_CHUNK_ROWS:
+            self._close_chunk()
+
+    def close(self):
+        if self._file:
+            self._close_chunk()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def validated_rows(rows, validator):
+    """As linhas de iter_table_rows que passam pelo `validator` (todas, se ele for None)."""
+    return rows if validator is None else validator.filter(rows)
+
+def report_rejected_rows(label, total_rows, progress, validator):
+    """Desconta as linhas rejeitadas das mantidas e imprime o resumo da conversão."""
+    rejected = validator.rejected if validator else 0
+    progress.rows_kept -= rejected
+    if rejected:
+        print(f"Processamento de '{label}' concluído. {total_rows} linhas convertidas, "
+              f"{rejected} rejeitadas (ver '{validator.reject_path}').")
+    else:
+        print(f"Processamento de '{label}' concluído. {total_rows} linhas convertidas.")
+
+def generate_inserts_for_file(filepath, writer, start=None, end=None, label=None, validator=None):
+    """
+    Lê um arquivo XML (compactado ou não) e gera instruções INSERT em lote num ChunkWriter. Com `start` e `end`,
+    converte apenas esse intervalo de bytes (uma parte do arquivo, nomeada por `label`). Com `validator`
+    (row_validation.RowValidator), só as linhas válidas são convertidas.
+    Retorna as métricas da leitura (run_metrics.FileProgress), ou None se não houver schema.
+    """
+    filename = strip_compression_suffix(filepath.name)
     if filename not in SCHEMA:
         print(f"Aviso: Nenhum schema definido para '{filename}'. Pulando.")
         return
@@ -112,41 +406,285 @@ def generate_inserts_for_file(filepath, writer):
     columns = schema['columns']
 
     col_names_str = ', '.join([col[0].lower() for col in columns])
+    label = label or filename
     
-    print(f"Processando '{filename}' para a tabela '{table_name}'...")
+    print(f"Processando '{label}' para a tabela '{table_name}'...")
 
     values_batch = []
     total_rows = 0
+    format_row = compile_row_formatter(columns, 'insert')
+    progress = FileProgress(label, start, None if is_compressed(filepath) else filepath.stat().st_size)
 
-    context = ET.iterparse(filepath, events=('end',))
-    for _, elem in context:
-        if elem.tag == 'row':
-            row_values = []
-            for col_name, col_type in columns:
-                value = elem.get(col_name)
-                formatted_val = format_value(value, col_type)
-                row_values.append(formatted_val)
-            
-            values_batch.append(f"({', '.join(row_values)})")
-            total_rows += 1
-
-            if len(values_batch) >= BATCH_SIZE:
-                writer.write(f"INSERT INTO {table_name} ({col_names_str}) VALUES\n")
-                writer.write(',\n'.join(values_batch))
-                writer.write(';\n\n')
-                values_batch.clear()
-
-            elem.clear()
+    for values in validated_rows(iter_table_rows(filepath, columns, progress, start, end), validator):
+        values_batch.append(format_row(values))
+        total_rows += 1
+
+        # Um lote nunca passa do limite de linhas do arquivo atual
+        if len(values_batch) >= BATCH_SIZE or len(values_batch) >= writer.rows_left:
+            writer.write_rows(f"INSERT INTO {table_name} ({col_names_str}) VALUES\n" + ',\n'.join(values_batch) + ';\n\n', len(values_batch))
+            values_batch.clear()
 
     if values_batch:
-        writer.write(f"INSERT INTO {table_name} ({col_names_str}) VALUES\n")
-        writer.write(',\n'.join(values_batch))
-        writer.write(';\n\n')
+        writer.write_rows(f"INSERT INTO {table_name} ({col_names_str}) VALUES\n" + ',\n'.join(values_batch) + ';\n\n', len(values_batch))
+
+    report_rejected_rows(label, total_rows, progress, validator)
+    return progress.finish()
+
+def generate_copy_for_file(filepath, writer, output_format, start=None, end=None, label=None, validator=None):
+    """
+    Lê um arquivo XML (compactado ou não) e escreve suas linhas num ChunkWriter no formato do COPY
+    do PostgreSQL (`output_format` é 'copy-text' ou 'copy-csv'), uma linha por <row>, nas colunas do SCHEMA.
+    `start`, `end`, `label` e `validator` funcionam como em generate_inserts_for_file.
+    Retorna as métricas da leitura (run_metrics.FileProgress), ou None se não houver schema.
+    """
+    filename = strip_compression_suffix(filepath.name)
+    if filename not in SCHEMA:
+        print(f"Aviso: Nenhum schema definido para '{filename}'. Pulando.")
+        return
+
+    columns = SCHEMA[filename]['columns']
+    format_row = compile_row_formatter(columns, output_format)
+    label = label or filename
+    print(f"Processando '{label}' para a tabela '{SCHEMA[filename]['table_name']}'...")
+
+    lines = []
+    total_rows = 0
+    progress = FileProgress(label, start, None if is_compressed(filepath) else filepath.stat().st_size)
+
+    for values in validated_rows(iter_table_rows(filepath, columns, progress, start, end), validator):
+        lines.append(format_row(values))
+        total_rows += 1
+        if len(lines) >= BATCH_SIZE or len(lines) >= writer.rows_left:
+            writer.write_rows('\n'.join(lines) + '\n', len(lines))
+            lines.clear()
+
+    if lines:
+        writer.write_rows('\n'.join(lines) + '\n', len(lines))
+
+    report_rejected_rows(label, total_rows, progress, validator)
+    return progress.finish()
+
+def load_file_into_database(filepath, database, validator=None):
+    """
+    Lê um arquivo XML (compactado ou não) e carrega suas linhas no banco local (local_db.LocalDatabase),
+    em lotes de LOCAL_DB_BATCH_SIZE linhas dentro de uma única transação. Com `validator`, só as válidas.
+    Retorna as métricas da leitura (run_metrics.FileProgress), ou None se não houver schema.
+    """
+    filename = strip_compression_suffix(filepath.name)
+    if filename not in SCHEMA:
+        print(f"Aviso: Nenhum schema definido para '{filename}'. Pulando.")
+        return
+
+    table_name = SCHEMA[filename]['table_name']
+    columns = SCHEMA[filename]['columns']
+    print(f"Carregando '{filename}' na tabela '{table_name}'...")
+
+    database.create_table(table_name, columns)
+    batch = []
+    progress = FileProgress(filepath.name, total_bytes=None if is_compressed(filepath) else filepath.stat().st_size)
+    for values in validated_rows(iter_table_rows(filepath, columns, progress), validator):
+        batch.append(values)
+        if len(batch) >= LOCAL_DB_BATCH_SIZE:
+            database.insert_batch(table_name, batch)
+            batch = []
+    if batch:
+        database.insert_batch(table_name, batch)
+    database.finish_table(table_name)
+
+    rejected = validator.rejected if validator else 0
+    progress.rows_kept -= rejected
+    metrics = progress.finish()
+    print(f"Carga de '{filename}' concluída. {metrics['rows_read']} linhas em {metrics['seconds']:.1f}s "
+          f"({metrics['rows_per_second'] or 0:.0f} linhas/s).")
+    if rejected:
+        print(f"{rejected} linhas rejeitadas (ver '{validator.reject_path}').")
+    return metrics
+
+def copy_command(table_name, columns, data_filename, output_format):
+    """Comando \\copy do psql que carrega um arquivo gerado por generate_copy_for_file."""
+    col_names_str = ', '.join([col[0].lower() for col in columns])
+    return f"\\copy {table_name} ({col_names_str}) FROM '{data_filename}' WITH ({COPY_FORMATS[output_format][3]})\n"
+
+def is_partitioned(table_name):
+    return PARTITION_YEARS is not None and table_name in PARTITIONED_TABLES
+
+def create_table_sql(table_name, columns):
+    """CREATE TABLE de uma tabela do SCHEMA, sem chaves nem índices (e suas partições por ano)."""
+    column_defs = ',\n'.join(f"    {name.lower()} {POSTGRES_TYPES.get(dtype, 'TEXT')}" for name, dtype in columns)
+    if not is_partitioned(table_name):
+        return f"CREATE TABLE {table_name} (\n{column_defs}\n);\n"
+    statements = [f"CREATE TABLE {table_name} (\n{column_defs}\n) PARTITION BY RANGE (creationdate);\n"]
+    for year in PARTITION_YEARS:
+        statements.append(
+            f"CREATE TABLE {table_name}_{year} PARTITION OF {table_name} "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01');\n")
+    statements.append(f"CREATE TABLE {table_name}_default PARTITION OF {table_name} DEFAULT;\n")
+    return ''.join(statements)
 
-    print(f"Processamento de '{filename}' concluído. {total_rows} linhas convertidas.")
+def post_load_sql(table_names):
+    """
+    Chaves primárias, chaves estrangeiras e índices das tabelas carregadas, criados de uma vez
+    depois da carga em vez de atualizados a cada linha inserida. Numa tabela particionada a chave
+    primária inclui creationdate, então as chaves estrangeiras que apontam para ela são omitidas.
+    """
+    lines = ["-- Chaves primárias"]
+    for table_name in table_names:
+        key = PRIMARY_KEYS.get(table_name, ('id',))
+        if is_partitioned(table_name):
+            key += ('creationdate',)
+        lines.append(f"ALTER TABLE {table_name} ADD PRIMARY KEY ({', '.join(key)});")
+    lines.append("\n-- Chaves estrangeiras")
+    for table_name, column, referenced in FOREIGN_KEYS:
+        if table_name in table_names and referenced in table_names and not is_partitioned(referenced):
+            lines.append(f"ALTER TABLE {table_name} ADD FOREIGN KEY ({column}) REFERENCES {referenced} (id);")
+    lines.append("\n-- Índices")
+    for table_name, columns in POST_LOAD_INDEXES:
+        if table_name in table_names:
+            lines.append(f"CREATE INDEX idx_{table_name}_{'_'.join(columns)} ON {table_name} ({', '.join(columns)});")
+    lines.append("\nANALYZE;\n")
+    return '\n'.join(lines)
+
+def write_schema_scripts(filenames):
+    """Grava schema-create.sql e schema-post-load.sql para as tabelas dos arquivos convertidos."""
+    table_names = [SCHEMA[filename]['table_name'] for filename in filenames]
+    create_path = OUTPUT_SQL_DIR / 'schema-create.sql'
+    with open(create_path, 'w', encoding='utf-8') as writer:
+        writer.write("-- Tabelas geradas a partir de xml_to_sql.SCHEMA, sem chaves nem índices: execute antes da carga\n\n")
+        writer.write('\n'.join(create_table_sql(SCHEMA[filename]['table_name'], SCHEMA[filename]['columns']) for filename in filenames))
+    post_load_path = OUTPUT_SQL_DIR / 'schema-post-load.sql'
+    with open(post_load_path, 'w', encoding='utf-8') as writer:
+        writer.write("-- Chaves e índices: execute depois de carregar todas as tabelas\n\n")
+        writer.write(post_load_sql(table_names))
+    print(f"Scripts de schema salvos em '{create_path}' e '{post_load_path}'.")
+
+def output_path(table_name, part=None):
+    """Arquivo gerado para uma tabela ou, com `part` (a partir de 1), para uma parte dela."""
+    path = OUTPUT_SQL_DIR / (f"{table_name}.{COPY_FORMATS[OUTPUT_FORMAT][2]}" if OUTPUT_FORMAT in COPY_FORMATS else f"{table_name}_inserts.sql")
+    return path if part is None else path.with_name(f"{path.stem}.{part:03d}{path.suffix}")
+
+def reject_path(table_name, part=None):
+    """Arquivo com as linhas rejeitadas de uma tabela ou de uma parte dela."""
+    return OUTPUT_SQL_DIR / 'rejects' / (f"{table_name}.jsonl" if part is None else f"{table_name}.{part:03d}.jsonl")
+
+def row_validator(table_name, columns, part=None):
+    """RowValidator de uma tabela (ou parte), exigindo a chave primária; None com VALIDATE_ROWS desativado."""
+    if not VALIDATE_ROWS:
+        return None
+    return RowValidator(columns, PRIMARY_KEYS.get(table_name, ('id',)), reject_path(table_name, part))
+
+def remove_previous_rejects(table_name):
+    """Apaga as linhas rejeitadas de uma execução anterior da tabela."""
+    path = reject_path(table_name)
+    for previous in [path, *path.parent.glob(f"{table_name}.*.jsonl")]:
+        if previous.exists():
+            previous.unlink()
+
+def remove_previous_outputs(table_name):
+    """Apaga os arquivos de uma execução anterior da tabela, inteiros ou em partes e blocos, e suas rejeições."""
+    remove_previous_rejects(table_name)
+    path = output_path(table_name)
+    for previous in [path, *OUTPUT_SQL_DIR.glob(f"{path.stem}.*{path.suffix}")]:
+        if previous.exists():
+            previous.unlink()
+
+def table_tasks(filename, filepath):
+    """
+    Divide a conversão de um arquivo em tarefas: uma para o arquivo inteiro ou, com NUM_WORKERS > 1
+    e um arquivo descompactado maior que CHUNK_FILE_SIZE, uma por intervalo de linhas, cada uma
+    com seu arquivo de saída numerado.
+    """
+    table_name = SCHEMA[filename]['table_name']
+    size = filepath.stat().st_size
+    ranges = []
+    if NUM_WORKERS > 1 and not is_compressed(filepath) and size > CHUNK_FILE_SIZE:
+        ranges = split_into_shards(filepath, math.ceil(size / CHUNK_FILE_SIZE))
+    if len(ranges) <= 1:
+        return [{'table_name': table_name, 'filepath': filepath, 'start': None, 'end': None,
+                 'size': size, 'label': None, 'part': None, 'output_path': output_path(table_name)}]
+    return [
+        {'table_name': table_name, 'filepath': filepath, 'start': start, 'end': end, 'size': end - start,
+         'label': f'{filepath.name} (parte {part}/{len(ranges)})', 'part': part, 'output_path': output_path(table_name, part)}
+        for part, (start, end) in enumerate(ranges, 1)
+    ]
+
+def convert_task(task):
+    """
+    Converte uma tarefa de table_tasks nos seus arquivos de saída. Retorna as métricas da leitura
+    e os arquivos gerados (ChunkWriter.chunks).
+    """
+    filename = strip_compression_suffix(task['filepath'].name)
+    validator = row_validator(task['table_name'], SCHEMA[filename]['columns'], task['part']) if filename in SCHEMA else None
+    with validator or nullcontext():
+        if OUTPUT_FORMAT in COPY_FORMATS:
+            with ChunkWriter(task['output_path']) as writer:
+                metrics = generate_copy_for_file(task['filepath'], writer, OUTPUT_FORMAT, task['start'], task['end'], task['label'], validator)
+        else:
+            header = f"-- Script de inserção para a tabela {task['table_name']}\nBEGIN;\n\n"
+            with ChunkWriter(task['output_path'], header, "COMMIT;\n") as writer:
+                metrics = generate_inserts_for_file(task['filepath'], writer, task['start'], task['end'], task['label'], validator)
+    if metrics:
+        metrics['bytes_written'] = sum(chunk['bytes'] for chunk in writer.chunks)
+    return metrics, writer.chunks
+
+def write_manifest(tables):
+    """
+    Grava OUTPUT_SQL_DIR/manifest.json com todos os arquivos gerados (tabela, arquivo, linhas,
+    bytes e, nos formatos COPY, o comando \\copy que o carrega), na ordem de carga, e os scripts
+    de schema a executar antes e depois deles. É a entrada do load_chunks.py.
+    """
+    chunks = []
+    for table_name, tasks in tables:
+        for task in tasks:
+            columns = SCHEMA[strip_compression_suffix(task['filepath'].name)]['columns']
+            for chunk in task['chunks']:
+                command = copy_command(table_name, columns, chunk['file'], OUTPUT_FORMAT).strip() if OUTPUT_FORMAT in COPY_FORMATS else None
+                chunks.append({'table': table_name, **chunk, 'command': command})
+    manifest = {
+        'format': OUTPUT_FORMAT,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'schema_create': 'schema-create.sql',
+        'post_load': 'schema-post-load.sql',
+        'chunks': chunks,
+    }
+    path = OUTPUT_SQL_DIR / 'manifest.json'
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    print(f"Manifesto com {len(chunks)} arquivos salvo em '{path}'.")
+
+def convert_tables_in_parallel(tables, report):
+    """
+    Converte as tarefas de todas as tabelas em NUM_WORKERS processos, das maiores para as menores,
+    para que o tempo total fique próximo ao da maior parte. `tables` é uma lista de
+    (nome da tabela, tarefas); as métricas de cada tabela são registradas quando ela termina.
+    """
+    started = time.monotonic()
+    pending = {table_name: len(tasks) for table_name, tasks in tables}
+    parts = {table_name: [] for table_name, _ in tables}
+    all_tasks = sorted((task for _, tasks in tables for task in tasks), key=lambda task: task['size'], reverse=True)
+    with ProcessPoolExecutor(max_workers=NUM_WORKERS) as executor:
+        futures = {executor.submit(convert_task, task): task for task in all_tasks}
+        for future in as_completed(futures):
+            table_name = futures[future]['table_name']
+            metrics, futures[future]['chunks'] = future.result()
+            if metrics:
+                parts[table_name].append(metrics)
+            pending[table_name] -= 1
+            if pending[table_name] == 0 and parts[table_name]:
+                table_parts = parts[table_name]
+                report.add_file(table_parts[0] if len(table_parts) == 1 else
+                                merge_file_metrics(table_parts[0]['file'].split(' (parte')[0], table_parts, time.monotonic() - started))
+                print(f"Tabela '{table_name}' concluída ({time.monotonic() - started:.1f}s desde o início).")
 
 if __name__ == '__main__':
+    if OUTPUT_FORMAT not in ('insert', 'sqlite', 'duckdb') and OUTPUT_FORMAT not in COPY_FORMATS:
+        raise ValueError(f"OUTPUT_FORMAT inválido: '{OUTPUT_FORMAT}' (use 'insert', 'copy-text', 'copy-csv', 'sqlite' ou 'duckdb').")
     os.makedirs(OUTPUT_SQL_DIR, exist_ok=True)
+    report = RunReport('xml_to_sql', {
+        'input_dir': str(INPUT_DIR), 'batch_size': BATCH_SIZE, 'output_format': OUTPUT_FORMAT,
+        'num_workers': NUM_WORKERS, 'chunk_file_size': CHUNK_FILE_SIZE, 'validate_rows': VALIDATE_ROWS,
+        'partition_years': [min(PARTITION_YEARS), max(PARTITION_YEARS)] if PARTITION_YEARS else None,
+    })
+    database = LocalDatabase(OUTPUT_SQL_DIR / f'stackoverflow.{OUTPUT_FORMAT}', OUTPUT_FORMAT) if OUTPUT_FORMAT in ('sqlite', 'duckdb') else None
 
     # Ordem de processamento para tentar respeitar dependências lógicas
     process_order = [
@@ -154,6 +692,7 @@ if __name__ == '__main__':
         'filtered_Tags.xml',
         'filtered_Posts.xml',
         'filtered_PostTags.xml', 
+        'filtered_QuestionTargetTags.xml',
         'filtered_Comments.xml',
         'filtered_Votes.xml',
         'filtered_PostHistory.xml',
@@ -161,25 +700,71 @@ if __name__ == '__main__':
         'filtered_Badges.xml',
     ]
 
-    # Itera sobre cada arquivo para criar um .sql separado
+    input_files = []
     for filename in process_order:
-        filepath = INPUT_DIR / filename
-        if filepath.exists():
-            # Define o nome do arquivo de saída
+        filepath = find_dump_file(INPUT_DIR, filename)
+        if filepath:
+            input_files.append((filename, filepath))
+        else:
+            print(f"Aviso: Arquivo '{INPUT_DIR / filename}' não encontrado. Pulando.\n")
+
+    if database:
+        for filename, filepath in input_files:
+            table_name = SCHEMA[filename]['table_name']
+            remove_previous_rejects(table_name)
+            with report.stage(table_name), row_validator(table_name, SCHEMA[filename]['columns']) or nullcontext() as validator:
+                metrics = load_file_into_database(filepath, database, validator)
+                if metrics:
+                    report.add_file(metrics)
+            print()
+
+        print("--- Criando os índices ---")
+        with report.stage('índices'):
+            for statement, seconds in database.create_indexes(POST_LOAD_INDEXES):
+                print(f"  {statement} ({seconds:.1f}s)")
+        database.close()
+        print(f"Banco local salvo em '{database.path}'.")
+    else:
+        # Cria um arquivo separado para cada tabela (ou para cada parte de uma tabela grande)
+        tables = []
+        for filename, filepath in input_files:
             table_name = SCHEMA[filename]['table_name']
-            output_sql_path = OUTPUT_SQL_DIR / f"{table_name}_inserts.sql"
-
-            print(f"--- Gerando script para a tabela '{table_name}' ---")
-            with open(output_sql_path, 'w', encoding='utf-8') as writer:
-                writer.write(f"-- Script de inserção para a tabela {table_name}\n")
-                writer.write("BEGIN;\n\n")
-
-                generate_inserts_for_file(filepath, writer)
-                
-                writer.write("COMMIT;\n")
-            
-            print(f"Script SQL salvo em '{output_sql_path}'\n")
+            remove_previous_outputs(table_name)
+            tables.append((table_name, table_tasks(filename, filepath)))
+
+        if NUM_WORKERS > 1:
+            print(f"--- Convertendo {len(tables)} tabelas com {NUM_WORKERS} processos ---")
+            with report.stage('conversão'):
+                convert_tables_in_parallel(tables, report)
         else:
-            print(f"Aviso: Arquivo '{filepath}' não encontrado. Pulando.\n")
-    
+            for table_name, tasks in tables:
+                print(f"--- Gerando arquivos da tabela '{table_name}' ---")
+                with report.stage(table_name):
+                    for task in tasks:
+                        metrics, task['chunks'] = convert_task(task)
+                        if metrics:
+                            report.add_file(metrics)
+
+        for _, tasks in tables:
+            for task in tasks:
+                for chunk in task['chunks']:
+                    print(f"Arquivo salvo em '{OUTPUT_SQL_DIR / chunk['file']}' ({chunk['rows']} linhas)")
+        write_schema_scripts([filename for filename, _ in input_files])
+        write_manifest(tables)
+
+        if OUTPUT_FORMAT in COPY_FORMATS:
+            # Os arquivos são lidos pelo psql, relativos ao diretório em que ele é executado
+            loader_path = OUTPUT_SQL_DIR / 'copy-import.sql'
+            with open(loader_path, 'w', encoding='utf-8') as writer:
+                writer.write("-- Carga dos arquivos gerados por xml_to_sql.py (execute a partir deste diretório)\n")
+                writer.write("\\set ON_ERROR_STOP on\n")
+                for _, tasks in tables:
+                    for task in tasks:
+                        columns = SCHEMA[strip_compression_suffix(task['filepath'].name)]['columns']
+                        for chunk in task['chunks']:
+                            writer.write(copy_command(task['table_name'], columns, chunk['file'], OUTPUT_FORMAT))
+            print(f"Script de carga salvo em '{loader_path}'.")
+
+    if RUN_REPORT:
+        print(f"Relatório da execução salvo em '{report.write(OUTPUT_SQL_DIR / 'run-reports')}'.")
     print("--- Processo concluído! Todos os scripts SQL foram gerados. ---")